@@ -0,0 +1,44 @@
+"""users_search_document
+
+Revision ID: 5c1e7a2b9d40
+Revises: e6f0a24c4840
+Create Date: 2025-12-01 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a2b9d40'
+down_revision: Union[str, Sequence[str], None] = 'e6f0a24c4840'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('russian', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(position, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(position, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(email, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(city, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('search_document', postgresql.TSVECTOR(), sa.Computed(SEARCH_DOCUMENT_SQL, persisted=True), nullable=True)
+    )
+    op.create_index('idx_users_search_document', 'users', ['search_document'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_users_search_document', table_name='users', postgresql_using='gin')
+    op.drop_column('users', 'search_document')
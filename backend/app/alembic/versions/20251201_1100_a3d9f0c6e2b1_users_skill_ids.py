@@ -0,0 +1,83 @@
+"""users_skill_ids
+
+Revision ID: a3d9f0c6e2b1
+Revises: 5c1e7a2b9d40
+Create Date: 2025-12-01 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9f0c6e2b1'
+down_revision: Union[str, Sequence[str], None] = '5c1e7a2b9d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('skill_ids', postgresql.ARRAY(sa.UUID()), server_default=sa.text("'{}'::uuid[]"), nullable=False)
+    )
+    op.execute(
+        """
+        UPDATE users u
+        SET skill_ids = s.skill_ids
+        FROM (
+            SELECT user_id, array_agg(skill_id ORDER BY skill_id) AS skill_ids
+            FROM user_skills_association
+            GROUP BY user_id
+        ) s
+        WHERE s.user_id = u.id
+        """
+    )
+    op.create_index('idx_users_skill_ids', 'users', ['skill_ids'], unique=False, postgresql_using='gin')
+
+    # Массив пересчитывается один раз на оператор для всех затронутых пользователей;
+    # оба триггера называют таблицу переходов changed_rows, поэтому функция у них общая
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_user_skill_ids() RETURNS trigger AS $$
+        BEGIN
+            UPDATE users u
+            SET skill_ids = ARRAY(
+                SELECT usa.skill_id FROM user_skills_association usa
+                WHERE usa.user_id = u.id ORDER BY usa.skill_id
+            )
+            WHERE u.id IN (SELECT DISTINCT user_id FROM changed_rows);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_user_skills_association_insert
+        AFTER INSERT ON user_skills_association
+        REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION sync_user_skill_ids();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_user_skills_association_delete
+        AFTER DELETE ON user_skills_association
+        REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION sync_user_skill_ids();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_user_skills_association_delete ON user_skills_association;")
+    op.execute("DROP TRIGGER IF EXISTS trg_user_skills_association_insert ON user_skills_association;")
+    op.execute("DROP FUNCTION IF EXISTS sync_user_skill_ids();")
+    op.drop_index('idx_users_skill_ids', table_name='users', postgresql_using='gin')
+    op.drop_column('users', 'skill_ids')
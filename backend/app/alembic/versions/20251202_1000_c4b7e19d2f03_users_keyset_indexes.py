@@ -0,0 +1,30 @@
+"""users_keyset_indexes
+
+Revision ID: c4b7e19d2f03
+Revises: a3d9f0c6e2b1
+Create Date: 2025-12-02 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4b7e19d2f03'
+down_revision: Union[str, Sequence[str], None] = 'a3d9f0c6e2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_users_last_name_id', 'users', ['last_name', 'id'], unique=False)
+    op.create_index('idx_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_users_created_at_id', table_name='users')
+    op.drop_index('idx_users_last_name_id', table_name='users')
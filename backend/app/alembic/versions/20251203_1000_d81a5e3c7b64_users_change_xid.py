@@ -0,0 +1,82 @@
+"""users_change_xid
+
+Revision ID: d81a5e3c7b64
+Revises: c4b7e19d2f03
+Create Date: 2025-12-03 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81a5e3c7b64'
+down_revision: Union[str, Sequence[str], None] = 'c4b7e19d2f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column(
+            'change_xid',
+            sa.BigInteger(),
+            server_default=sa.text('(pg_current_xact_id()::text)::bigint'),
+            nullable=False,
+        )
+    )
+    op.create_index('idx_users_change_xid', 'users', ['change_xid', 'id'], unique=False)
+
+    # Любое изменение строки пользователя (в том числе skill_ids из триггеров навыков)
+    # получает номер текущей транзакции
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION set_user_change_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := (pg_current_xact_id()::text)::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_users_change_xid
+        BEFORE INSERT OR UPDATE ON users
+        FOR EACH ROW EXECUTE FUNCTION set_user_change_xid();
+        """
+    )
+
+    # Переименование навыка меняет карточки всех его владельцев
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION touch_skill_owners() RETURNS trigger AS $$
+        BEGIN
+            UPDATE users SET change_xid = 0 WHERE skill_ids @> ARRAY[NEW.id];
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_skills_touch_owners
+        AFTER UPDATE OF name ON skills
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION touch_skill_owners();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_skills_touch_owners ON skills;")
+    op.execute("DROP FUNCTION IF EXISTS touch_skill_owners();")
+    op.execute("DROP TRIGGER IF EXISTS trg_users_change_xid ON users;")
+    op.execute("DROP FUNCTION IF EXISTS set_user_change_xid();")
+    op.drop_index('idx_users_change_xid', table_name='users')
+    op.drop_column('users', 'change_xid')
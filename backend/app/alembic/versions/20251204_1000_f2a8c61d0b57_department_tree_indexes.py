@@ -0,0 +1,32 @@
+"""department_tree_indexes
+
+Revision ID: f2a8c61d0b57
+Revises: d81a5e3c7b64
+Create Date: 2025-12-04 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c61d0b57'
+down_revision: Union[str, Sequence[str], None] = 'd81a5e3c7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_departments_parent_id', 'departments', ['parent_id'], unique=False)
+    op.create_index(
+        'idx_users_department_id_last_name_id', 'users', ['department_id', 'last_name', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_users_department_id_last_name_id', table_name='users')
+    op.drop_index('idx_departments_parent_id', table_name='departments')
@@ -0,0 +1,116 @@
+"""department_closure
+
+Revision ID: 0b9e4d7a3c18
+Revises: f2a8c61d0b57
+Create Date: 2025-12-05 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e4d7a3c18'
+down_revision: Union[str, Sequence[str], None] = 'f2a8c61d0b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'department_closure',
+        sa.Column('ancestor_id', sa.UUID(), nullable=False),
+        sa.Column('descendant_id', sa.UUID(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['departments.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['departments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    op.create_index(
+        'idx_department_closure_descendant_depth', 'department_closure', ['descendant_id', 'depth'], unique=False
+    )
+    op.execute(
+        """
+        INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM departments
+            UNION ALL
+            SELECT tree.ancestor_id, d.id, tree.depth + 1
+            FROM departments d JOIN tree ON d.parent_id = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
+    )
+
+    # Новый отдел получает строку на себя и по строке на каждого предка родителя
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION department_closure_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+            SELECT NEW.id, NEW.id, 0
+            UNION ALL
+            SELECT ancestor_id, NEW.id, depth + 1 FROM department_closure WHERE descendant_id = NEW.parent_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # При смене родителя все поддерево теряет связи с прежними предками и получает связи с новыми.
+    # Родитель внутри собственного поддерева дал бы цикл — такое изменение отклоняется
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION department_closure_move() RETURNS trigger AS $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM department_closure WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+            ) THEN
+                RAISE EXCEPTION 'Department % cannot be moved under its own subdepartment %', NEW.id, NEW.parent_id
+                    USING ERRCODE = 'check_violation';
+            END IF;
+
+            DELETE FROM department_closure c
+            USING department_closure subtree
+            WHERE subtree.ancestor_id = NEW.id
+              AND c.descendant_id = subtree.descendant_id
+              AND c.ancestor_id NOT IN (SELECT descendant_id FROM department_closure WHERE ancestor_id = NEW.id);
+
+            INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+            SELECT above.ancestor_id, subtree.descendant_id, above.depth + subtree.depth + 1
+            FROM department_closure above
+            JOIN department_closure subtree ON subtree.ancestor_id = NEW.id
+            WHERE above.descendant_id = NEW.parent_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_departments_closure_insert
+        AFTER INSERT ON departments
+        FOR EACH ROW EXECUTE FUNCTION department_closure_insert();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_departments_closure_move
+        AFTER UPDATE OF parent_id ON departments
+        FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+        EXECUTE FUNCTION department_closure_move();
+        """
+    )
+    # Удаление отдела убирает его строки каскадом по внешним ключам
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_departments_closure_move ON departments;")
+    op.execute("DROP TRIGGER IF EXISTS trg_departments_closure_insert ON departments;")
+    op.execute("DROP FUNCTION IF EXISTS department_closure_move();")
+    op.execute("DROP FUNCTION IF EXISTS department_closure_insert();")
+    op.drop_index('idx_department_closure_descendant_depth', table_name='department_closure')
+    op.drop_table('department_closure')
@@ -0,0 +1,235 @@
+"""department_stats
+
+Revision ID: 7c2f5b9e1a46
+Revises: 0b9e4d7a3c18
+Create Date: 2025-12-06 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2f5b9e1a46'
+down_revision: Union[str, Sequence[str], None] = '0b9e4d7a3c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'department_stats',
+        sa.Column('department_id', sa.UUID(), nullable=False),
+        sa.Column('headcount', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('active_headcount', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('total_headcount', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('total_active_headcount', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('has_manager', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('department_id'),
+    )
+    op.execute(
+        """
+        INSERT INTO department_stats (
+            department_id, headcount, active_headcount, total_headcount, total_active_headcount, has_manager
+        )
+        SELECT d.id,
+               count(u.id) FILTER (WHERE c.depth = 0),
+               count(u.id) FILTER (WHERE c.depth = 0 AND u.is_active),
+               count(u.id),
+               count(u.id) FILTER (WHERE u.is_active),
+               d.manager_id IS NOT NULL
+        FROM departments d
+        JOIN department_closure c ON c.ancestor_id = d.id
+        LEFT JOIN users u ON u.department_id = c.descendant_id
+        GROUP BY d.id
+        """
+    )
+
+    # Применяет приращения численности (отдел, все сотрудники, активные) к самим отделам и всем их предкам.
+    # Строки блокируются в порядке ID, чтобы параллельные изменения разных веток не взаимоблокировались
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION department_stats_apply(
+            department_ids uuid[], all_deltas integer[], active_deltas integer[]
+        ) RETURNS void AS $$
+        DECLARE
+            rollup_ids uuid[];
+            rollup_direct_all integer[];
+            rollup_direct_active integer[];
+            rollup_total_all integer[];
+            rollup_total_active integer[];
+        BEGIN
+            SELECT array_agg(r.ancestor_id ORDER BY r.ancestor_id),
+                   array_agg(r.direct_all ORDER BY r.ancestor_id),
+                   array_agg(r.direct_active ORDER BY r.ancestor_id),
+                   array_agg(r.total_all ORDER BY r.ancestor_id),
+                   array_agg(r.total_active ORDER BY r.ancestor_id)
+            INTO rollup_ids, rollup_direct_all, rollup_direct_active, rollup_total_all, rollup_total_active
+            FROM (
+                SELECT c.ancestor_id,
+                       coalesce(sum(direct.all_delta) FILTER (WHERE c.depth = 0), 0)::int AS direct_all,
+                       coalesce(sum(direct.active_delta) FILTER (WHERE c.depth = 0), 0)::int AS direct_active,
+                       sum(direct.all_delta)::int AS total_all,
+                       sum(direct.active_delta)::int AS total_active
+                FROM (
+                    SELECT changed.id, sum(changed.all_delta) AS all_delta, sum(changed.active_delta) AS active_delta
+                    FROM unnest(department_ids, all_deltas, active_deltas) AS changed(id, all_delta, active_delta)
+                    GROUP BY changed.id
+                    HAVING sum(changed.all_delta) <> 0 OR sum(changed.active_delta) <> 0
+                ) direct
+                JOIN department_closure c ON c.descendant_id = direct.id
+                GROUP BY c.ancestor_id
+            ) r;
+            IF rollup_ids IS NULL THEN
+                RETURN;
+            END IF;
+
+            PERFORM 1 FROM department_stats s
+            WHERE s.department_id = ANY(rollup_ids)
+            ORDER BY s.department_id
+            FOR UPDATE;
+
+            UPDATE department_stats s
+            SET headcount = s.headcount + r.direct_all,
+                active_headcount = s.active_headcount + r.direct_active,
+                total_headcount = s.total_headcount + r.total_all,
+                total_active_headcount = s.total_active_headcount + r.total_active
+            FROM unnest(rollup_ids, rollup_direct_all, rollup_direct_active, rollup_total_all, rollup_total_active)
+                AS r(department_id, direct_all, direct_active, total_all, total_active)
+            WHERE s.department_id = r.department_id;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # Изменения сотрудников обрабатываются раз на оператор по таблицам переходов:
+    # ушедшие из отдела строки дают -1, пришедшие +1, неизменные взаимно сокращаются
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION department_stats_users() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM department_stats_apply(array_agg(department_id), array_agg(1), array_agg(is_active::int))
+                FROM new_rows WHERE department_id IS NOT NULL;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM department_stats_apply(array_agg(department_id), array_agg(-1), array_agg(-is_active::int))
+                FROM old_rows WHERE department_id IS NOT NULL;
+            ELSE
+                PERFORM department_stats_apply(array_agg(department_id), array_agg(all_delta), array_agg(active_delta))
+                FROM (
+                    SELECT department_id, -1 AS all_delta, -is_active::int AS active_delta FROM old_rows
+                    UNION ALL
+                    SELECT department_id, 1, is_active::int FROM new_rows
+                ) changed
+                WHERE department_id IS NOT NULL;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # При переносе отдела его поддерево вычитается из прежних предков и прибавляется к новым;
+    # общие предки остаются без изменений. Строки предков родителей перенос не затрагивает
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION department_stats_move() RETURNS trigger AS $$
+        BEGIN
+            UPDATE department_stats s
+            SET total_headcount = s.total_headcount + shift.sign * moved.total_headcount,
+                total_active_headcount = s.total_active_headcount + shift.sign * moved.total_active_headcount
+            FROM department_stats moved, (
+                SELECT ancestor_id, sum(sign) AS sign
+                FROM (
+                    SELECT ancestor_id, -1 AS sign FROM department_closure WHERE descendant_id = OLD.parent_id
+                    UNION ALL
+                    SELECT ancestor_id, 1 FROM department_closure WHERE descendant_id = NEW.parent_id
+                ) ancestors
+                GROUP BY ancestor_id
+                HAVING sum(sign) <> 0
+            ) shift
+            WHERE moved.department_id = NEW.id AND s.department_id = shift.ancestor_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION department_stats_department() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO department_stats (department_id, has_manager) VALUES (NEW.id, NEW.manager_id IS NOT NULL);
+            ELSE
+                UPDATE department_stats SET has_manager = NEW.manager_id IS NOT NULL WHERE department_id = NEW.id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_users_stats_insert
+        AFTER INSERT ON users
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION department_stats_users();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_users_stats_update
+        AFTER UPDATE ON users
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION department_stats_users();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_users_stats_delete
+        AFTER DELETE ON users
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION department_stats_users();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_departments_stats_insert
+        AFTER INSERT ON departments
+        FOR EACH ROW EXECUTE FUNCTION department_stats_department();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_departments_stats_manager
+        AFTER UPDATE OF manager_id ON departments
+        FOR EACH ROW WHEN (OLD.manager_id IS DISTINCT FROM NEW.manager_id)
+        EXECUTE FUNCTION department_stats_department();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_departments_stats_move
+        AFTER UPDATE OF parent_id ON departments
+        FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+        EXECUTE FUNCTION department_stats_move();
+        """
+    )
+    # Удаление отдела убирает его строку каскадом; удалять можно только отдел без сотрудников и подотделов
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_departments_stats_move ON departments;")
+    op.execute("DROP TRIGGER IF EXISTS trg_departments_stats_manager ON departments;")
+    op.execute("DROP TRIGGER IF EXISTS trg_departments_stats_insert ON departments;")
+    op.execute("DROP TRIGGER IF EXISTS trg_users_stats_delete ON users;")
+    op.execute("DROP TRIGGER IF EXISTS trg_users_stats_update ON users;")
+    op.execute("DROP TRIGGER IF EXISTS trg_users_stats_insert ON users;")
+    op.execute("DROP FUNCTION IF EXISTS department_stats_department();")
+    op.execute("DROP FUNCTION IF EXISTS department_stats_move();")
+    op.execute("DROP FUNCTION IF EXISTS department_stats_users();")
+    op.execute("DROP FUNCTION IF EXISTS department_stats_apply(uuid[], integer[], integer[]);")
+    op.drop_table('department_stats')
@@ -2,9 +2,11 @@ from fastapi import APIRouter
 
 from app.api.v1.endpoints.auth import auth_router
 from app.api.v1.endpoints.department import department_router
+from app.api.v1.endpoints.directory import directory_router
 from app.api.v1.endpoints.employees import employees_router
 from app.api.v1.endpoints.filters import filters_router
 from app.api.v1.endpoints.legal_entity import le_router
+from app.api.v1.endpoints.org import org_router
 from app.api.v1.endpoints.skills import skills_router
 
 v1_router = APIRouter()
@@ -14,3 +16,5 @@ v1_router.include_router(le_router, tags=["legal_entities"], prefix="/legal-enti
 v1_router.include_router(department_router, tags=["departments"], prefix="/departments")
 v1_router.include_router(skills_router, tags=["skills"], prefix="/skills")
 v1_router.include_router(filters_router, tags=["filters"], prefix="/filters")
+v1_router.include_router(directory_router, tags=["directory"], prefix="/directory")
+v1_router.include_router(org_router, tags=["org"], prefix="/org")
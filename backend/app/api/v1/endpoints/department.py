@@ -1,14 +1,25 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from starlette import status
 
+from app.core.config import settings
 from app.core.logger import get_logger
 from app.deps.department import get_department_service
 from app.enums import RoleEnum
-from app.schemas.department import DepartmentCreate, DepartmentRead, DepartmentReadSmall, DepartmentUpdate
+from app.schemas.department import (
+    DepartmentChildren,
+    DepartmentCreate,
+    DepartmentNode,
+    DepartmentRead,
+    DepartmentReadSmall,
+    DepartmentStats,
+    DepartmentUpdate,
+)
 from app.services.department_service import DepartmentService
 from app.utils.auth import require_roles
+from app.utils.etag import directory_etag
+from app.utils.responses import schema_response
 
 department_router = APIRouter()
 logger = get_logger()
@@ -18,11 +29,14 @@ logger = get_logger()
     "/",
     response_model=list[DepartmentReadSmall],
     summary="Получить все отделы",
-    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
 )
-async def read_departments(dep_service: DepartmentService = Depends(get_department_service)):
+async def read_departments(response: Response, dep_service: DepartmentService = Depends(get_department_service)):
     """Получает список всех отделов."""
-    return await dep_service.get_all_departments()
+    return schema_response(list[DepartmentReadSmall], await dep_service.get_all_departments(), response)
 
 
 @department_router.post(
@@ -37,6 +51,70 @@ async def create_department(data: DepartmentCreate, dep_service: DepartmentServi
     return await dep_service.create_department(data)
 
 
+@department_router.get(
+    "/roots",
+    response_model=list[DepartmentNode],
+    summary="Получить корневые отделы",
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
+)
+async def read_root_departments(
+    response: Response,
+    legal_entity_id: UUID | None = Query(None, description="Только отделы этого юрлица"),
+    dep_service: DepartmentService = Depends(get_department_service),
+):
+    """
+    Первый уровень оргструктуры: отделы без родителя с числом подотделов и сотрудников.
+    Следующие уровни загружаются через /departments/{id}/children по мере раскрытия узлов.
+    """
+    return schema_response(list[DepartmentNode], await dep_service.get_root_nodes(legal_entity_id), response)
+
+
+@department_router.get(
+    "/{department_id}/children",
+    response_model=DepartmentChildren,
+    summary="Получить подотделы отдела",
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
+)
+async def read_department_children(
+    department_id: UUID,
+    response: Response,
+    employees_limit: int = Query(
+        0, ge=0, le=settings.LIST_PAGE_SIZE_MAX, description="Сколько сотрудников отдела вернуть (0 — ни одного)"
+    ),
+    dep_service: DepartmentService = Depends(get_department_service),
+):
+    """
+    Раскрытие узла оргструктуры: непосредственные подотделы с числом подотделов и сотрудников
+    (в самом отделе и во всем поддереве) и, по запросу, первые сотрудники самого отдела.
+    """
+    return schema_response(DepartmentChildren, await dep_service.get_children(department_id, employees_limit), response)
+
+
+@department_router.get(
+    "/{department_id}/stats",
+    response_model=DepartmentStats,
+    summary="Получить численность отдела",
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
+)
+async def read_department_stats(
+    department_id: UUID, response: Response, dep_service: DepartmentService = Depends(get_department_service)
+):
+    """
+    Численность отдела: сотрудники самого отдела и всего поддерева (все и активные) и наличие руководителя.
+    Счетчики поддерживаются в БД при изменении сотрудников и оргструктуры, чтение — одна строка.
+    """
+    return schema_response(DepartmentStats, await dep_service.get_stats(department_id), response)
+
+
 @department_router.get(
     "/{department_id}",
     response_model=DepartmentRead,
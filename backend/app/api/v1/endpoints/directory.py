@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.enums import RoleEnum
+from app.services.directory_snapshot import directory_snapshot
+from app.utils.auth import require_roles
+from app.utils.etag import etag_matches
+
+directory_router = APIRouter()
+
+
+@directory_router.get(
+    "/snapshot",
+    summary="Получить снапшот справочника",
+    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def get_directory_snapshot(request: Request):
+    """
+    Возвращает весь публичный справочник одним документом: активных сотрудников,
+    департаменты, юрлица и навыки (плоскими списками со ссылками по id).
+    Ответ заранее сжат (br или gzip по Accept-Encoding) и отдается из памяти без обращения к БД.
+    ETag — версия снапшота; при совпадении If-None-Match возвращается 304.
+    """
+    snapshot = await directory_snapshot.get()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding, body = snapshot.negotiate(request.headers.get("accept-encoding"))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
@@ -1,24 +1,60 @@
+from datetime import date
 from io import BytesIO
 from uuid import UUID
 
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.util import await_only
 from starlette.responses import StreamingResponse
 from watchfiles import awatch
 
+from app.core.config import settings
 from app.core.logger import get_logger
 from app.deps.avatar import get_avatar_service
+from app.deps.org import get_org_service
 from app.deps.user import get_user_service
-from app.enums import AvatarModerationStatusEnum, RoleEnum
+from app.enums import (
+    AvatarModerationStatusEnum,
+    ExportFormatEnum,
+    RoleEnum,
+    SearchFacetEnum,
+    SearchModeEnum,
+    StreamFormatEnum,
+    UserSortEnum,
+)
 from app.models import User
 from app.schemas.avatar import AvatarModeration, AvatarRead
-from app.schemas.skill import SetSkillsRequest
-from app.schemas.user import UserRead, UserUpdate, UserUpdateAdmin
+from app.schemas.org import OrgChainLink
+from app.schemas.skill import SetSkillsBulkRequest, SetSkillsBulkResult, SetSkillsRequest
+from app.schemas.user import (
+    UserBatchSearchRequest,
+    UserBatchSearchResult,
+    UserBulkDeactivateRequest,
+    UserBulkDeactivateResult,
+    UserBulkUpdateRequest,
+    UserBulkUpdateResult,
+    UserChangesPage,
+    UserFulltextPage,
+    UserImportJobRead,
+    UserListPage,
+    UserProfile,
+    UserRead,
+    UserSearchHit,
+    UserSearchPage,
+    UserSuggestion,
+    UserUpdate,
+    UserUpdateAdmin,
+)
 from app.services.avatar_service import AvatarService
 from app.services.health_monitor import check_s3_health
+from app.services.org_service import OrgService
+from app.services.search_cache import search_result_cache
+from app.services.user_import_service import user_import_jobs
 from app.services.user_service import UserService
 from app.utils.auth import get_current_user_by_credentials, require_roles, require_self
+from app.utils.etag import directory_etag
+from app.utils.responses import dto_response, schema_response
+from app.utils.tabular import EXPORT_MEDIA_TYPES
 
 employees_router = APIRouter()
 logger = get_logger()
@@ -26,12 +62,112 @@ logger = get_logger()
 
 @employees_router.get(
     "/",
-    response_model=list[UserRead],
+    response_model=list[UserRead] | UserListPage,
     summary="Получить всех сотрудников",
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
+)
+async def read_employees(
+    response: Response,
+    sort: UserSortEnum | None = Query(None, description="Порядок: last_name, -last_name, created_at, -created_at"),
+    limit: int | None = Query(None, gt=0, le=settings.LIST_PAGE_SIZE_MAX, description="Размер страницы"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы из предыдущего ответа"),
+    fields: list[str] = Query(default=None, description="Поля в ответе, например fields=id,first_name,last_name"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """
+    Без параметров возвращает полный список сотрудников.
+    С любым из sort, limit, cursor, fields — страницу {items, next_cursor} с keyset-пагинацией,
+    в которой у сотрудников только поля из fields.
+    """
+    if sort is None and limit is None and cursor is None and not fields:
+        return dto_response(await user_service.get_all_users(), response)
+    return await user_service.list_users_page(
+        fields=fields, sort=sort or UserSortEnum.LAST_NAME, limit=limit, cursor=cursor
+    )
+
+
+@employees_router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    summary="Потоковая выгрузка всех сотрудников",
     dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
 )
-async def read_employees(user_service: UserService = Depends(get_user_service)):
-    return await user_service.get_all_users()
+async def stream_employees(
+    format: StreamFormatEnum = Query(StreamFormatEnum.NDJSON, description="ndjson или json"),
+    active_only: bool = Query(False, description="Только активные сотрудники"),
+    fields: list[str] = Query(default=None, description="Поля в ответе, например fields=id,first_name,last_name"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """
+    Выгружает весь справочник, читая БД порциями через серверный курсор.
+    Память процесса не растет с числом сотрудников: ответ отправляется по мере чтения.
+    """
+    media_type = "application/x-ndjson" if format == StreamFormatEnum.NDJSON else "application/json"
+    return StreamingResponse(user_service.stream_users(format, fields, active_only), media_type=media_type)
+
+
+@employees_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Выгрузка справочника в CSV, XLSX или Parquet",
+    dependencies=[Depends(require_roles(RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def export_employees(
+    format: ExportFormatEnum = Query(ExportFormatEnum.CSV, description="csv, xlsx или parquet"),
+    active_only: bool = Query(False, description="Только активные сотрудники"),
+    fields: list[str] = Query(default=None, description="Колонки файла, например fields=id,first_name,last_name"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """
+    Выгружает весь справочник файлом для скачивания, читая БД порциями через серверный курсор.
+    CSV и Parquet отправляются по мере чтения; XLSX собирается во временном файле на диске.
+    Навыки выводятся названиями через ';'.
+    """
+    filename = f"employees-{date.today().isoformat()}.{format.value}"
+    return StreamingResponse(
+        user_service.export_users(format, fields, active_only),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@employees_router.get(
+    "/changes",
+    response_model=UserChangesPage,
+    summary="Изменения в справочнике сотрудников",
+    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def read_employee_changes(
+    since: str | None = Query(None, description="Токен из предыдущего ответа; без него — все сотрудники"),
+    limit: int | None = Query(None, gt=0, le=settings.LIST_PAGE_SIZE_MAX, description="Размер страницы"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """
+    Возвращает сотрудников, созданных, измененных или деактивированных с момента выдачи токена since.
+    Пока has_more — запрашивать дальше с next_token; затем хранить next_token до следующей синхронизации.
+    """
+    return await user_service.get_changes(since, limit)
+
+
+@employees_router.get(
+    "/suggest",
+    response_model=list[UserSuggestion],
+    summary="Подсказки сотрудников при наборе",
+    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def suggest_employees(
+    q: str = Query(..., min_length=1),
+    limit: int | None = Query(None, gt=0, le=settings.SUGGEST_LIMIT_MAX, description="Количество подсказок"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """
+    Возвращает первые совпадения по префиксам имени, фамилии и email активных сотрудников.
+    Отвечает из индекса в памяти, поэтому подходит для вызова на каждое нажатие клавиши.
+    """
+    return user_service.suggest_users(q, limit)
 
 
 ALLOWED_IMAGE_TYPES = [
@@ -105,6 +241,40 @@ async def read_employee(user_id: UUID, user_service: UserService = Depends(get_u
     return await user_service.get_user(user_id)
 
 
+@employees_router.get(
+    "/{user_id}/profile",
+    response_model=UserProfile,
+    summary="Получить карточку сотрудника для страницы профиля",
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
+)
+async def read_employee_profile(
+    user_id: UUID, response: Response, user_service: UserService = Depends(get_user_service)
+):
+    """
+    Возвращает сотрудника вместе с отделом, цепочкой родительских отделов, руководителем,
+    юрлицом и текущим аватаром. Все данные читаются одним SQL-запросом.
+    """
+    return schema_response(UserProfile, await user_service.get_profile(user_id), response)
+
+
+@employees_router.get(
+    "/{user_id}/chain",
+    response_model=list[OrgChainLink],
+    summary="Получить цепочку руководителей сотрудника",
+    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def read_employee_chain(user_id: UUID, response: Response, org_service: OrgService = Depends(get_org_service)):
+    """
+    Возвращает руководителей отдела сотрудника и отделов выше, от ближайшего к верхнему.
+    Отвечает по графу оргструктуры в памяти, без запросов к БД; после изменения оргструктуры
+    граф обновляется с небольшой задержкой.
+    """
+    return schema_response(list[OrgChainLink], await org_service.get_reporting_chain(user_id), response)
+
+
 @employees_router.put(
     "/{user_id}",
     response_model=UserRead,
@@ -232,12 +402,24 @@ async def deactivate_employee(user_id: UUID, user_service: UserService = Depends
 
 @employees_router.get(
     "/active/",
-    response_model=list[UserRead],
+    response_model=list[UserRead] | UserListPage,
     summary="Получить всех активных сотрудников",
     dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
 )
-async def read_active_employees(user_service: UserService = Depends(get_user_service)):
-    return await user_service.get_all_active_users()
+async def read_active_employees(
+    response: Response,
+    sort: UserSortEnum | None = Query(None, description="Порядок: last_name, -last_name, created_at, -created_at"),
+    limit: int | None = Query(None, gt=0, le=settings.LIST_PAGE_SIZE_MAX, description="Размер страницы"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы из предыдущего ответа"),
+    fields: list[str] = Query(default=None, description="Поля в ответе, например fields=id,first_name,last_name"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """Как GET /employees/, но только активные сотрудники."""
+    if sort is None and limit is None and cursor is None and not fields:
+        return dto_response(await user_service.get_all_active_users(), response)
+    return await user_service.list_users_page(
+        fields=fields, sort=sort or UserSortEnum.LAST_NAME, limit=limit, cursor=cursor, active_only=True
+    )
 
 
 @employees_router.get(
@@ -252,16 +434,22 @@ async def read_cities(user_service: UserService = Depends(get_user_service)):
 
 @employees_router.get(
     "/search/",
-    response_model=list[UserRead],
+    response_model=list[UserRead] | UserSearchPage | UserFulltextPage | list[UserSearchHit],
     summary="Поиск сотрудников по имени, фамилии, должности или email",
     dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
 )
 async def search_employees(
+    response: Response,
     q: str = Query(...),
     cities: list[str] = Query(default=None),
     departments: list[UUID] = Query(default=None),
     legal_entities: list[UUID] = Query(default=None),
     skills: list[str] = Query(default=None),
+    mode: SearchModeEnum = Query(SearchModeEnum.FUZZY, description="Режим поиска"),
+    threshold: float | None = Query(None, ge=0, le=1, description="Порог схожести (режимы trigram и index)"),
+    limit: int | None = Query(None, gt=0, le=settings.SEARCH_PAGE_SIZE_MAX, description="Размер страницы"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы из предыдущего ответа"),
+    facets: list[SearchFacetEnum] = Query(default=None, description="Фасеты для подсчета (режимы trigram и fulltext)"),
     user_service: UserService = Depends(get_user_service),
 ):
     """
@@ -269,9 +457,159 @@ async def search_employees(
     args:
         q (str): Строка поиска.
         city (Optional[str]): Название города для фильтрации.
+        mode (SearchModeEnum): fuzzy — полный список, отсортированный по схожести;
+            trigram — отбор по индексу с порогом threshold и постраничной выдачей;
+            index — лучшие limit совпадений из индекса в памяти, без запроса к БД;
+            fulltext — полнотекстовый поиск с ранжированием и смещениями подсветки, постранично.
+        facets (list[SearchFacetEnum]): Для постраничных режимов — посчитать совпадения по значениям фасетов;
+            считаются только для первой страницы, со следующими страницами facets не возвращаются.
     returns:
-        Sequence[User]: Список пользователей, соответствующих критериям поиска.
+        list[UserRead] | UserSearchPage | list[UserSearchHit]: Результаты в формате выбранного режима.
     """
-    return await user_service.search_users(
+    if facets and mode not in (SearchModeEnum.TRIGRAM, SearchModeEnum.FULLTEXT):
+        raise HTTPException(status_code=400, detail="Фасеты поддерживаются только в режимах trigram и fulltext")
+
+    if mode == SearchModeEnum.INDEX:
+        return user_service.search_users_index(
+            search_query=q,
+            threshold=threshold,
+            limit=limit,
+            cities=cities,
+            skills=skills,
+            departments=departments,
+            legal_entities=legal_entities,
+        )
+
+    if mode == SearchModeEnum.TRIGRAM:
+        return await user_service.search_users_page(
+            search_query=q,
+            threshold=threshold,
+            limit=limit,
+            cursor=cursor,
+            cities=cities,
+            skills=skills,
+            departments=departments,
+            legal_entities=legal_entities,
+            facets=facets,
+        )
+
+    if mode == SearchModeEnum.FULLTEXT:
+        return await user_service.search_users_fulltext(
+            search_query=q,
+            limit=limit,
+            cursor=cursor,
+            cities=cities,
+            skills=skills,
+            departments=departments,
+            legal_entities=legal_entities,
+            facets=facets,
+        )
+
+    users = await user_service.search_users(
         search_query=q, cities=cities, skills=skills, departments=departments, legal_entities=legal_entities
     )
+    return dto_response(users, response)
+
+
+@employees_router.get(
+    "/search/cache",
+    summary="Статистика кэша поиска",
+    dependencies=[Depends(require_roles(RoleEnum.SYSTEM_ADMIN))],
+)
+async def search_cache_stats():
+    """Возвращает версию справочника, размер кэша результатов поиска и счетчики попаданий и промахов."""
+    return search_result_cache.stats()
+
+
+@employees_router.post(
+    "/search/batch",
+    response_model=list[UserBatchSearchResult],
+    summary="Пакетный поиск сотрудников по списку имен или email",
+    dependencies=[Depends(require_roles(RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def search_employees_batch(
+    request: UserBatchSearchRequest, user_service: UserService = Depends(get_user_service)
+):
+    """
+    Сопоставляет список имен или email со справочником одним запросом к БД.
+    Для каждого входного запроса возвращает до limit лучших кандидатов со значением схожести.
+    """
+    return await user_service.search_users_batch(request.queries, limit=request.limit, threshold=request.threshold)
+
+
+@employees_router.post(
+    "/import",
+    response_model=UserImportJobRead,
+    status_code=202,
+    summary="Массовый импорт сотрудников из CSV или XLSX",
+    dependencies=[Depends(require_roles(RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def import_employees(file: UploadFile = File(...)):
+    """
+    Создает сотрудников из файла .csv (UTF-8, разделитель , ; или табуляция) или .xlsx (первый лист).
+    Первая строка — заголовки: email, password, first_name, last_name обязательны; position, department,
+    legal_entity, city, phone, telegram, mattermost, bio, birthday (ГГГГ-ММ-ДД) и skills (через ';') — нет.
+    Отдел, юрлицо и навыки указываются названиями. Строки с ошибками не создаются и перечисляются
+    в отчете с номером строки файла, остальные строки импортируются.
+
+    Файл разбирается сразу (ошибка формата — 400), а импорт выполняется в фоне: ответ содержит задачу,
+    ее состояние и отчет возвращает GET /employees/import/{job_id}.
+    """
+    return await user_import_jobs.submit(file.file, file.filename)
+
+
+@employees_router.get(
+    "/import/{job_id}",
+    response_model=UserImportJobRead,
+    summary="Получить состояние и отчет импорта сотрудников",
+    dependencies=[Depends(require_roles(RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def read_import_job(job_id: UUID):
+    """Возвращает задачу импорта; отчет заполнен, когда status = done."""
+    return user_import_jobs.get(job_id)
+
+
+@employees_router.patch(
+    "/bulk",
+    response_model=UserBulkUpdateResult,
+    summary="Массово изменить данные сотрудников",
+    dependencies=[Depends(require_roles(RoleEnum.SYSTEM_ADMIN, RoleEnum.HR_ADMIN))],
+)
+async def bulk_update_employees(request: UserBulkUpdateRequest, user_service: UserService = Depends(get_user_service)):
+    """
+    Применяет изменения к нескольким сотрудникам (например, перевод в другой отдел) в одной транзакции.
+    В каждом элементе передаются id и только изменяемые поля. Если хотя бы одно изменение нарушает
+    ограничения БД (занятый email, несуществующий отдел), не применяется ни одно.
+    """
+    return await user_service.bulk_update_users(request.items)
+
+
+@employees_router.post(
+    "/bulk-deactivate",
+    response_model=UserBulkDeactivateResult,
+    summary="Массово деактивировать сотрудников",
+    dependencies=[Depends(require_roles(RoleEnum.SYSTEM_ADMIN, RoleEnum.HR_ADMIN))],
+)
+async def bulk_deactivate_employees(
+    request: UserBulkDeactivateRequest, user_service: UserService = Depends(get_user_service)
+):
+    """
+    Помечает сотрудников неактивными в одной транзакции. Отделы, которыми руководили
+    деактивированные сотрудники, остаются без руководителя.
+    """
+    return await user_service.bulk_deactivate_users(request.ids)
+
+
+@employees_router.put(
+    "/set_skills/bulk",
+    response_model=SetSkillsBulkResult,
+    summary="Массово установить навыки сотрудникам",
+    dependencies=[Depends(require_roles(RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def bulk_set_skills(request: SetSkillsBulkRequest, user_service: UserService = Depends(get_user_service)):
+    """
+    Устанавливает наборы навыков нескольким сотрудникам (например, при загрузке матрицы компетенций)
+    в одной транзакции. Навыки указываются названиями; навыки сотрудника, не попавшие в набор, снимаются.
+    Если хотя бы один навык не найден, не применяется ни один набор.
+    """
+    return await user_service.bulk_set_skills(request.items)
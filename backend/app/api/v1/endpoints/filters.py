@@ -10,6 +10,7 @@ from app.services.legal_entity_service import LegalEntityService
 from app.services.skill_service import SkillService
 from app.services.user_service import UserService
 from app.utils.auth import require_roles
+from app.utils.etag import directory_etag
 
 filters_router = APIRouter()
 
@@ -17,7 +18,10 @@ filters_router = APIRouter()
 @filters_router.get(
     "/options",
     summary="Получить опции для фильтров",
-    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
 )
 async def get_filter_options(
     user_service: UserService = Depends(get_user_service),
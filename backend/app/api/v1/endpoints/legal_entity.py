@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from starlette import status
 
 from app.core.logger import get_logger
@@ -9,6 +9,8 @@ from app.enums import RoleEnum
 from app.schemas.legal_entity import LegalEntityCreate, LegalEntityRead, LegalEntityUpdate
 from app.services.legal_entity_service import LegalEntityService
 from app.utils.auth import require_roles
+from app.utils.etag import directory_etag
+from app.utils.responses import schema_response
 
 le_router = APIRouter()
 logger = get_logger()
@@ -18,11 +20,14 @@ logger = get_logger()
     "/",
     response_model=list[LegalEntityRead],
     summary="Получить все юридические лица",
-    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
 )
-async def read_legal_entities(le_service: LegalEntityService = Depends(get_le_service)):
+async def read_legal_entities(response: Response, le_service: LegalEntityService = Depends(get_le_service)):
     """Получает список всех юридических лиц."""
-    return await le_service.get_all_legal_entities()
+    return schema_response(list[LegalEntityRead], await le_service.get_all_legal_entities(), response)
 
 
 @le_router.post(
@@ -0,0 +1,50 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.deps.org import get_org_service
+from app.enums import RoleEnum
+from app.schemas.org import OrgCommonManager, OrgTreeLegalEntity
+from app.services.org_service import OrgService
+from app.utils.auth import require_roles
+from app.utils.etag import directory_etag
+from app.utils.responses import schema_response
+
+org_router = APIRouter()
+
+
+@org_router.get(
+    "/tree",
+    response_model=list[OrgTreeLegalEntity],
+    summary="Получить дерево оргструктуры",
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
+)
+async def read_org_tree(response: Response, org_service: OrgService = Depends(get_org_service)):
+    """
+    Возвращает юрлица с вложенными деревьями отделов. Для каждого отдела — руководитель
+    и численность (самого отдела и вместе с подотделами); списки сотрудников не передаются.
+    """
+    return schema_response(list[OrgTreeLegalEntity], await org_service.get_tree(), response)
+
+
+@org_router.get(
+    "/common-manager",
+    response_model=OrgCommonManager,
+    summary="Найти общего руководителя двух сотрудников",
+    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+)
+async def read_common_manager(
+    response: Response,
+    a: UUID = Query(..., description="ID первого сотрудника"),
+    b: UUID = Query(..., description="ID второго сотрудника"),
+    org_service: OrgService = Depends(get_org_service),
+):
+    """
+    Возвращает наименьший общий отдел двух сотрудников и ближайшего руководителя (кроме них самих)
+    начиная с этого отдела вверх. Отвечает по графу оргструктуры в памяти, без запросов к БД;
+    после изменения оргструктуры граф обновляется с небольшой задержкой.
+    """
+    return schema_response(OrgCommonManager, await org_service.get_common_manager(a, b), response)
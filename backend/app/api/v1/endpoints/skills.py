@@ -9,6 +9,7 @@ from app.enums import RoleEnum
 from app.schemas.skill import SkillCreate, SkillRead, SkillUpdate
 from app.services.skill_service import SkillService
 from app.utils.auth import require_roles
+from app.utils.etag import directory_etag
 
 skills_router = APIRouter()
 logger = get_logger()
@@ -18,7 +19,10 @@ logger = get_logger()
     "/",
     response_model=list[SkillRead],
     summary="Получить все навыки сотрудников",
-    dependencies=[Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN))],
+    dependencies=[
+        Depends(require_roles(RoleEnum.EMPLOYEE, RoleEnum.HR_ADMIN, RoleEnum.SYSTEM_ADMIN)),
+        Depends(directory_etag),
+    ],
 )
 async def get_all_skills(skill_service: SkillService = Depends(get_skill_service)):
     return await skill_service.get_all_skills()
@@ -0,0 +1,147 @@
+"""
+Микробенчмарк кодирования больших списков: стандартный путь FastAPI (response_model:
+валидация, jsonable-словари, json.dumps) против DTOJSONResponse и SchemaJSONResponse.
+
+БД не нужна: эндпоинты отдают заранее построенные в памяти ORM-объекты и DTO,
+запросы идут в приложение напрямую через ASGI, так что измеряется только путь ответа.
+
+Запуск:
+    python -m app.benchmarks.list_encoding --users 2000 --requests 50
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+import httpx
+from fastapi import FastAPI, Response
+
+from app.enums import EmployeeStatusEnum, RoleEnum
+from app.models import Department, LegalEntity, User
+from app.models.skill import Skill
+from app.repositories.user_repository import UserRow
+from app.schemas.legal_entity import LegalEntityRead
+from app.schemas.user import UserRead
+from app.utils.responses import dto_response, schema_response
+
+
+def build_directory(users_count: int, skills_per_user: int = 3, departments_count: int = 50):
+    """Справочник в памяти: пользователи (ORM и DTO) и юрлица с отделами и сотрудниками."""
+    now = datetime.now(timezone.utc)
+    skills = [Skill(id=uuid.uuid4(), name=f"Skill {i}") for i in range(skills_per_user * 4)]
+    legal_entity = LegalEntity(id=uuid.uuid4(), name="ООО Бенчмарк", created_at=now, updated_at=now)
+    departments = [
+        Department(id=uuid.uuid4(), name=f"Отдел {i}", legal_entity_id=legal_entity.id, created_at=now, updated_at=now)
+        for i in range(departments_count)
+    ]
+
+    users, rows = [], []
+    for i in range(users_count):
+        department = departments[i % departments_count]
+        user_skills = skills[i % 4 * skills_per_user : (i % 4 + 1) * skills_per_user]
+        user = User(
+            id=uuid.uuid4(),
+            first_name="Иван",
+            last_name=f"Петров{i}",
+            email=f"user{i}@example.com",
+            position="Инженер",
+            department_id=department.id,
+            role=RoleEnum.EMPLOYEE,
+            city="Екатеринбург",
+            phone="+7 900 000-00-00",
+            telegram=f"@user{i}",
+            bio="Короткое описание сотрудника",
+            birthday=date(1990, 1, 1),
+            employee_status=EmployeeStatusEnum.ACTIVE,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+            skills=user_skills,
+            current_avatar=None,
+        )
+        department.employees.append(user)
+        users.append(user)
+        rows.append(
+            UserRow(
+                user.id,
+                user.first_name,
+                user.last_name,
+                user.email,
+                user.position,
+                user.department_id,
+                user.role,
+                user.city,
+                user.phone,
+                user.telegram,
+                None,
+                user.bio,
+                [{"id": str(skill.id), "name": skill.name} for skill in user_skills],
+                user.birthday,
+                None,
+                None,
+                user.employee_status,
+                True,
+                now,
+                now,
+            )
+        )
+    legal_entity.departments = departments
+    return users, rows, [legal_entity]
+
+
+def build_app(users, rows, legal_entities) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/employees/default", response_model=list[UserRead])
+    async def employees_default():
+        return users
+
+    @app.get("/employees/dto", response_model=list[UserRead])
+    async def employees_dto(response: Response):
+        return dto_response(rows, response)
+
+    @app.get("/legal-entities/default", response_model=list[LegalEntityRead])
+    async def legal_entities_default():
+        return legal_entities
+
+    @app.get("/legal-entities/schema", response_model=list[LegalEntityRead])
+    async def legal_entities_schema(response: Response):
+        return schema_response(list[LegalEntityRead], legal_entities, response)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests_count: int) -> dict:
+    body = (await client.get(path)).content  # прогрев
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        response = await client.get(path)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return {"rps": requests_count / elapsed, "ms": elapsed / requests_count * 1000, "kb": len(body) / 1024}
+
+
+async def main(users_count: int, requests_count: int):
+    users, rows, legal_entities = build_directory(users_count)
+    transport = httpx.ASGITransport(app=build_app(users, rows, legal_entities))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"users: {users_count}, requests: {requests_count}\n")
+        print(f"{'endpoint':<26}{'req/s':>10}{'ms/req':>10}{'body_kb':>10}")
+        results = {}
+        for path in ("/employees/default", "/employees/dto", "/legal-entities/default", "/legal-entities/schema"):
+            results[path] = result = await measure(client, path, requests_count)
+            print(f"{path:<26}{result['rps']:>10.1f}{result['ms']:>10.2f}{result['kb']:>10.0f}")
+
+    employees = results["/employees/dto"]["rps"] / results["/employees/default"]["rps"]
+    tree = results["/legal-entities/schema"]["rps"] / results["/legal-entities/default"]["rps"]
+    print(f"\n/employees/: x{employees:.1f}, /legal-entities/: x{tree:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000, help="Количество сотрудников в справочнике")
+    parser.add_argument("--requests", type=int, default=50, help="Количество запросов на каждый эндпоинт")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.requests))
@@ -0,0 +1,88 @@
+"""
+Сравнение путей чтения списка сотрудников: ORM + Pydantic против Core select + DTO.
+
+ORM-путь повторяет прежнюю выдачу GET /employees/: User с тремя selectinload,
+затем валидация в list[UserRead] и сериализация в JSON, как это делает FastAPI.
+DTO-путь — текущий: явные колонки, навыки через json_agg, UserRow и прямой json.dumps.
+
+Запуск (нужна БД из .env, как для приложения):
+    python -m app.benchmarks.user_read_path --repeat 20
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps.db import engine
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import UserRead
+from app.utils.responses import dumps
+
+_users_adapter = TypeAdapter(list[UserRead])
+
+
+async def orm_path(session: AsyncSession) -> tuple[int, int]:
+    users = await UserRepository(session).get_all_users()
+    body = _users_adapter.dump_json(_users_adapter.validate_python(users, from_attributes=True))
+    return len(users), len(body)
+
+
+async def dto_path(session: AsyncSession) -> tuple[int, int]:
+    users = await UserRepository(session).get_all_user_rows()
+    body = dumps(users).encode()
+    return len(users), len(body)
+
+
+async def measure(path, repeat: int) -> dict:
+    """Средние время и CPU на строку и пик выделенной памяти за один вызов."""
+    # Прогрев: кэш скомпилированных запросов и соединение в пуле
+    async with AsyncSession(engine) as session:
+        await path(session)
+
+    wall = cpu = 0.0
+    peak = rows = size = 0
+    for _ in range(repeat):
+        # Новая сессия на каждый прогон, как на каждый запрос в приложении
+        async with AsyncSession(engine) as session:
+            tracemalloc.start()
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            rows, size = await path(session)
+            wall += time.perf_counter() - wall_start
+            cpu += time.process_time() - cpu_start
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    per_row = max(rows, 1) * repeat
+    return {
+        "rows": rows,
+        "body_kb": size / 1024,
+        "wall_us_per_row": wall / per_row * 1e6,
+        "cpu_us_per_row": cpu / per_row * 1e6,
+        "peak_kb": peak / 1024,
+        "peak_bytes_per_row": peak / max(rows, 1),
+    }
+
+
+async def main(repeat: int):
+    results = {"orm": await measure(orm_path, repeat), "dto": await measure(dto_path, repeat)}
+    await engine.dispose()
+
+    columns = ("rows", "body_kb", "wall_us_per_row", "cpu_us_per_row", "peak_kb", "peak_bytes_per_row")
+    print(f"{'path':<6}" + "".join(f"{column:>20}" for column in columns))
+    for name, result in results.items():
+        print(f"{name:<6}" + "".join(f"{result[column]:>20.1f}" for column in columns))
+    orm, dto = results["orm"], results["dto"]
+    print(
+        f"\nCPU на строку: x{orm['cpu_us_per_row'] / dto['cpu_us_per_row']:.1f}, "
+        f"пик памяти: x{orm['peak_kb'] / dto['peak_kb']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Количество прогонов каждого пути")
+    asyncio.run(main(parser.parse_args().repeat))
@@ -51,6 +51,49 @@ class Settings(BaseSettings):
     PROMETHEUS_HOST: str
     PROMETHEUS_PORT: int
 
+    # --------------------------------------------------------------------------
+    # Настройки поиска сотрудников
+    # --------------------------------------------------------------------------
+    SEARCH_SIMILARITY_THRESHOLD: float = Field(0.3, ge=0, le=1, description="Порог word_similarity для pg_trgm")
+    SEARCH_PAGE_SIZE: int = Field(20, gt=0, description="Размер страницы поиска по умолчанию")
+    SEARCH_PAGE_SIZE_MAX: int = Field(100, gt=0, description="Максимальный размер страницы поиска")
+    SUGGEST_LIMIT: int = Field(8, gt=0, description="Количество подсказок по умолчанию")
+    SUGGEST_LIMIT_MAX: int = Field(20, gt=0, description="Максимальное количество подсказок")
+    SUGGEST_LATENCY_BUDGET_MS: float = Field(5.0, gt=0, description="Бюджет времени на подбор подсказок, мс")
+    SEARCH_BATCH_SIZE_MAX: int = Field(500, gt=0, description="Максимальное количество запросов в пакетном поиске")
+    LIST_PAGE_SIZE: int = Field(50, gt=0, description="Размер страницы списка сотрудников по умолчанию")
+    LIST_PAGE_SIZE_MAX: int = Field(500, gt=0, description="Максимальный размер страницы списка сотрудников")
+    STREAM_CHUNK_SIZE: int = Field(1000, gt=0, description="Строк за одну выборку из серверного курсора")
+    SEARCH_CACHE_SIZE: int = Field(512, gt=0, description="Количество запросов в кэше результатов поиска")
+    SEARCH_CACHE_TTL_SECONDS: float = Field(60.0, gt=0, description="Время жизни записи кэша поиска, с")
+
+    # --------------------------------------------------------------------------
+    # Массовый импорт и изменение сотрудников
+    # --------------------------------------------------------------------------
+    IMPORT_ROWS_MAX: int = Field(10000, gt=0, description="Максимальное количество строк в файле импорта")
+    PASSWORD_HASH_WORKERS: int = Field(4, gt=0, description="Процессов для хэширования паролей при импорте")
+    IMPORT_JOB_TTL_SECONDS: int = Field(
+        3600, gt=0, description="Сколько хранить в памяти завершенную задачу импорта вместе с отчетом"
+    )
+    BULK_UPDATE_SIZE_MAX: int = Field(1000, gt=0, description="Максимум сотрудников в одном массовом изменении")
+
+    # --------------------------------------------------------------------------
+    # Снапшот справочника
+    # --------------------------------------------------------------------------
+    SNAPSHOT_REBUILD_DELAY_SECONDS: float = Field(
+        1.0, ge=0, description="Задержка перед пересборкой снапшота, чтобы объединить серию изменений, с"
+    )
+    SNAPSHOT_DIR: str | None = Field(
+        None, description="Каталог, куда дополнительно записываются сжатые файлы снапшота (не задан — только память)"
+    )
+
+    # --------------------------------------------------------------------------
+    # Граф оргструктуры в памяти
+    # --------------------------------------------------------------------------
+    ORG_GRAPH_REBUILD_DELAY_SECONDS: float = Field(
+        0.2, ge=0, description="Задержка перед пересборкой графа оргструктуры после изменения справочника, с"
+    )
+
     @computed_field
     @property
     def DATABASE_URL_ASYNC(self) -> str:
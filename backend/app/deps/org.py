@@ -0,0 +1,10 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps.db import get_db
+from app.services.org_service import OrgService
+
+
+async def get_org_service(db: AsyncSession = Depends(get_db)) -> OrgService:
+    """Зависимость, предоставляющая экземпляр OrgService."""
+    return OrgService(db)
@@ -16,6 +16,45 @@ class EmployeeStatusEnum(str, Enum):
     TRIP = "TRIP"  # В командировке
 
 
+class SearchModeEnum(str, Enum):
+    FUZZY = "fuzzy"  # similarity по всей таблице, список без пагинации
+    TRIGRAM = "trigram"  # отбор по GIN-индексу pg_trgm с порогом и keyset-пагинацией
+    INDEX = "index"  # триграммный индекс в памяти процесса, без обращения к БД
+    FULLTEXT = "fulltext"  # взвешенный tsvector с ранжированием ts_rank_cd и подсветкой
+
+
+class SearchFacetEnum(str, Enum):
+    CITIES = "cities"
+    SKILLS = "skills"
+    DEPARTMENTS = "departments"
+    LEGAL_ENTITIES = "legal_entities"
+
+
+class UserSortEnum(str, Enum):
+    LAST_NAME = "last_name"  # по фамилии, затем по id
+    LAST_NAME_DESC = "-last_name"
+    CREATED_AT = "created_at"  # по дате создания, затем по id
+    CREATED_AT_DESC = "-created_at"
+
+
+class StreamFormatEnum(str, Enum):
+    NDJSON = "ndjson"  # один JSON-объект на строку
+    JSON = "json"  # JSON-массив, записываемый по частям
+
+
+class ExportFormatEnum(str, Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+    PARQUET = "parquet"
+
+
+class ImportJobStatusEnum(str, Enum):
+    PENDING = "pending"  # файл разобран, задача ждет запуска
+    RUNNING = "running"  # проверка строк, хэширование паролей и загрузка
+    DONE = "done"  # отчет готов
+    FAILED = "failed"  # импорт прерван ошибкой, строки не загружены
+
+
 class AvatarModerationStatusEnum(str, Enum):
     PENDING = "PENDING"
     REJECTED = "REJECTED"
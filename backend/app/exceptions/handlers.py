@@ -19,7 +19,7 @@ from app.exceptions.legal_entity import (
     LegalEntityNotFound,
 )
 from app.exceptions.skill import SkillAlreadyExists, SkillError, SkillNotFound
-from app.exceptions.user import UserAlreadyExists, UserError, UserNotFound
+from app.exceptions.user import ImportJobNotFound, UserAlreadyExists, UserError, UserNotFound
 
 logger = get_logger()
 
@@ -71,7 +71,7 @@ async def skill_error_handler(request: Request, exc: SkillError):
 
 
 async def user_error_handler(request: Request, exc: UserError):
-    if isinstance(exc, UserNotFound):
+    if isinstance(exc, (UserNotFound, ImportJobNotFound)):
         status_code = 404
     elif isinstance(exc, UserAlreadyExists):
         status_code = 409
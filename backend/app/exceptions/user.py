@@ -26,3 +26,31 @@ class UserAlreadyExists(UserError):
             super().__init__("User already exists")
         else:
             super().__init__(f"User already exists: {identifier}")
+
+
+class UnknownUserFields(UserError):
+    def __init__(self, fields: list[str]):
+        super().__init__(f"Unknown user fields: {', '.join(fields)}")
+
+
+class InvalidCursor(UserError):
+    def __init__(self, cursor: str | None = None):
+        if cursor is None:
+            super().__init__("Invalid pagination cursor")
+        else:
+            super().__init__(f"Invalid pagination cursor: {cursor}")
+
+
+class InvalidImportFile(UserError):
+    def __init__(self, reason: str):
+        super().__init__(f"Invalid import file: {reason}")
+
+
+class ImportJobNotFound(UserError):
+    def __init__(self, job_id: UUID):
+        super().__init__(f"Import job not found: {job_id}")
+
+
+class DuplicateBulkItems(UserError):
+    def __init__(self, user_ids: list[UUID]):
+        super().__init__(f"Duplicate user ids in bulk request: {', '.join(map(str, user_ids))}")
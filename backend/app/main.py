@@ -21,8 +21,13 @@ from app.exceptions.legal_entity import LegalEntityError
 from app.exceptions.skill import SkillError
 from app.exceptions.user import UserError
 from app.middlewares.limit_upload import LimitUploadSizeMiddleware
+from app.services.directory_snapshot import directory_snapshot
 from app.services.health_monitor import prometheus_monitor, s3_monitor
+from app.services.org_graph import org_graph
+from app.services.search_index import user_search_index
+from app.services.user_import_service import user_import_jobs
 from app.startup_checks import check_postgres, init_default_admins
+from app.utils.password import shutdown_hash_pool
 
 logger = get_logger()
 
@@ -32,6 +37,9 @@ async def lifespan(_: FastAPI):
     await check_postgres()
     await init_default_admins(engine)
     logger.info("Default administrators initialized.")
+    await user_search_index.load(engine)
+    await directory_snapshot.start(engine)
+    await org_graph.start(engine)
 
     s3_task = asyncio.create_task(s3_monitor.healthcheck_loop(10))
     logger.info("Started S3  health monitoring")
@@ -40,6 +48,10 @@ async def lifespan(_: FastAPI):
     yield
     s3_task.cancel()
     prometheus_task.cancel()
+    await directory_snapshot.stop()
+    await org_graph.stop()
+    await user_import_jobs.stop()
+    shutdown_hash_pool()
     await prometheus_monitor.client.aclose()
     await engine.dispose()
     logger.info("Application shutdown complete.")
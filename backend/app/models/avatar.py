@@ -10,6 +10,8 @@ from app.models.mixins import TimeStampMixin
 class Avatar(TimeStampMixin, Base):
     __tablename__ = "avatars"
 
+    URL_PREFIX = "/api/employees/avatars/"
+
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     moderation_status = Column(
         ENUM(AvatarModerationStatusEnum),
@@ -27,4 +29,4 @@ class Avatar(TimeStampMixin, Base):
 
     @property
     def url(self) -> str:
-        return f"/api/employees/avatars/{self.s3_key}"
+        return f"{self.URL_PREFIX}{self.s3_key}"
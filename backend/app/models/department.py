@@ -1,9 +1,34 @@
-from sqlalchemy import UUID, Column, ForeignKey, String
+from sqlalchemy import UUID, Boolean, Column, ForeignKey, Index, Integer, String, Table, text
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
 from app.models.mixins import TimeStampMixin
 
+# Замыкание иерархии отделов: строка на каждую пару (предок, потомок), включая (отдел, отдел) с depth=0.
+# Поддерживается триггерами БД на departments, приложение таблицу только читает.
+department_closure = Table(
+    "department_closure",
+    Base.metadata,
+    Column("ancestor_id", UUID(as_uuid=True), ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True),
+    Column("descendant_id", UUID(as_uuid=True), ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True),
+    Column("depth", Integer, nullable=False),
+    Index("idx_department_closure_descendant_depth", "descendant_id", "depth"),
+)
+
+
+# Численность отделов: строка на каждый отдел, сотрудники самого отдела и всего его поддерева (все и активные).
+# Поддерживается триггерами БД на users и departments приращениями, приложение таблицу только читает.
+department_stats = Table(
+    "department_stats",
+    Base.metadata,
+    Column("department_id", UUID(as_uuid=True), ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True),
+    Column("headcount", Integer, nullable=False, server_default=text("0")),
+    Column("active_headcount", Integer, nullable=False, server_default=text("0")),
+    Column("total_headcount", Integer, nullable=False, server_default=text("0")),
+    Column("total_active_headcount", Integer, nullable=False, server_default=text("0")),
+    Column("has_manager", Boolean, nullable=False, server_default=text("false")),
+)
+
 
 class Department(TimeStampMixin, Base):
     __tablename__ = "departments"
@@ -36,3 +61,6 @@ class Department(TimeStampMixin, Base):
 
     # связь с сотрудниками отдела
     employees = relationship("User", back_populates="department", foreign_keys="User.department_id")
+
+    # Дочерние отделы при раскрытии узла оргструктуры
+    __table_args__ = (Index("idx_departments_parent_id", "parent_id"),)
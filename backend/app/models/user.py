@@ -1,12 +1,23 @@
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Index, String, Text, func, text
-from sqlalchemy.dialects.postgresql import ENUM, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Boolean, Column, Computed, Date, ForeignKey, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, ENUM, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.enums import EmployeeStatusEnum, RoleEnum
 from app.models.base import Base
 from app.models.mixins import TimeStampMixin
 from app.models.skill import user_skills_association
 
+# Поисковый документ: имя и фамилия (A) весомее должности (B), должность весомее email (C), город (D).
+# Текстовые поля индексируются русским и простым словарями, чтобы находить и словоформы, и точные слова.
+SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('russian', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(position, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(position, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(email, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(city, '')), 'D')"
+)
+
 
 class User(TimeStampMixin, Base):
     __tablename__ = "users"
@@ -33,6 +44,14 @@ class User(TimeStampMixin, Base):
     employee_status = Column(ENUM(EmployeeStatusEnum), nullable=True)  # Редактируемый пользователем статус
     # Активен ли сотрудник в системе (технический флаг)
     is_active = Column(Boolean, nullable=False, default=True, server_default=text("true"))
+    # Полнотекстовый документ, вычисляется БД; не загружается вместе с пользователем
+    search_document = deferred(Column(TSVECTOR, Computed(SEARCH_DOCUMENT_SQL, persisted=True)))
+    # Денормализованные ID навыков для фильтра @>, поддерживается триггерами на user_skills_association
+    skill_ids = deferred(Column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default=text("'{}'::uuid[]")))
+    # Номер транзакции последнего изменения строки (xid8 как bigint), ставится триггером; ключ дельта-синхронизации
+    change_xid = deferred(
+        Column(BigInteger, nullable=False, server_default=text("(pg_current_xact_id()::text)::bigint"))
+    )
 
     skills = relationship("Skill", secondary=user_skills_association, back_populates="users", lazy="selectin")
 
@@ -66,4 +85,12 @@ class User(TimeStampMixin, Base):
             postgresql_using="gin",
             postgresql_ops={"lower": "gin_trgm_ops"},
         ),
+        Index("idx_users_search_document", "search_document", postgresql_using="gin"),
+        Index("idx_users_skill_ids", "skill_ids", postgresql_using="gin"),
+        # Ключи keyset-пагинации списка сотрудников
+        Index("idx_users_last_name_id", "last_name", "id"),
+        Index("idx_users_created_at_id", "created_at", "id"),
+        Index("idx_users_change_xid", "change_xid", "id"),
+        # Сотрудники и численность отдела при раскрытии узла оргструктуры
+        Index("idx_users_department_id_last_name_id", "department_id", "last_name", "id"),
     )
@@ -1,13 +1,19 @@
 from uuid import UUID
 
-from sqlalchemy import Sequence, delete, func, select, update
+from sqlalchemy import Sequence, delete, exists, func, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
-from app.models import Department, User
+from app.models import Department, LegalEntity, User
+from app.models.department import department_closure, department_stats
 from app.schemas.department import DepartmentCreate
 
 
+def _full_name(user):
+    """Имя и фамилия через пробел; NULL, если не заполнено ни то, ни другое."""
+    return func.nullif(func.concat_ws(" ", user.first_name, user.last_name), "")
+
+
 class DepartmentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -46,6 +52,135 @@ class DepartmentRepository:
         )
         return result.scalars().all()
 
+    async def get_department_rows(self) -> list[dict]:
+        """Получает плоский список департаментов без сотрудников и вложенных отделов."""
+        result = await self.db.execute(
+            select(
+                Department.id,
+                Department.name,
+                Department.legal_entity_id,
+                Department.parent_id,
+                Department.manager_id,
+            ).order_by(Department.name)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def get_org_tree_rows(self) -> list[dict]:
+        """
+        Все юрлица и их департаменты одним запросом: рекурсивный CTE обходит дерево от корневых отделов,
+        к каждому узлу присоединяются руководитель и число активных сотрудников отдела из department_stats.
+        Строки упорядочены по юрлицу, глубине и названию, поэтому родитель всегда идет раньше потомков;
+        юрлицо без отделов дает одну строку с пустыми полями отдела.
+        """
+        tree = (
+            select(
+                Department.id,
+                Department.name,
+                Department.parent_id,
+                Department.legal_entity_id,
+                Department.manager_id,
+                literal(0).label("depth"),
+            )
+            .where(Department.parent_id.is_(None))
+            .cte("department_tree", recursive=True)
+        )
+        child = aliased(Department)
+        tree = tree.union_all(
+            select(
+                child.id, child.name, child.parent_id, child.legal_entity_id, child.manager_id, tree.c.depth + 1
+            ).where(child.parent_id == tree.c.id)
+        )
+        manager = aliased(User)
+        result = await self.db.execute(
+            select(
+                LegalEntity.id.label("legal_entity_id"),
+                LegalEntity.name.label("legal_entity_name"),
+                tree.c.id,
+                tree.c.name,
+                tree.c.parent_id,
+                tree.c.manager_id,
+                _full_name(manager).label("manager_name"),
+                func.coalesce(department_stats.c.active_headcount, 0).label("headcount"),
+            )
+            .select_from(LegalEntity)
+            .outerjoin(tree, tree.c.legal_entity_id == LegalEntity.id)
+            .outerjoin(manager, manager.id == tree.c.manager_id)
+            .outerjoin(department_stats, department_stats.c.department_id == tree.c.id)
+            .order_by(LegalEntity.name, tree.c.depth, tree.c.name)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def exists(self, department_id: UUID) -> bool:
+        return await self.db.scalar(select(exists().where(Department.id == department_id)))
+
+    async def get_child_nodes(self, parent_id: UUID | None, legal_entity_id: UUID | None = None) -> list[dict]:
+        """
+        Непосредственные дочерние отделы parent_id (при None — корневые, при необходимости одного юрлица)
+        с числом подотделов и активных сотрудников: в самом отделе и во всем его поддереве.
+        Численность читается готовой из department_stats — по строке на отдел, без подсчета сотрудников.
+        """
+        query = select(
+            Department.id,
+            Department.name,
+            Department.legal_entity_id,
+            Department.parent_id,
+            Department.manager_id,
+        ).where(Department.parent_id == parent_id if parent_id is not None else Department.parent_id.is_(None))
+        if legal_entity_id is not None:
+            query = query.where(Department.legal_entity_id == legal_entity_id)
+
+        child = aliased(Department)
+        subdepartment_count = (
+            select(func.count()).select_from(child).where(child.parent_id == Department.id).scalar_subquery()
+        )
+        manager = aliased(User)
+        result = await self.db.execute(
+            query.add_columns(
+                _full_name(manager).label("manager_name"),
+                subdepartment_count.label("subdepartment_count"),
+                func.coalesce(department_stats.c.active_headcount, 0).label("direct_headcount"),
+                func.coalesce(department_stats.c.total_active_headcount, 0).label("total_headcount"),
+            )
+            .outerjoin(department_stats, department_stats.c.department_id == Department.id)
+            .outerjoin(manager, manager.id == Department.manager_id)
+            .order_by(Department.name)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def get_stats(self, department_id: UUID) -> dict | None:
+        """Численность отдела из department_stats: сотрудники самого отдела и поддерева, все и активные."""
+        result = await self.db.execute(
+            select(department_stats).where(department_stats.c.department_id == department_id)
+        )
+        row = result.mappings().first()
+        return dict(row) if row else None
+
+    async def get_org_graph_rows(self) -> Sequence[tuple[UUID, str, UUID | None, UUID | None, str | None]]:
+        """Получает (ID, название, ID родителя, ID руководителя, имя руководителя) всех департаментов."""
+        manager = aliased(User)
+        result = await self.db.execute(
+            select(Department.id, Department.name, Department.parent_id, Department.manager_id, _full_name(manager))
+            .outerjoin(manager, manager.id == Department.manager_id)
+            .order_by(Department.name)
+        )
+        return result.tuples().all()
+
+    async def get_by_names(self, names: list[str]) -> Sequence[tuple[UUID, str, UUID]]:
+        """Получает (ID, название, ID юрлица) департаментов по названиям без учета регистра."""
+        if not names:
+            return []
+        result = await self.db.execute(
+            select(Department.id, Department.name, Department.legal_entity_id).where(
+                func.lower(Department.name).in_([name.lower() for name in names])
+            )
+        )
+        return result.tuples().all()
+
+    async def get_legal_entity_map(self) -> Sequence[tuple[UUID, UUID]]:
+        """Получает пары (ID департамента, ID юрлица)."""
+        result = await self.db.execute(select(Department.id, Department.legal_entity_id))
+        return result.tuples().all()
+
     async def create_department(self, create_data: DepartmentCreate) -> Department:
         """Создает и сохраняет новый департамент в БД."""
         new_department = Department(**create_data.model_dump())
@@ -78,31 +213,15 @@ class DepartmentRepository:
     async def is_descendant(self, child_id: UUID, parent_id: UUID) -> bool:
         """
         Проверяет, является ли child_id потомком (прямым или косвенным)
-        родительского департамента parent_id с использованием ORM CTE.
+        родительского департамента parent_id: одна строка department_closure по первичному ключу.
         """
-
         if child_id == parent_id:
             return True
-
-        DepartmentTable = Department.__table__
-
-        anchor = (
-            select(DepartmentTable.c.id, DepartmentTable.c.parent_id)
-            .where(DepartmentTable.c.id == parent_id)
-            .cte(name="department_tree", recursive=True)
+        closure = department_closure
+        return await self.db.scalar(
+            select(exists().where(closure.c.ancestor_id == parent_id, closure.c.descendant_id == child_id))
         )
 
-        recursive_term = select(DepartmentTable.c.id, DepartmentTable.c.parent_id).join(
-            anchor, DepartmentTable.c.parent_id == anchor.c.id
-        )
-
-        department_cte = anchor.union_all(recursive_term)
-
-        query = select(department_cte.c.id).where(department_cte.c.id == child_id)
-
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none() is not None
-
     async def delete_department(self, department_id: UUID) -> bool:
         """Удаляет департамент по ID (без проверки зависимостей!)."""
         stmt = delete(Department).where(Department.id == department_id)
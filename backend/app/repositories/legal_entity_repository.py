@@ -57,6 +57,22 @@ class LegalEntityRepository:
         )
         return result.scalars().unique().all()
 
+    async def get_legal_entity_rows(self) -> list[dict]:
+        """Получает плоский список юридических лиц без департаментов."""
+        result = await self.db.execute(select(LegalEntity.id, LegalEntity.name).order_by(LegalEntity.name))
+        return [dict(row) for row in result.mappings()]
+
+    async def get_by_names(self, names: list[str]) -> Sequence[tuple[UUID, str]]:
+        """Получает (ID, название) юридических лиц по названиям без учета регистра."""
+        if not names:
+            return []
+        result = await self.db.execute(
+            select(LegalEntity.id, LegalEntity.name).where(
+                func.lower(LegalEntity.name).in_([name.lower() for name in names])
+            )
+        )
+        return result.tuples().all()
+
     async def create_legal_entity(self, name: str) -> LegalEntity:
         """Создает и сохраняет новое юридическое лицо в БД."""
         new_entity = LegalEntity(name=name)
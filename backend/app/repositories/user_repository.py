@@ -1,17 +1,116 @@
-from typing import Sequence
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import AsyncIterator, Sequence
 from uuid import UUID
 
-from sqlalchemy import func, select, text, update
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    MetaData,
+    Select,
+    String,
+    Table,
+    all_,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    type_coerce,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from app.core.logger import get_logger
-from app.models import Department, User
+from app.enums import EmployeeStatusEnum, RoleEnum, SearchFacetEnum, SearchModeEnum, UserSortEnum
+from app.models import Department, LegalEntity, User
+from app.models.avatar import Avatar
+from app.models.department import department_closure
 from app.models.skill import Skill, user_skills_association
 from app.schemas.user import UserRegisterRequest
 
 logger = get_logger()
 
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+HIGHLIGHT_FIELDS = ("first_name", "last_name", "position", "email", "city")
+_HEADLINE_OPTIONS = f'HighlightAll=true, StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}"'
+_RUSSIAN = literal_column("'russian'::regconfig")
+_SIMPLE = literal_column("'simple'::regconfig")
+
+
+@dataclass(slots=True, frozen=True)
+class UserRow:
+    """
+    Сотрудник для выдачи списков без ORM: те же поля, что у UserRead.
+    Навыки — список словарей {id, name}, собранный json_agg на стороне БД.
+    """
+
+    id: UUID
+    first_name: str
+    last_name: str
+    email: str
+    position: str | None
+    department_id: UUID | None
+    role: RoleEnum
+    city: str | None
+    phone: str | None
+    telegram: str | None
+    mattermost: str | None
+    bio: str | None
+    skills: list[dict]
+    birthday: date | None
+    current_avatar_id: UUID | None
+    photo_url: str | None
+    employee_status: EmployeeStatusEnum | None
+    is_active: bool
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
+# Поля, доступные для выборочной выдачи списка сотрудников (fields=)
+USER_LIST_FIELDS = tuple(field.name for field in fields(UserRow))
+# Типы полей списка — по ним строится схема выгрузки в Parquet
+USER_LIST_FIELD_TYPES = {field.name: field.type for field in fields(UserRow)}
+
+# Колонки записей массового импорта в порядке COPY; skill_ids переносятся в user_skills_association
+USER_IMPORT_COLUMNS = (
+    "id",
+    "email",
+    "password_hash",
+    "first_name",
+    "last_name",
+    "position",
+    "department_id",
+    "city",
+    "phone",
+    "telegram",
+    "mattermost",
+    "bio",
+    "birthday",
+    "skill_ids",
+)
+_users_import = Table(
+    "users_import",
+    MetaData(),
+    *(Column(name, User.__table__.c[name].type) for name in USER_IMPORT_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
@@ -30,17 +129,121 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_by_id(self, user_id: UUID) -> User | None:
-        """Получает пользователя по UUID."""
+    async def get_by_id(self, user_id: UUID, populate_existing: bool = False) -> User | None:
+        """
+        Получает пользователя по UUID.
+        :param populate_existing: перечитать объект и его связи, даже если он уже загружен в сессию
+            (нужно после изменений в обход ORM, например set_skills)
+        """
         result = await self.db.execute(
             select(User)
             .where(User.id == user_id)
             .options(
                 selectinload(User.managed_department), selectinload(User.skills), selectinload(User.current_avatar)
             )
+            .execution_options(populate_existing=populate_existing)
         )
         return result.scalar_one_or_none()
 
+    async def get_profile(self, user_id: UUID) -> dict | None:
+        """
+        Карточка сотрудника одним запросом: поля UserRow, отдел, цепочка родительских отделов,
+        руководитель, юрлицо, отдел под его руководством и текущий аватар.
+        Цепочка отделов берется из department_closure, вложенные объекты собираются json_build_object.
+        """
+        closure = department_closure
+        chain = (
+            select(
+                Department.id,
+                Department.name,
+                Department.parent_id,
+                Department.manager_id,
+                Department.legal_entity_id,
+                closure.c.depth,
+            )
+            .join(closure, closure.c.ancestor_id == Department.id)
+            .where(closure.c.descendant_id == select(User.department_id).where(User.id == user_id).scalar_subquery())
+            .cte("department_chain")
+        )
+
+        def json_object(*pairs):
+            return type_coerce(func.json_build_object(*pairs), JSON)
+
+        department = select(json_object("id", chain.c.id, "name", chain.c.name, "parent_id", chain.c.parent_id)).where(
+            chain.c.depth == 0
+        )
+        parent_departments = select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object("id", chain.c.id, "name", chain.c.name, "parent_id", chain.c.parent_id),
+                    chain.c.depth.desc(),
+                )
+            )
+        ).where(chain.c.depth > 0)
+        legal_entity = (
+            select(json_object("id", LegalEntity.id, "name", LegalEntity.name))
+            .join(chain, chain.c.legal_entity_id == LegalEntity.id)
+            .where(chain.c.depth == 0)
+        )
+        # Руководитель — ближайший руководитель отдела вверх по цепочке, не считая самого сотрудника
+        manager = aliased(User)
+        manager_photo_url = (
+            select(Avatar.URL_PREFIX + Avatar.s3_key).where(Avatar.id == manager.current_avatar_id).scalar_subquery()
+        )
+        manager_card = (
+            select(
+                json_object(
+                    "id",
+                    manager.id,
+                    "first_name",
+                    manager.first_name,
+                    "last_name",
+                    manager.last_name,
+                    "position",
+                    manager.position,
+                    "email",
+                    manager.email,
+                    "photo_url",
+                    manager_photo_url,
+                )
+            )
+            .join(chain, chain.c.manager_id == manager.id)
+            .where(manager.id != user_id)
+            .order_by(chain.c.depth)
+            .limit(1)
+        )
+        managed_department = select(json_object("id", Department.id, "name", Department.name)).where(
+            Department.manager_id == User.id
+        )
+        avatar = select(
+            json_object(
+                "id",
+                Avatar.id,
+                "url",
+                Avatar.URL_PREFIX + Avatar.s3_key,
+                "moderation_status",
+                Avatar.moderation_status,
+                "created_at",
+                Avatar.created_at,
+            )
+        ).where(Avatar.id == User.current_avatar_id)
+
+        stmt = self._user_rows_select(
+            department.scalar_subquery().label("department"),
+            type_coerce(func.coalesce(parent_departments.scalar_subquery(), literal_column("'[]'::json")), JSON).label(
+                "parent_departments"
+            ),
+            manager_card.scalar_subquery().label("manager"),
+            legal_entity.scalar_subquery().label("legal_entity"),
+            managed_department.scalar_subquery().label("managed_department"),
+            avatar.scalar_subquery().label("avatar"),
+        ).where(User.id == user_id)
+        row = (await self.db.execute(stmt)).mappings().one_or_none()
+        if row is None:
+            return None
+        profile = dict(row)
+        return {"user": {name: profile.pop(name) for name in USER_LIST_FIELDS}, **profile}
+
     async def create_user(self, data: UserRegisterRequest, password_hash: str) -> User:
         """Создает и сохраняет нового пользователя в БД."""
         new_user = User(
@@ -52,6 +255,49 @@ class UserRepository:
         # Перезагружаем пользователя с selectinload для корректной сериализации photo_url
         return await self.get_by_id(new_user.id)
 
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """Возвращает те из переданных email, которые уже заняты."""
+        if not emails:
+            return set()
+        result = await self.db.execute(select(User.email).where(User.email == any_(literal(emails, ARRAY(String)))))
+        return set(result.scalars())
+
+    async def import_users(self, records: list[tuple]) -> list[UUID]:
+        """
+        Загружает пользователей пачкой (записи — кортежи по USER_IMPORT_COLUMNS) в одной транзакции:
+        COPY во временную таблицу, один INSERT ... SELECT в users и один в user_skills_association.
+        Строки, чей email к этому моменту уже занят, пропускаются. Возвращает ID созданных пользователей.
+        """
+        users = User.__table__
+        user_columns = USER_IMPORT_COLUMNS[:-1]
+        connection = await self.db.connection()
+        await connection.run_sync(_users_import.create)
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            _users_import.name, records=records, columns=USER_IMPORT_COLUMNS
+        )
+
+        result = await self.db.execute(
+            pg_insert(users)
+            .from_select(
+                user_columns, select(*(_users_import.c[name] for name in user_columns)), include_defaults=False
+            )
+            .on_conflict_do_nothing(index_elements=[users.c.email])
+            .returning(users.c.id)
+        )
+        user_ids = list(result.scalars())
+        # Навыки только для вставленных строк: у пропущенных нет записи в users с этим id
+        await self.db.execute(
+            user_skills_association.insert().from_select(
+                ["user_id", "skill_id"],
+                select(_users_import.c.id, func.unnest(_users_import.c.skill_ids)).join(
+                    users, users.c.id == _users_import.c.id
+                ),
+            )
+        )
+        await self.db.commit()
+        return user_ids
+
     async def get_all_users(self) -> Sequence[User]:
         """Получает список всех пользователей."""
         result = await self.db.execute(
@@ -61,6 +307,34 @@ class UserRepository:
         )
         return result.scalars().all()
 
+    def _user_rows_select(self, *extra) -> Select:
+        """Запрос всех полей UserRow явными колонками: без гидрации ORM и без selectinload связей."""
+        return select(*[self._list_field(name).label(name) for name in USER_LIST_FIELDS], *extra)
+
+    async def get_all_user_rows(self, active_only: bool = False) -> list[UserRow]:
+        """Получает список всех (или только активных) пользователей в виде DTO."""
+        stmt = self._user_rows_select()
+        if active_only:
+            stmt = stmt.where(User.is_active.is_(True))
+        result = await self.db.execute(stmt)
+        return [UserRow(*row) for row in result.tuples()]
+
+    async def get_department_user_rows(self, department_id: UUID, limit: int) -> list[UserRow]:
+        """Первые limit активных сотрудников отдела по фамилии."""
+        stmt = (
+            self._user_rows_select()
+            .where(User.department_id == department_id, User.is_active.is_(True))
+            .order_by(User.last_name, User.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return [UserRow(*row) for row in result.tuples()]
+
+    async def get_department_assignments(self) -> Sequence[tuple[UUID, UUID | None]]:
+        """Получает пары (ID, ID отдела) всех активных пользователей."""
+        result = await self.db.execute(select(User.id, User.department_id).where(User.is_active.is_(True)))
+        return result.tuples().all()
+
     async def get_cities(self) -> Sequence[str]:
         """Получает список всех городов пользователей."""
         stmt = select(User.city).where(User.city.isnot(None)).distinct()
@@ -82,10 +356,130 @@ class UserRepository:
             .options(
                 selectinload(User.managed_department), selectinload(User.skills), selectinload(User.current_avatar)
             )
-            .where(User.is_active is True)
+            .where(User.is_active.is_(True))
         )
         return result.scalars().all()
 
+    @staticmethod
+    def _list_field(name: str):
+        """SQL-выражение поля списка; вложенные фото и навыки собираются подзапросами вместо загрузки связей."""
+        if name == "photo_url":
+            return (
+                select(Avatar.URL_PREFIX + Avatar.s3_key).where(Avatar.id == User.current_avatar_id).scalar_subquery()
+            )
+        if name == "skills":
+            skills = (
+                select(func.json_agg(func.json_build_object("id", Skill.id, "name", Skill.name)))
+                .select_from(user_skills_association.join(Skill))
+                .where(user_skills_association.c.user_id == User.id)
+                .scalar_subquery()
+            )
+            return type_coerce(func.coalesce(skills, literal_column("'[]'::json")), JSON)
+        return getattr(User, name)
+
+    async def list_users_page(
+        self,
+        fields: Sequence[str],
+        sort: UserSortEnum,
+        limit: int,
+        after: tuple | None = None,
+        active_only: bool = False,
+    ) -> Sequence:
+        """
+        Страница списка сотрудников с keyset-пагинацией по индексам (last_name, id) и (created_at, id).
+        Выбираются только колонки из fields, ORM-объекты не создаются.
+        after — значения (ключ сортировки, id) последней записи предыдущей страницы.
+        returns:
+            Sequence[RowMapping]: строки с полями fields, а также sort_key и id для курсора.
+        """
+        descending = sort.value.startswith("-")
+        sort_column = User.created_at if sort.value.lstrip("-") == UserSortEnum.CREATED_AT.value else User.last_name
+
+        columns = [self._list_field(name).label(name) for name in fields if name != "id"]
+        stmt = select(User.id.label("id"), sort_column.label("sort_key"), *columns)
+        if active_only:
+            stmt = stmt.where(User.is_active.is_(True))
+        if after is not None:
+            after_key, after_id = after
+            key = tuple_(sort_column, User.id)
+            bound = tuple_(literal(after_key, sort_column.type), literal(after_id, User.id.type))
+            stmt = stmt.where(key < bound if descending else key > bound)
+        if descending:
+            stmt = stmt.order_by(sort_column.desc(), User.id.desc())
+        else:
+            stmt = stmt.order_by(sort_column, User.id)
+
+        result = await self.db.execute(stmt.limit(limit))
+        return result.mappings().all()
+
+    async def stream_users(
+        self, fields: Sequence[str], chunk_size: int, active_only: bool = False
+    ) -> AsyncIterator[Sequence]:
+        """
+        Читает сотрудников порциями по chunk_size строк через серверный курсор asyncpg.
+        В памяти одновременно находится не больше одной порции, ORM-объекты не создаются.
+        """
+        stmt = select(*[self._list_field(name).label(name) for name in fields]).order_by(User.id)
+        if active_only:
+            stmt = stmt.where(User.is_active.is_(True))
+        result = await self.db.stream(stmt.execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions():
+            yield partition
+
+    async def get_change_horizon(self) -> int:
+        """
+        Граница дельта-синхронизации: все транзакции с номером меньше нее уже завершены,
+        а их изменения видны в снимках, сделанных после этого запроса.
+        """
+        result = await self.db.execute(
+            select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), String), BigInteger))
+        )
+        return result.scalar_one()
+
+    async def get_changed_users(self, since: int, limit: int, after: tuple[int, UUID] | None = None) -> Sequence:
+        """
+        Пользователи, измененные транзакциями с номером не меньше since, в порядке (change_xid, id).
+        after — ключ последней записи предыдущей страницы.
+        returns:
+            Sequence[tuple[User, int]]: пользователь и его change_xid.
+        """
+        stmt = (
+            select(User, User.change_xid)
+            .where(User.change_xid >= since)
+            .options(selectinload(User.current_avatar), selectinload(User.skills))
+            .order_by(User.change_xid, User.id)
+            .limit(limit)
+        )
+        if after is not None:
+            after_xid, after_id = after
+            bound = tuple_(literal(after_xid, BigInteger), literal(after_id, User.id.type))
+            stmt = stmt.where(tuple_(User.change_xid, User.id) > bound)
+        result = await self.db.execute(stmt)
+        return result.tuples().all()
+
+    async def get_search_index_rows(self, user_ids: list[UUID] | None = None) -> Sequence[tuple]:
+        """
+        Получает поля активных пользователей (всех или только user_ids) для поискового индекса в памяти.
+        Навыки берутся из денормализованного массива skill_ids, а URL фото собирается в SQL,
+        чтобы не гидрировать ORM-объекты.
+        """
+        stmt = select(
+            User.id,
+            User.first_name,
+            User.last_name,
+            User.position,
+            User.email,
+            User.city,
+            User.department_id,
+            User.skill_ids,
+            Avatar.URL_PREFIX + Avatar.s3_key,
+        )
+        stmt = stmt.outerjoin(Avatar, Avatar.id == User.current_avatar_id).where(User.is_active.is_(True))
+        if user_ids is not None:
+            stmt = stmt.where(User.id.in_(user_ids))
+        result = await self.db.execute(stmt)
+        return result.tuples().all()
+
     async def update_user(self, user_id: UUID, update_data: dict) -> User | None:
         """Обновляет данные пользователя в БД, используя прямой UPDATE."""
         if not update_data:
@@ -110,37 +504,163 @@ class UserRepository:
         # Перезагружаем пользователя с selectinload для корректной сериализации photo_url
         return await self.get_by_id(user_id)
 
-    async def set_skills(self, user_id: UUID, skills: Sequence[Skill]) -> User | None:
-        user = await self.get_by_id(user_id)
-        user.skills = list(skills)
+    async def get_existing_ids(self, user_ids: list[UUID]) -> set[UUID]:
+        """Возвращает те из переданных ID, которые есть в справочнике."""
+        result = await self.db.execute(select(User.id).where(User.id.in_(user_ids)))
+        return set(result.scalars())
+
+    async def bulk_update_users(self, updates: list[dict]):
+        """
+        Применяет изменения к нескольким пользователям в одной транзакции.
+        Изменения группируются по набору полей: на каждую группу — один UPDATE, выполняемый через executemany.
+        :param updates: словари с ключом id и изменяемыми полями
+        """
+        users = User.__table__
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for values in updates:
+            names = tuple(sorted(name for name in values if name != "id"))
+            groups.setdefault(names, []).append({f"b_{name}": value for name, value in values.items()})
+
+        for names, params in groups.items():
+            stmt = (
+                update(users)
+                .where(users.c.id == bindparam("b_id"))
+                .values({**{name: bindparam(f"b_{name}") for name in names}, "updated_at": func.now()})
+            )
+            await self.db.execute(stmt, params)
         await self.db.commit()
-        return await self.get_by_id(user_id)
 
-    async def search_users_fuzzy(
-        self,
-        search_query: str,
-        cities: list[str] | None = None,
-        skills: list[str] | None = None,
-        departments: list[UUID] | None = None,
-        legal_entities: list[UUID] | None = None,
-    ) -> Sequence[User]:
-        search_query_lower = search_query.lower()
+    async def bulk_deactivate_users(self, user_ids: list[UUID]) -> tuple[list[UUID], int]:
+        """
+        Деактивирует пользователей и снимает их с руководства отделами двумя UPDATE в одной транзакции.
+        :return: ID найденных пользователей и количество отделов, у которых сброшен руководитель
+        """
+        result = await self.db.execute(
+            update(User).where(User.id.in_(user_ids)).values(is_active=False, updated_at=func.now()).returning(User.id)
+        )
+        deactivated = list(result.scalars())
+        result = await self.db.execute(
+            update(Department)
+            .where(Department.manager_id.in_(deactivated))
+            .values(manager_id=None, updated_at=func.now())
+        )
+        await self.db.commit()
+        return deactivated, result.rowcount
+
+    async def set_skills(self, user_id: UUID, skill_ids: list[UUID]):
+        """
+        Заменяет навыки пользователя на skill_ids. Разница считается в БД: лишние связи удаляются
+        одним DELETE, недостающие добавляются одним INSERT ... ON CONFLICT DO NOTHING.
+        """
+        usa = user_skills_association
+        skill_ids_param = literal(skill_ids, ARRAY(usa.c.skill_id.type))
+        await self.db.execute(delete(usa).where(usa.c.user_id == user_id, usa.c.skill_id != all_(skill_ids_param)))
+        if skill_ids:
+            await self.db.execute(
+                pg_insert(usa)
+                .from_select(
+                    ["user_id", "skill_id"],
+                    select(literal(user_id, usa.c.user_id.type), func.unnest(skill_ids_param)),
+                )
+                .on_conflict_do_nothing()
+            )
+        await self.db.commit()
 
-        combined_field = func.lower(
-            func.coalesce(User.first_name, "")
-            + " "
-            + func.coalesce(User.last_name, "")
-            + " "
-            + func.coalesce(User.position, "")
-            + " "
-            + func.coalesce(User.email, "")
+    async def bulk_set_skills(self, skill_sets: dict[UUID, list[UUID]]) -> tuple[int, int]:
+        """
+        Заменяет навыки нескольким пользователям в одной транзакции.
+        Пары (пользователь, навык) передаются двумя параллельными массивами, поэтому независимо от числа
+        пользователей выполняются один DELETE лишних связей и один INSERT недостающих.
+        :param skill_sets: ID пользователя -> ID навыков, которые должны у него остаться
+        :return: количество удаленных и добавленных связей
+        """
+        usa = user_skills_association
+        uuid_array = ARRAY(usa.c.user_id.type)
+        pairs = [(user_id, skill_id) for user_id, skill_ids in skill_sets.items() for skill_id in skill_ids]
+        target = (
+            func.unnest(
+                literal([user_id for user_id, _ in pairs], uuid_array),
+                literal([skill_id for _, skill_id in pairs], uuid_array),
+            )
+            .table_valued("user_id", "skill_id")
+            .render_derived(name="target")
         )
-        similarity_score = func.similarity(combined_field, search_query_lower).label("score")
 
-        stmt = select(User, similarity_score)
+        removed = await self.db.execute(
+            delete(usa).where(
+                usa.c.user_id == any_(literal(list(skill_sets), uuid_array)),
+                ~exists().where(target.c.user_id == usa.c.user_id, target.c.skill_id == usa.c.skill_id),
+            )
+        )
+        added = 0
+        if pairs:
+            result = await self.db.execute(
+                pg_insert(usa)
+                .from_select(["user_id", "skill_id"], select(target.c.user_id, target.c.skill_id))
+                .on_conflict_do_nothing()
+            )
+            added = result.rowcount
+        await self.db.commit()
+        return removed.rowcount, added
+
+    @staticmethod
+    def _search_document():
+        """
+        Выражение, по которому построен индекс idx_users_fuzzy_search.
+        Константы подставляются литералами: с bind-параметрами выражение не совпадет с индексным.
+        """
+        empty, space = literal_column("''"), literal_column("' '")
+        return func.lower(
+            func.coalesce(User.first_name, empty)
+            + space
+            + func.coalesce(User.last_name, empty)
+            + space
+            + func.coalesce(User.position, empty)
+            + space
+            + func.coalesce(User.email, empty)
+        )
+
+    @staticmethod
+    def _fulltext_query(search_query: str):
+        """tsquery запроса: объединение разборов русским и простым словарями."""
+        return func.websearch_to_tsquery(_RUSSIAN, search_query).op("||")(
+            func.websearch_to_tsquery(_SIMPLE, search_query)
+        )
+
+    @staticmethod
+    def _fulltext_headlines(query) -> list:
+        """Подсветка совпадений в полях HIGHLIGHT_FIELDS символами HIGHLIGHT_START/HIGHLIGHT_STOP."""
+        return [
+            func.ts_headline(
+                _RUSSIAN, func.coalesce(getattr(User, field), literal_column("''")), query, _HEADLINE_OPTIONS
+            )
+            for field in HIGHLIGHT_FIELDS
+        ]
 
-        stmt = stmt.options(selectinload(User.current_avatar), selectinload(User.department), selectinload(User.skills))
+    async def _set_similarity_threshold(self, threshold: float):
+        """Задает порог оператора %>; действует только до конца текущей транзакции."""
+        await self.db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)))
 
+    async def _resolve_skill_ids(self, skills: list[str]) -> list[UUID] | None:
+        """Находит ID навыков по названиям одним запросом. None — если хотя бы один навык не существует."""
+        names = {s.lower() for s in skills}
+        result = await self.db.execute(select(Skill.id).where(func.lower(Skill.name).in_(names)))
+        skill_ids = result.scalars().all()
+        return list(skill_ids) if len(skill_ids) == len(names) else None
+
+    async def _apply_search_filters(
+        self,
+        stmt: Select,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> Select | None:
+        """
+        Добавляет к запросу фильтры панели поиска.
+        Навыки проверяются включением массива users.skill_ids (GIN-индекс) вместо соединения
+        с таблицей связей. Возвращает None, если фильтру заведомо никто не соответствует.
+        """
         if cities:
             stmt = stmt.filter(func.lower(User.city).in_([c.lower() for c in cities]))
         if departments:
@@ -148,21 +668,288 @@ class UserRepository:
         if legal_entities:
             stmt = stmt.join(User.department).filter(Department.legal_entity_id.in_(legal_entities))
         if skills:
-            stmt = (
-                stmt.join(user_skills_association, user_skills_association.c.user_id == User.id)
-                .join(Skill, Skill.id == user_skills_association.c.skill_id)
-                .filter(func.lower(Skill.name).in_([s.lower() for s in skills]))
-                .group_by(User.id, similarity_score)
-                .having(func.count(func.distinct(Skill.name)) == len(skills))
-            )
+            skill_ids = await self._resolve_skill_ids(skills)
+            if skill_ids is None:
+                return None
+            stmt = stmt.filter(User.skill_ids.contains(skill_ids))
+        return stmt
+
+    async def search_users_fuzzy(
+        self,
+        search_query: str,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> list[UserRow]:
+        search_query_lower = search_query.lower()
 
+        similarity_score = func.similarity(self._search_document(), search_query_lower).label("score")
+
+        stmt = self._user_rows_select(similarity_score)
+        stmt = await self._apply_search_filters(stmt, cities, skills, departments, legal_entities)
+        if stmt is None:
+            return []
         stmt = stmt.order_by(similarity_score.desc())
 
         result = await self.db.execute(stmt)
         rows = result.tuples().all()
 
         logger.info("Fuzzy search results for query '%s':", search_query)
-        for user, score in rows:
+        users = []
+        for *columns, score in rows:
+            user = UserRow(*columns)
             logger.info("User: %s, similarity: %.3f", user.email, score)
+            users.append(user)
+        return users
+
+    async def search_users_trigram(
+        self,
+        search_query: str,
+        threshold: float,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> Sequence[tuple[User, float]]:
+        """
+        Поиск с отбором по GIN-индексу idx_users_fuzzy_search.
+        Оператор %> (word_similarity >= порога) позволяет планировщику использовать индекс
+        вместо вычисления similarity для каждой строки.
+        Результаты упорядочены по (score desc, id asc), after — ключ последней записи предыдущей страницы.
+        """
+        search_query_lower = search_query.lower()
+        document = self._search_document()
+        score = func.word_similarity(search_query_lower, document)
+        await self._set_similarity_threshold(threshold)
+
+        stmt = (
+            select(User, score.label("score"))
+            .where(document.op("%>")(search_query_lower))
+            .options(selectinload(User.current_avatar), selectinload(User.department), selectinload(User.skills))
+        )
+        stmt = await self._apply_search_filters(stmt, cities, skills, departments, legal_entities)
+        if stmt is None:
+            return []
+        if after is not None:
+            after_score, after_id = after
+            stmt = stmt.where(or_(score < after_score, and_(score == after_score, User.id > after_id)))
+        stmt = stmt.order_by(score.desc(), User.id).limit(limit)
+
+        result = await self.db.execute(stmt)
+        return result.tuples().all()
 
-        return [user for user, score in rows]
+    async def search_users_batch(self, queries: list[str], threshold: float, limit: int) -> Sequence[tuple]:
+        """
+        Сопоставляет сразу несколько запросов одним SQL-запросом: входные строки разворачиваются
+        через unnest() WITH ORDINALITY, и для каждой LATERAL-подзапрос отбирает по индексу
+        idx_users_fuzzy_search до limit лучших совпадений.
+        returns:
+            Sequence[tuple]: (номер запроса с 1, id, first_name, last_name, email, position, city,
+            department_id, score), упорядочено по номеру запроса и убыванию score.
+            Для запроса без совпадений возвращается одна строка, где все поля, кроме номера, равны None.
+        """
+        await self._set_similarity_threshold(threshold)
+        inputs = (
+            func.unnest(literal([q.lower() for q in queries], ARRAY(String)))
+            .table_valued("query", with_ordinality="ordinality")
+            .render_derived(name="inputs")
+        )
+        document = self._search_document()
+        score = func.word_similarity(inputs.c.query, document)
+        matches = (
+            select(
+                User.id,
+                User.first_name,
+                User.last_name,
+                User.email,
+                User.position,
+                User.city,
+                User.department_id,
+                score.label("score"),
+            )
+            .where(document.op("%>")(inputs.c.query))
+            .order_by(score.desc(), User.id)
+            .limit(limit)
+            .lateral("matches")
+        )
+        stmt = (
+            select(inputs.c.ordinality, matches)
+            .select_from(inputs.outerjoin(matches, true()))
+            .order_by(inputs.c.ordinality, matches.c.score.desc(), matches.c.id)
+        )
+        result = await self.db.execute(stmt)
+        return result.tuples().all()
+
+    async def search_users_fulltext(
+        self,
+        search_query: str,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> Sequence[tuple]:
+        """
+        Полнотекстовый поиск по сохраненному столбцу search_document (GIN-индекс idx_users_search_document).
+        Запрос разбирается русским и простым словарями, ранжирование — ts_rank_cd с весами полей.
+        Возвращает кортежи (User, rank, *подсветка полей HIGHLIGHT_FIELDS), подсветка размечена
+        символами HIGHLIGHT_START/HIGHLIGHT_STOP и вычисляется только для строк страницы.
+        """
+        query = self._fulltext_query(search_query)
+        rank = func.ts_rank_cd(User.search_document, query)
+
+        stmt = (
+            select(User, rank.label("rank"), *self._fulltext_headlines(query))
+            .where(User.search_document.bool_op("@@")(query))
+            .options(selectinload(User.current_avatar), selectinload(User.department), selectinload(User.skills))
+        )
+        stmt = await self._apply_search_filters(stmt, cities, skills, departments, legal_entities)
+        if stmt is None:
+            return []
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(or_(rank < after_rank, and_(rank == after_rank, User.id > after_id)))
+        stmt = stmt.order_by(rank.desc(), User.id).limit(limit)
+
+        result = await self.db.execute(stmt)
+        return result.tuples().all()
+
+    @staticmethod
+    def _search_matches(
+        predicate,
+        score,
+        cities: list[str] | None = None,
+        skill_ids: list[UUID] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ):
+        """
+        CTE search_matches: совпадения поискового запроса с оценкой и по флагу на каждый фильтр панели.
+        Строки страницы — совпадения со всеми флагами, фасет учитывает все флаги, кроме собственного.
+        """
+        return (
+            select(
+                User.id,
+                score.label("score"),
+                User.city,
+                User.department_id,
+                Department.legal_entity_id,
+                User.skill_ids,
+                (func.lower(User.city).in_([c.lower() for c in cities]) if cities else true()).label("by_city"),
+                (User.department_id.in_(departments) if departments else true()).label("by_department"),
+                (Department.legal_entity_id.in_(legal_entities) if legal_entities else true()).label("by_le"),
+                (User.skill_ids.contains(skill_ids) if skill_ids else true()).label("by_skills"),
+            )
+            .outerjoin(Department, Department.id == User.department_id)
+            .where(predicate)
+            .cte("search_matches")
+        )
+
+    @staticmethod
+    def _facet_counts(matches, facets: list[SearchFacetEnum]):
+        """
+        Группы фасетов по CTE search_matches: строки (facet, value, count).
+        Город, отдел и юрлицо выбираются по ИЛИ, поэтому фасет не учитывает собственный фильтр;
+        навыки фильтруются по И, поэтому их фасет учитывает и выбранные навыки.
+        """
+        c = matches.c
+
+        def facet_select(facet: SearchFacetEnum, value, *conditions):
+            return (
+                select(
+                    literal(facet.value).label("facet"), cast(value, String).label("value"), func.count().label("count")
+                )
+                .where(value.isnot(None), *conditions)
+                .group_by(value)
+            )
+
+        selects = []
+        if SearchFacetEnum.CITIES in facets:
+            selects.append(facet_select(SearchFacetEnum.CITIES, c.city, c.by_department, c.by_le, c.by_skills))
+        if SearchFacetEnum.DEPARTMENTS in facets:
+            selects.append(facet_select(SearchFacetEnum.DEPARTMENTS, c.department_id, c.by_city, c.by_le, c.by_skills))
+        if SearchFacetEnum.LEGAL_ENTITIES in facets:
+            selects.append(
+                facet_select(SearchFacetEnum.LEGAL_ENTITIES, c.legal_entity_id, c.by_city, c.by_department, c.by_skills)
+            )
+        if SearchFacetEnum.SKILLS in facets:
+            skill_id = func.unnest(c.skill_ids).table_valued("skill_id").render_derived()
+            selects.append(
+                facet_select(SearchFacetEnum.SKILLS, Skill.name, c.by_city, c.by_department, c.by_le, c.by_skills)
+                .select_from(matches)
+                .join(skill_id, true())
+                .join(Skill, Skill.id == skill_id.c.skill_id)
+            )
+        return union_all(*selects)
+
+    async def search_page_with_facets(
+        self,
+        mode: SearchModeEnum,
+        search_query: str,
+        limit: int,
+        facets: list[SearchFacetEnum],
+        threshold: float | None = None,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> tuple[list[tuple], dict[str, dict[str, int]]]:
+        """
+        Первая страница поиска (режим TRIGRAM или FULLTEXT) вместе с количеством совпадений по фасетам
+        одним запросом: совпадения отбираются один раз в CTE search_matches, из него берутся и первые limit
+        строк, и группы фасетов. Счетчики собираются в одно JSON-значение, которое присоединяется к строкам
+        страницы, поэтому приходят и при пустой странице.
+        returns:
+            tuple: строки как у search_users_trigram / search_users_fulltext и {фасет: {значение: количество}}.
+        """
+        result = {facet.value: {} for facet in facets}
+        skill_ids = None
+        if skills:
+            skill_ids = await self._resolve_skill_ids(skills)
+            if skill_ids is None:
+                return [], result
+
+        headlines = []
+        if mode == SearchModeEnum.TRIGRAM:
+            await self._set_similarity_threshold(threshold)
+            search_query_lower = search_query.lower()
+            document = self._search_document()
+            predicate = document.op("%>")(search_query_lower)
+            score = func.word_similarity(search_query_lower, document)
+        else:
+            query = self._fulltext_query(search_query)
+            predicate = User.search_document.bool_op("@@")(query)
+            score = func.ts_rank_cd(User.search_document, query)
+            headlines = self._fulltext_headlines(query)
+
+        matches = self._search_matches(predicate, score, cities, skill_ids, departments, legal_entities)
+        c = matches.c
+        page = (
+            select(c.id, c.score)
+            .where(c.by_city, c.by_department, c.by_le, c.by_skills)
+            .order_by(c.score.desc(), c.id)
+            .limit(limit)
+            .subquery("page")
+        )
+        counts = self._facet_counts(matches, facets).subquery("facet_counts")
+        facet_rows = func.json_agg(func.json_build_array(counts.c.facet, counts.c.value, counts.c.count))
+        facet_json = select(
+            type_coerce(func.coalesce(facet_rows, literal_column("'[]'::json")), JSON).label("facets")
+        ).subquery("facets")
+
+        stmt = (
+            select(User, page.c.score, *headlines, facet_json.c.facets)
+            .select_from(facet_json)
+            .outerjoin(page, true())
+            .outerjoin(User, User.id == page.c.id)
+            .options(selectinload(User.current_avatar), selectinload(User.department), selectinload(User.skills))
+            .order_by(page.c.score.desc(), page.c.id)
+        )
+        rows = (await self.db.execute(stmt)).tuples().all()
+        for facet, value, count in rows[0][-1]:
+            result[facet][value] = count
+        return [row[:-1] for row in rows if row[0] is not None], result
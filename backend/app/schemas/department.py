@@ -31,3 +31,34 @@ class DepartmentReadSmall(BaseModel):
 
 class DepartmentRead(DepartmentReadSmall):
     subdepartments: list[DepartmentReadSmall] = []
+
+
+class DepartmentNode(BaseModel):
+    """Узел оргструктуры без вложенных данных: для раскрытия дерева по уровням."""
+
+    id: UUID
+    name: str
+    legal_entity_id: UUID
+    parent_id: UUID | None = None
+    manager_id: UUID | None = None
+    manager_name: str | None = Field(None, description="Имя и фамилия руководителя")
+    subdepartment_count: int = Field(..., description="Количество непосредственных подотделов")
+    direct_headcount: int = Field(..., description="Активные сотрудники самого отдела")
+    total_headcount: int = Field(..., description="Активные сотрудники отдела и всех его подотделов")
+
+
+class DepartmentStats(BaseModel):
+    """Численность отдела, поддерживаемая в БД приращениями."""
+
+    department_id: UUID
+    headcount: int = Field(..., description="Все сотрудники самого отдела")
+    active_headcount: int = Field(..., description="Активные сотрудники самого отдела")
+    total_headcount: int = Field(..., description="Все сотрудники отдела и всех его подотделов")
+    total_active_headcount: int = Field(..., description="Активные сотрудники отдела и всех его подотделов")
+    has_manager: bool = Field(..., description="Назначен ли руководитель отдела")
+
+
+class DepartmentChildren(BaseModel):
+    children: list[DepartmentNode] = Field([], description="Непосредственные подотделы")
+    employees: list[UserRead] = Field([], description="Первые employees_limit сотрудников отдела по фамилии")
+    has_more_employees: bool = Field(False, description="Есть ли в отделе сотрудники сверх employees")
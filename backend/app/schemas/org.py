@@ -0,0 +1,32 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class OrgTreeDepartment(BaseModel):
+    id: UUID
+    name: str
+    manager_id: UUID | None = None
+    manager_name: str | None = Field(None, description="Имя и фамилия руководителя")
+    headcount: int = Field(..., description="Активные сотрудники самого отдела")
+    total_headcount: int = Field(..., description="Активные сотрудники отдела и всех его подотделов")
+    subdepartments: list["OrgTreeDepartment"] = []
+
+
+class OrgTreeLegalEntity(BaseModel):
+    id: UUID
+    name: str
+    total_headcount: int = Field(..., description="Активные сотрудники всех отделов юрлица")
+    departments: list[OrgTreeDepartment] = Field([], description="Корневые отделы юрлица")
+
+
+class OrgChainLink(BaseModel):
+    department_id: UUID
+    department_name: str
+    manager_id: UUID
+    manager_name: str | None = Field(None, description="Имя и фамилия руководителя")
+
+
+class OrgCommonManager(BaseModel):
+    department_id: UUID | None = Field(None, description="Наименьший общий отдел сотрудников")
+    manager: OrgChainLink | None = Field(None, description="Ближайший общий руководитель и его отдел")
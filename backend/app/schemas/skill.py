@@ -1,6 +1,8 @@
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 class SkillCreate(BaseModel):
@@ -15,6 +17,23 @@ class SetSkillsRequest(BaseModel):
     skills: list[str]
 
 
+class UserSkillsItem(SetSkillsRequest):
+    user_id: UUID = Field(..., description="ID сотрудника")
+
+
+class SetSkillsBulkRequest(BaseModel):
+    items: list[UserSkillsItem] = Field(
+        ..., min_length=1, max_length=settings.BULK_UPDATE_SIZE_MAX, description="Наборы навыков по сотрудникам"
+    )
+
+
+class SetSkillsBulkResult(BaseModel):
+    updated: int = Field(..., description="Количество сотрудников, которым установлены навыки")
+    added: int = Field(..., description="Количество добавленных связей сотрудник-навык")
+    removed: int = Field(..., description="Количество удаленных связей сотрудник-навык")
+    not_found: list[UUID] = Field([], description="ID, которых нет в справочнике")
+
+
 class SkillRead(BaseModel):
     name: str
     id: UUID
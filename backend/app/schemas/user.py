@@ -1,10 +1,11 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
-from app.enums import EmployeeStatusEnum, RoleEnum
+from app.core.config import settings
+from app.enums import AvatarModerationStatusEnum, EmployeeStatusEnum, ImportJobStatusEnum, RoleEnum
 from app.schemas.skill import SkillRead
 
 
@@ -47,6 +48,115 @@ class UserRead(UserBase):
         orm_mode = True
 
 
+class UserProfileDepartment(BaseModel):
+    id: UUID
+    name: str
+    parent_id: Optional[UUID] = None
+
+
+class UserProfileLegalEntity(BaseModel):
+    id: UUID
+    name: str
+
+
+class UserProfileManager(BaseModel):
+    id: UUID
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    position: Optional[str] = None
+    email: str
+    photo_url: Optional[str] = None
+
+
+class UserProfileAvatar(BaseModel):
+    id: UUID
+    url: str
+    moderation_status: AvatarModerationStatusEnum
+    created_at: datetime
+
+
+class UserProfile(BaseModel):
+    """Карточка сотрудника со всем, что нужно странице профиля, в одном ответе."""
+
+    user: UserRead
+    department: Optional[UserProfileDepartment] = Field(None, description="Отдел сотрудника")
+    parent_departments: list[UserProfileDepartment] = Field(
+        [], description="Родительские отделы от корня до непосредственного родителя"
+    )
+    manager: Optional[UserProfileManager] = Field(
+        None, description="Ближайший руководитель вверх по цепочке отделов, не считая самого сотрудника"
+    )
+    legal_entity: Optional[UserProfileLegalEntity] = Field(None, description="Юрлицо отдела сотрудника")
+    managed_department: Optional[UserProfileDepartment] = Field(None, description="Отдел под руководством сотрудника")
+    avatar: Optional[UserProfileAvatar] = Field(None, description="Текущий аватар")
+
+
+class UserListPage(BaseModel):
+    items: list[dict[str, Any]] = Field([], description="Сотрудники с запрошенными полями")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (None — страница последняя)")
+
+
+class UserChangesPage(BaseModel):
+    items: list[UserRead] = []
+    next_token: str = Field(..., description="Токен для следующего запроса изменений")
+    has_more: bool = Field(..., description="Есть ли еще изменения в текущем проходе")
+
+
+class UserSearchPage(BaseModel):
+    items: list[UserRead] = []
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (None — страница последняя)")
+    facets: Optional[dict[str, dict[str, int]]] = Field(
+        None, description="Количество совпадений по значениям запрошенных фасетов"
+    )
+
+
+class UserSearchHit(BaseModel):
+    id: UUID
+    first_name: str
+    last_name: str
+    email: str
+    position: Optional[str] = None
+    city: Optional[str] = None
+    department_id: Optional[UUID] = None
+    score: float = Field(..., description="Доля совпавших триграмм запроса")
+
+
+class UserBatchSearchRequest(BaseModel):
+    queries: list[str] = Field(
+        ..., min_length=1, max_length=settings.SEARCH_BATCH_SIZE_MAX, description="Имена или email для сопоставления"
+    )
+    limit: int = Field(3, gt=0, le=20, description="Количество кандидатов на каждый запрос")
+    threshold: Optional[float] = Field(None, ge=0, le=1, description="Порог схожести")
+
+
+class UserBatchSearchResult(BaseModel):
+    query: str
+    candidates: list[UserSearchHit] = []
+
+
+class UserSearchMatch(BaseModel):
+    user: UserRead
+    rank: float = Field(..., description="Ранг ts_rank_cd")
+    highlights: dict[str, list[tuple[int, int]]] = Field(
+        default_factory=dict, description="Смещения [начало, конец) совпавших слов по полям"
+    )
+
+
+class UserFulltextPage(BaseModel):
+    items: list[UserSearchMatch] = []
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (None — страница последняя)")
+    facets: Optional[dict[str, dict[str, int]]] = Field(
+        None, description="Количество совпадений по значениям запрошенных фасетов"
+    )
+
+
+class UserSuggestion(BaseModel):
+    id: UUID
+    name: str
+    position: Optional[str] = None
+    photo_url: Optional[str] = None
+
+
 class UserUpdate(BaseModel):
     phone: Optional[str] = Field(None, max_length=50)
     telegram: Optional[str] = Field(None, max_length=100)
@@ -64,3 +174,84 @@ class UserUpdateAdmin(UserUpdate):
     role: Optional[RoleEnum] = Field(None, description="Роль в системе (права доступа)")
     city: Optional[str] = Field(None, max_length=100)
     birthday: Optional[date] = None
+
+
+class UserBulkUpdateItem(UserUpdateAdmin):
+    id: UUID = Field(..., description="ID сотрудника")
+
+
+class UserBulkUpdateRequest(BaseModel):
+    items: list[UserBulkUpdateItem] = Field(
+        ..., min_length=1, max_length=settings.BULK_UPDATE_SIZE_MAX, description="Изменения по сотрудникам"
+    )
+
+
+class UserBulkUpdateResult(BaseModel):
+    updated: int = Field(..., description="Количество обновленных сотрудников")
+    not_found: list[UUID] = Field([], description="ID, которых нет в справочнике")
+
+
+class UserBulkDeactivateRequest(BaseModel):
+    ids: list[UUID] = Field(..., min_length=1, max_length=settings.BULK_UPDATE_SIZE_MAX)
+
+
+class UserBulkDeactivateResult(BaseModel):
+    deactivated: int = Field(..., description="Количество деактивированных сотрудников")
+    managers_cleared: int = Field(..., description="Количество отделов, оставшихся без руководителя")
+    not_found: list[UUID] = Field([], description="ID, которых нет в справочнике")
+
+
+class UserImportRow(BaseModel):
+    """Строка файла импорта сотрудников; отдел, юрлицо и навыки указываются названиями."""
+
+    email: EmailStr = Field(..., description="Рабочая почта (логин в системе)")
+    password: str = Field(..., min_length=6, description="Пароль для нового пользователя")
+    first_name: str = Field(..., min_length=1, max_length=100, description="Имя сотрудника")
+    last_name: str = Field(..., min_length=1, max_length=100, description="Фамилия сотрудника")
+    position: Optional[str] = Field(None, max_length=150, description="Должность сотрудника")
+    department: Optional[str] = Field(None, description="Название отдела")
+    legal_entity: Optional[str] = Field(None, description="Название юрлица (проверяется по отделу)")
+    city: Optional[str] = Field(None, max_length=100)
+    phone: Optional[str] = Field(None, max_length=50)
+    telegram: Optional[str] = Field(None, max_length=100)
+    mattermost: Optional[str] = Field(None, max_length=100)
+    bio: Optional[str] = None
+    birthday: Optional[date] = None
+    skills: list[str] = Field([], description="Названия навыков через ';'")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _clean_cells(cls, data: Any) -> Any:
+        """Пустые ячейки считаются незаполненными, навыки разбиваются по ';'."""
+        if not isinstance(data, dict):
+            return data
+        data = {key: value.strip() if isinstance(value, str) else value for key, value in data.items()}
+        data = {key: value for key, value in data.items() if value not in (None, "")}
+        if isinstance(data.get("skills"), str):
+            data["skills"] = [skill.strip() for skill in data["skills"].split(";") if skill.strip()]
+        return data
+
+
+class UserImportError(BaseModel):
+    row: int = Field(..., description="Номер строки в файле (заголовок — строка 1)")
+    email: Optional[str] = None
+    errors: list[str] = Field(..., description="Ошибки строки")
+
+
+class UserImportReport(BaseModel):
+    total: int = Field(..., description="Количество строк данных в файле")
+    imported: int = Field(..., description="Количество созданных сотрудников")
+    errors: list[UserImportError] = []
+
+
+class UserImportJobRead(BaseModel):
+    """Задача фонового импорта сотрудников."""
+
+    id: UUID
+    status: ImportJobStatusEnum
+    filename: Optional[str] = None
+    total: int = Field(..., description="Количество строк данных в файле")
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    report: Optional[UserImportReport] = Field(None, description="Отчет об импорте, когда задача выполнена")
+    error: Optional[str] = Field(None, description="Причина, по которой импорт прерван")
@@ -7,6 +7,8 @@ from app.exceptions.user import UserAlreadyExists
 from app.repositories.user_repository import UserRepository
 from app.schemas.auth import AuthResponse
 from app.schemas.user import UserLoginRequest, UserRegisterRequest
+from app.services.directory_version import directory_version
+from app.services.search_index import user_search_index
 from app.utils.password import get_password_hash, verify_password
 from app.utils.tokens import create_access_token, create_refresh_token, decode_token
 
@@ -23,6 +25,8 @@ class AuthService:
 
         password_hash = get_password_hash(data.password)
         new_user = await self.user_repository.create_user(data, password_hash)
+        user_search_index.upsert_user(new_user)
+        directory_version.bump()
 
         return self._generate_auth_response(new_user)
 
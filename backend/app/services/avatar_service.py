@@ -9,7 +9,9 @@ from app.enums import AvatarModerationStatusEnum as AMSEnum
 from app.models.avatar import Avatar
 from app.models.user import User
 from app.repositories.avatar_repository import AvatarRepository
+from app.services.directory_version import directory_version
 from app.services.s3_service import AsyncS3Service
+from app.services.search_index import user_search_index
 from app.services.user_service import UserService
 from app.utils.file_keys import generate_key
 
@@ -75,6 +77,9 @@ class AvatarService:
 
             # Этап 4: Выполняем итоговый commit
             await self.avatar_repository.db.commit()
+            if initial_status == AMSEnum.ACTIVE:
+                user_search_index.set_photo_url(target_user.id, new_avatar.url)
+                directory_version.bump()
 
             logger.info(f"Avatar upload completed successfully for user {target_user.id}")
             return s3_key
@@ -117,6 +122,9 @@ class AvatarService:
             )
         moderator = await self.user_service.get_user(moderator_id)
         await self.avatar_repository.set_avatar_status(avatar, status, moderator, rejection_reason)
+        if status == AMSEnum.ACCEPTED:
+            user_search_index.set_photo_url(avatar.user_id, avatar.url)
+            directory_version.bump()
         return f"Статус аватара {avatar_id} обновлен до {status.value}"
 
     async def delete(self, avatar_id: UUID):
@@ -124,4 +132,6 @@ class AvatarService:
         user = avatar.user
         new_avatar = await self.avatar_repository.get_previous_avatar(user)
         await self.avatar_repository.set_current_avatar(user, new_avatar)
+        user_search_index.set_photo_url(user.id, new_avatar.url if new_avatar else None)
+        directory_version.bump()
         await self.avatar_repository.delete_avatar(avatar)
@@ -15,6 +15,9 @@ from app.models import Department
 from app.repositories.department_repository import DepartmentRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.department import DepartmentCreate, DepartmentUpdate
+from app.services.directory_version import directory_version
+from app.services.org_graph import org_graph
+from app.services.search_index import user_search_index
 
 
 class DepartmentService:
@@ -32,7 +35,12 @@ class DepartmentService:
                 f"Parent legal entity ({parent_department.legal_entity_id}) " f"does not match ({legal_entity_id})",
             )
         if current_department_id is not None:
-            is_loop = await self.department_repo.is_descendant(child_id=parent_id, parent_id=current_department_id)
+            # Граф в памяти отвечает без обращения к БД, если он собран по последней версии справочника
+            graph = org_graph.current()
+            if graph is not None:
+                is_loop = graph.is_descendant(child_id=parent_id, parent_id=current_department_id)
+            else:
+                is_loop = await self.department_repo.is_descendant(child_id=parent_id, parent_id=current_department_id)
             if is_loop:
                 raise DepartmentConflict("Setting this parent would create a cycle")
 
@@ -50,8 +58,37 @@ class DepartmentService:
         if create_data.parent_id:
             await self._check_parent_valid(create_data.parent_id, create_data.legal_entity_id)
         new_department = await self.department_repo.create_department(create_data)
+        user_search_index.set_department(new_department.id, new_department.legal_entity_id)
+        directory_version.bump()
         return new_department
 
+    async def get_root_nodes(self, legal_entity_id: UUID | None = None) -> list[dict]:
+        """Корневые отделы (всех юрлиц или одного) с численностью — первый уровень оргструктуры."""
+        return await self.department_repo.get_child_nodes(None, legal_entity_id)
+
+    async def get_children(self, department_id: UUID, employees_limit: int = 0) -> dict:
+        """
+        Раскрытие узла оргструктуры: непосредственные подотделы с численностью
+        и, если employees_limit > 0, первая страница сотрудников самого отдела.
+        """
+        if not await self.department_repo.exists(department_id):
+            raise DepartmentNotFound(department_id)
+        employees = []
+        if employees_limit:
+            employees = await self.user_repo.get_department_user_rows(department_id, employees_limit + 1)
+        return {
+            "children": await self.department_repo.get_child_nodes(department_id),
+            "employees": employees[:employees_limit],
+            "has_more_employees": len(employees) > employees_limit,
+        }
+
+    async def get_stats(self, department_id: UUID) -> dict:
+        """Численность отдела и его поддерева — одна строка department_stats."""
+        stats = await self.department_repo.get_stats(department_id)
+        if stats is None:
+            raise DepartmentNotFound(department_id)
+        return stats
+
     async def get_department(self, department_id: UUID) -> Department:
         department = await self.department_repo.get_by_id(department_id)
         if not department:
@@ -83,6 +120,7 @@ class DepartmentService:
         updated_department = await self.department_repo.update_department(department_id, update_data)
         if not updated_department:
             raise DepartmentNotFound(department_id)
+        directory_version.bump()
 
         return updated_department
 
@@ -99,3 +137,4 @@ class DepartmentService:
             raise DepartmentDeleteError(department_id, subdepartments_count, count_users)
 
         await self.department_repo.delete_department(department_id)
+        directory_version.bump()
@@ -0,0 +1,158 @@
+import asyncio
+import gzip
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import brotli
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.repositories.department_repository import DepartmentRepository
+from app.repositories.legal_entity_repository import LegalEntityRepository
+from app.repositories.skill_repository import SkillRepository
+from app.repositories.user_repository import UserRepository
+from app.services.directory_version import directory_version
+from app.utils.responses import dumps_bytes
+
+logger = get_logger()
+
+# Снапшот сжимается один раз на версию справочника, поэтому уровни — почти максимальные
+_GZIP_LEVEL = 9
+_BROTLI_QUALITY = 9
+
+
+@dataclass(slots=True, frozen=True)
+class DirectorySnapshot:
+    version: int
+    etag: str
+    built_at: datetime
+    bodies: dict[str, bytes]  # Content-Encoding -> тело; "identity" — без сжатия
+
+    def negotiate(self, accept_encoding: str | None) -> tuple[str, bytes]:
+        """Выбирает кодировку по заголовку Accept-Encoding: br, затем gzip, иначе без сжатия."""
+        accepted = set()
+        for item in (accept_encoding or "").lower().split(","):
+            coding, _, params = item.partition(";")
+            try:
+                quality = float(params.strip().removeprefix("q=")) if params.strip() else 1.0
+            except ValueError:
+                quality = 1.0
+            if quality > 0:
+                accepted.add(coding.strip())
+        for coding in ("br", "gzip"):
+            if coding in self.bodies and (coding in accepted or "*" in accepted):
+                return coding, self.bodies[coding]
+        return "identity", self.bodies["identity"]
+
+
+def _compress(body: bytes) -> dict[str, bytes]:
+    return {
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0),
+        "br": brotli.compress(body, quality=_BROTLI_QUALITY),
+    }
+
+
+def _write_files(directory: Path, bodies: dict[str, bytes]):
+    """Атомарно записывает снапшот на диск: snapshot.json, snapshot.json.gz, snapshot.json.br."""
+    directory.mkdir(parents=True, exist_ok=True)
+    suffixes = {"identity": "", "gzip": ".gz", "br": ".br"}
+    for coding, body in bodies.items():
+        path = directory / f"snapshot.json{suffixes[coding]}"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+
+
+class DirectorySnapshotStore:
+    """
+    Версионированный снапшот публичного справочника: активные сотрудники, департаменты,
+    юрлица и навыки одним JSON-документом, заранее сжатым в gzip и brotli.
+
+    Снапшот пересобирается в фоне после изменения справочника (directory_version) с небольшой
+    задержкой, чтобы серия записей дала одну пересборку. Пока идет пересборка, отдается
+    предыдущий снапшот со своим ETag. Версия фиксируется до чтения данных, а сервисы вызывают
+    bump() после коммита, поэтому данные снапшота не старее его версии.
+    """
+
+    def __init__(self, delay: float, directory: str | None = None):
+        self.delay = delay
+        self.directory = Path(directory) if directory else None
+        self.snapshot: DirectorySnapshot | None = None
+        self._engine: AsyncEngine | None = None
+        self._task: asyncio.Task | None = None
+        self._dirty = False
+
+    async def start(self, engine: AsyncEngine):
+        """Собирает первый снапшот при старте приложения и включает фоновую пересборку."""
+        self._engine = engine
+        await self.rebuild()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._engine = None
+
+    async def rebuild(self) -> DirectorySnapshot:
+        version = directory_version.value
+        etag = directory_version.etag
+        async with AsyncSession(self._engine) as session:
+            users = await UserRepository(session).get_all_user_rows(active_only=True)
+            departments = await DepartmentRepository(session).get_department_rows()
+            legal_entities = await LegalEntityRepository(session).get_legal_entity_rows()
+            skills = await SkillRepository(session).get_all_skills()
+
+        built_at = datetime.now(timezone.utc)
+        content = {
+            "version": etag,
+            "built_at": built_at,
+            "users": users,
+            "departments": departments,
+            "legal_entities": legal_entities,
+            "skills": [{"id": skill.id, "name": skill.name} for skill in skills],
+        }
+        # Кодирование и сжатие нагружают CPU — выполняются вне цикла событий
+        bodies = await asyncio.to_thread(lambda: _compress(dumps_bytes(content)))
+        if self.directory is not None:
+            await asyncio.to_thread(_write_files, self.directory, bodies)
+
+        snapshot = DirectorySnapshot(version=version, etag=etag, built_at=built_at, bodies=bodies)
+        if self.snapshot is None or self.snapshot.version <= version:
+            self.snapshot = snapshot
+        logger.info(
+            "Directory snapshot %s built: %s users, %s",
+            etag,
+            len(users),
+            ", ".join(f"{coding}={len(body)}B" for coding, body in bodies.items()),
+        )
+        return snapshot
+
+    def schedule_rebuild(self):
+        """Обработчик изменения справочника: запускает отложенную пересборку, если она еще не запущена."""
+        if self._engine is None:
+            return
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._rebuild_loop())
+
+    async def _rebuild_loop(self):
+        while self._dirty:
+            self._dirty = False
+            await asyncio.sleep(self.delay)
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Directory snapshot rebuild failed")
+
+    async def get(self) -> DirectorySnapshot:
+        """Текущий снапшот; если он еще не собран, собирает его сразу."""
+        if self.snapshot is None:
+            return await self.rebuild()
+        return self.snapshot
+
+
+directory_snapshot = DirectorySnapshotStore(settings.SNAPSHOT_REBUILD_DELAY_SECONDS, settings.SNAPSHOT_DIR)
+directory_version.subscribe(directory_snapshot.schedule_rebuild)
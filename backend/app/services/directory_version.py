@@ -0,0 +1,32 @@
+from typing import Callable
+from uuid import uuid4
+
+
+class DirectoryVersion:
+    """
+    Счетчик изменений справочника (сотрудники, навыки, отделы, юрлица, аватары) в памяти процесса.
+    Сервисы вызывают bump() после каждой записи. Эпоха — случайный идентификатор запуска:
+    после перезапуска счетчик начинается заново, но прежние ETag уже не совпадут.
+    """
+
+    def __init__(self):
+        self.epoch = uuid4().hex[:12]
+        self.value = 0
+        self._listeners: list[Callable[[], None]] = []
+
+    def subscribe(self, listener: Callable[[], None]):
+        """Регистрирует обработчик, вызываемый при каждом изменении справочника."""
+        self._listeners.append(listener)
+
+    def bump(self):
+        self.value += 1
+        for listener in self._listeners:
+            listener()
+
+    @property
+    def etag(self) -> str:
+        """Слабый ETag текущего состояния справочника."""
+        return f'W/"{self.epoch}-{self.value}"'
+
+
+directory_version = DirectoryVersion()
@@ -7,6 +7,7 @@ from app.exceptions.legal_entity import LegalEntityAlreadyExists, LegalEntityInU
 from app.models import LegalEntity
 from app.repositories.legal_entity_repository import LegalEntityRepository
 from app.schemas.legal_entity import LegalEntityUpdate
+from app.services.directory_version import directory_version
 
 
 class LegalEntityService:
@@ -33,7 +34,9 @@ class LegalEntityService:
 
     async def create_legal_entity(self, name: str) -> LegalEntity:
         await self._check_unique_name(name)
-        return await self.le_repository.create_legal_entity(name)
+        entity = await self.le_repository.create_legal_entity(name)
+        directory_version.bump()
+        return entity
 
     async def update_legal_entity(self, legal_entity_id: UUID, updates: LegalEntityUpdate) -> LegalEntity:
         update_data = updates.model_dump(exclude_unset=True)
@@ -42,6 +45,7 @@ class LegalEntityService:
         updated_entity = await self.le_repository.update_legal_entity(legal_entity_id, update_data)
         if not updated_entity:
             raise LegalEntityNotFound(legal_entity_id)
+        directory_version.bump()
         return updated_entity
 
     async def delete_legal_entity(self, legal_entity_id: UUID) -> None:
@@ -52,3 +56,4 @@ class LegalEntityService:
         deleted_count = await self.le_repository.delete_legal_entity(legal_entity_id)
         if not deleted_count:
             raise LegalEntityNotFound(legal_entity_id)
+        directory_version.bump()
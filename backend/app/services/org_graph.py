@@ -0,0 +1,233 @@
+import asyncio
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.repositories.department_repository import DepartmentRepository
+from app.repositories.user_repository import UserRepository
+from app.services.directory_version import directory_version
+
+logger = get_logger()
+
+
+@dataclass(slots=True, frozen=True)
+class ChainLink:
+    """Звено цепочки подчинения: отдел и его руководитель."""
+
+    department_id: UUID
+    department_name: str
+    manager_id: UUID
+    manager_name: str | None
+
+
+class OrgGraph:
+    """
+    Неизменяемый снимок оргструктуры в массивах: отдел — номер узла, parent[узел] — номер родителя (-1 у корня).
+    Обход в глубину дает каждому узлу интервал [tin, tout), внутри которого лежат все его потомки,
+    поэтому проверка «потомок ли» — два сравнения. По эйлерову обходу строится разреженная таблица
+    узлов минимальной глубины, и наименьший общий предок двух отделов находится за O(1).
+    """
+
+    def __init__(
+        self,
+        version: int,
+        departments: Sequence[tuple[UUID, str, UUID | None, UUID | None, str | None]],
+        assignments: Sequence[tuple[UUID, UUID | None]],
+    ):
+        """
+        :param departments: строки DepartmentRepository.get_org_graph_rows
+        :param assignments: строки UserRepository.get_department_assignments (активные сотрудники)
+        """
+        self.version = version
+        self.ids = [department_id for department_id, *_ in departments]
+        self.names = [name for _, name, *_ in departments]
+        self.manager_ids = [manager_id for *_, manager_id, _ in departments]
+        self.manager_names = [manager_name for *_, manager_name in departments]
+        self._index = {department_id: node for node, department_id in enumerate(self.ids)}
+
+        size = len(self.ids)
+        self.parent = array("i", [-1]) * size
+        children: list[list[int]] = [[] for _ in range(size)]
+        for node, (_, _, parent_id, *_) in enumerate(departments):
+            parent = self._index.get(parent_id, -1)
+            if parent != -1:
+                self.parent[node] = parent
+                children[parent].append(node)
+        # Отдел активного сотрудника; -1 — сотрудник без отдела
+        self._user_department = {user_id: self._index.get(department_id, -1) for user_id, department_id in assignments}
+        self._build_tour(children)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _build_tour(self, children: list[list[int]]):
+        size = len(self.ids)
+        self.depth = array("i", [0]) * size
+        self.root = array("i", [-1]) * size
+        self.tin = array("i", [0]) * size
+        self.tout = array("i", [0]) * size
+        self._first = array("i", [0]) * size
+        euler = array("i")
+        timer = 0
+        for root in range(size):
+            if self.parent[root] != -1:
+                continue
+            self.root[root] = root
+            self.tin[root] = timer
+            timer += 1
+            self._first[root] = len(euler)
+            euler.append(root)
+            # Обход без рекурсии: в стеке пары (узел, номер следующего ребенка)
+            stack = [(root, 0)]
+            while stack:
+                node, next_child = stack[-1]
+                if next_child < len(children[node]):
+                    stack[-1] = (node, next_child + 1)
+                    child = children[node][next_child]
+                    self.depth[child] = self.depth[node] + 1
+                    self.root[child] = root
+                    self.tin[child] = timer
+                    timer += 1
+                    self._first[child] = len(euler)
+                    euler.append(child)
+                    stack.append((child, 0))
+                else:
+                    stack.pop()
+                    self.tout[node] = timer
+                    if stack:
+                        euler.append(stack[-1][0])
+
+        unreachable = self.root.count(-1)
+        if unreachable:
+            logger.warning("Org graph: %s departments are not reachable from any root", unreachable)
+
+        # sparse[k][i] — узел минимальной глубины на отрезке эйлерова обхода [i, i + 2^k)
+        self._sparse = [euler]
+        while 2 ** len(self._sparse) <= len(euler):
+            previous = self._sparse[-1]
+            half = 2 ** (len(self._sparse) - 1)
+            self._sparse.append(
+                array("i", (a if self.depth[a] <= self.depth[b] else b for a, b in zip(previous, previous[half:])))
+            )
+
+    def _lca(self, u: int, v: int) -> int:
+        """Наименьший общий предок двух узлов одного дерева."""
+        left, right = sorted((self._first[u], self._first[v]))
+        level = (right - left + 1).bit_length() - 1
+        a, b = self._sparse[level][left], self._sparse[level][right - (1 << level) + 1]
+        return a if self.depth[a] <= self.depth[b] else b
+
+    def _managers_above(self, node: int, exclude: set[UUID]) -> Iterator[ChainLink]:
+        """Руководители отдела node и его предков снизу вверх, без exclude и без повторов подряд."""
+        previous = None
+        while node != -1:
+            manager_id = self.manager_ids[node]
+            if manager_id is not None and manager_id not in exclude and manager_id != previous:
+                previous = manager_id
+                yield ChainLink(self.ids[node], self.names[node], manager_id, self.manager_names[node])
+            node = self.parent[node]
+
+    def is_descendant(self, child_id: UUID, parent_id: UUID) -> bool:
+        """Является ли child_id потомком parent_id (или им самим)."""
+        child, parent = self._index.get(child_id), self._index.get(parent_id)
+        if child is None or parent is None or self.root[child] == -1 or self.root[parent] == -1:
+            return False
+        return self.tin[parent] <= self.tin[child] < self.tout[parent]
+
+    def has_user(self, user_id: UUID) -> bool:
+        """Есть ли в графе активный сотрудник user_id (с отделом или без)."""
+        return user_id in self._user_department
+
+    def reporting_chain(self, user_id: UUID) -> list[ChainLink]:
+        """
+        Цепочка подчинения сотрудника: руководители его отдела и отделов выше, от ближайшего к верхнему.
+        Сам сотрудник в цепочку не входит.
+        """
+        node = self._user_department.get(user_id, -1)
+        return list(self._managers_above(node, {user_id})) if node != -1 else []
+
+    def common_manager(self, a: UUID, b: UUID) -> tuple[UUID | None, ChainLink | None]:
+        """
+        Ближайший общий руководитель двух сотрудников: первый руководитель, кроме них самих,
+        начиная с наименьшего общего отдела вверх.
+        :return: ID общего отдела и звено с руководителем; (None, None), если общего отдела нет
+        """
+        u, v = self._user_department.get(a, -1), self._user_department.get(b, -1)
+        if u == -1 or v == -1 or self.root[u] == -1 or self.root[u] != self.root[v]:
+            return None, None
+        lca = self._lca(u, v)
+        return self.ids[lca], next(self._managers_above(lca, {a, b}), None)
+
+
+class OrgGraphStore:
+    """
+    Граф оргструктуры в памяти процесса. Собирается при старте приложения и пересобирается в фоне
+    после изменения справочника (directory_version) с небольшой задержкой, чтобы серия записей
+    дала одну пересборку. Версия фиксируется до чтения данных, как у снапшота справочника.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.graph: OrgGraph | None = None
+        self._engine: AsyncEngine | None = None
+        self._task: asyncio.Task | None = None
+        self._dirty = False
+
+    async def start(self, engine: AsyncEngine):
+        self._engine = engine
+        await self.rebuild()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._engine = None
+
+    async def rebuild(self) -> OrgGraph:
+        version = directory_version.value
+        async with AsyncSession(self._engine) as session:
+            departments = await DepartmentRepository(session).get_org_graph_rows()
+            assignments = await UserRepository(session).get_department_assignments()
+
+        graph = OrgGraph(version, departments, assignments)
+        if self.graph is None or self.graph.version <= version:
+            self.graph = graph
+        logger.info("Org graph %s built: %s departments, %s users", version, len(graph), len(assignments))
+        return graph
+
+    def schedule_rebuild(self):
+        """Обработчик изменения справочника: запускает отложенную пересборку, если она еще не запущена."""
+        if self._engine is None:
+            return
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._rebuild_loop())
+
+    async def _rebuild_loop(self):
+        while self._dirty:
+            self._dirty = False
+            await asyncio.sleep(self.delay)
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Org graph rebuild failed")
+
+    async def get(self) -> OrgGraph:
+        """Текущий граф (возможно, отстающий от БД на время пересборки); если он еще не собран, собирает сразу."""
+        if self.graph is None:
+            return await self.rebuild()
+        return self.graph
+
+    def current(self) -> OrgGraph | None:
+        """Граф, только если он собран по последней версии справочника, иначе None."""
+        if self.graph is not None and self.graph.version == directory_version.value:
+            return self.graph
+        return None
+
+
+org_graph = OrgGraphStore(settings.ORG_GRAPH_REBUILD_DELAY_SECONDS)
+directory_version.subscribe(org_graph.schedule_rebuild)
@@ -0,0 +1,73 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.exceptions.user import UserNotFound
+from app.repositories.department_repository import DepartmentRepository
+from app.services.org_graph import ChainLink, org_graph
+
+
+class OrgService:
+    """Оргструктура: юрлица и дерево их отделов."""
+
+    def __init__(self, db: AsyncSession):
+        self.department_repo = DepartmentRepository(db)
+
+    async def get_tree(self) -> list[dict]:
+        """
+        Дерево юрлицо → отдел → подотдел, собранное из плоских строк одного запроса.
+        Численность поддерева суммируется снизу вверх: строки идут по возрастанию глубины,
+        поэтому при обходе в обратном порядке потомки учитываются раньше родителей.
+        """
+        legal_entities: dict = {}
+        departments: dict = {}
+        parents: list[tuple[dict, dict]] = []
+        for row in await self.department_repo.get_org_tree_rows():
+            legal_entity = legal_entities.get(row["legal_entity_id"])
+            if legal_entity is None:
+                legal_entity = legal_entities[row["legal_entity_id"]] = {
+                    "id": row["legal_entity_id"],
+                    "name": row["legal_entity_name"],
+                    "total_headcount": 0,
+                    "departments": [],
+                }
+            if row["id"] is None:
+                continue
+
+            department = departments[row["id"]] = {
+                "id": row["id"],
+                "name": row["name"],
+                "manager_id": row["manager_id"],
+                "manager_name": row["manager_name"],
+                "headcount": row["headcount"],
+                "total_headcount": row["headcount"],
+                "subdepartments": [],
+            }
+            parent = departments.get(row["parent_id"]) if row["parent_id"] else None
+            if parent is None:
+                legal_entity["departments"].append(department)
+            else:
+                parent["subdepartments"].append(department)
+                parents.append((department, parent))
+
+        for department, parent in reversed(parents):
+            parent["total_headcount"] += department["total_headcount"]
+        for legal_entity in legal_entities.values():
+            legal_entity["total_headcount"] = sum(d["total_headcount"] for d in legal_entity["departments"])
+        return list(legal_entities.values())
+
+    async def get_reporting_chain(self, user_id: UUID) -> list[ChainLink]:
+        """Руководители сотрудника снизу вверх по графу оргструктуры в памяти, без обращения к БД."""
+        graph = await org_graph.get()
+        if not graph.has_user(user_id):
+            raise UserNotFound(user_id)
+        return graph.reporting_chain(user_id)
+
+    async def get_common_manager(self, a: UUID, b: UUID) -> dict:
+        """Наименьший общий отдел и ближайший общий руководитель двух сотрудников по графу в памяти."""
+        graph = await org_graph.get()
+        for user_id in (a, b):
+            if not graph.has_user(user_id):
+                raise UserNotFound(user_id)
+        department_id, manager = graph.common_manager(a, b)
+        return {"department_id": department_id, "manager": manager}
@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.config import settings
+from app.services.directory_version import directory_version
+
+
+def _normalize_filter(values: list | None) -> tuple:
+    return tuple(sorted({str(value).lower() for value in values})) if values else ()
+
+
+def normalize_search_query(search_query: str) -> str:
+    """Запрос в нижнем регистре с одиночными пробелами: по нему и ищут, и строят ключ кэша."""
+    return " ".join(search_query.lower().split())
+
+
+def search_cache_key(
+    search_query: str,
+    cities: list[str] | None = None,
+    skills: list[str] | None = None,
+    departments: list | None = None,
+    legal_entities: list | None = None,
+) -> tuple:
+    """
+    Ключ кэша поиска: запрос и отсортированные списки фильтров.
+    Запрос должен быть уже нормализован normalize_search_query — тем же текстом, что уходит в репозиторий,
+    иначе запросы с разными результатами попадут в одну запись.
+    Фильтры в репозитории сравниваются без учета регистра, поэтому значения тоже приводятся к нижнему.
+    """
+    return (
+        search_query,
+        _normalize_filter(cities),
+        _normalize_filter(skills),
+        _normalize_filter(departments),
+        _normalize_filter(legal_entities),
+    )
+
+
+class SearchResultCache:
+    """
+    Ограниченный по размеру LRU-кэш результатов поиска с временем жизни записей.
+
+    Каждая запись привязана к версии кэша. При любом изменении справочника (directory_version)
+    вызывается bump_version(): кэш очищается, а результат запроса, начатого до изменения,
+    сохраняется под старой версией и уже не будет прочитан.
+    Кэш живет в памяти процесса, как и триграммный индекс поиска.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: int) -> Any | None:
+        """Возвращает сохраненный результат или None, если записи нет, она устарела или истекла."""
+        entry_key = (version, key)
+        entry = self._entries.get(entry_key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[entry_key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(entry_key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, version: int, value: Any):
+        """Сохраняет результат, вычисленный при версии справочника version."""
+        if version != self.version:
+            return
+        entry_key = (version, key)
+        self._entries[entry_key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def bump_version(self):
+        """Отмечает изменение справочника: все ранее сохраненные результаты становятся недействительными."""
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "version": self.version,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+search_result_cache = SearchResultCache(settings.SEARCH_CACHE_SIZE, settings.SEARCH_CACHE_TTL_SECONDS)
+directory_version.subscribe(search_result_cache.bump_version)
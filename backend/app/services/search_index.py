@@ -0,0 +1,313 @@
+import heapq
+import re
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.logger import get_logger
+from app.models import User
+from app.repositories.department_repository import DepartmentRepository
+from app.repositories.skill_repository import SkillRepository
+from app.repositories.user_repository import UserRepository
+
+logger = get_logger()
+
+_WORD_RE = re.compile(r"\w+")
+_COMPACT_MIN_SIZE = 1024
+
+
+def normalize(text: str) -> str:
+    """Приводит строку к нижнему регистру, убирает диакритику и заменяет ё на е."""
+    decomposed = unicodedata.normalize("NFKD", text.lower().replace("ё", "е"))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _prefix_tokens(first_name: str, last_name: str, email: str) -> tuple[str, ...]:
+    """Токены для префиксного поиска: слова имени, фамилии и email, а также email целиком."""
+    tokens = {*_WORD_RE.findall(normalize(f"{first_name} {last_name} {email}")), normalize(email)}
+    return tuple(sorted(tokens))
+
+
+def _trigrams(text: str, prefix: bool = False) -> set[str]:
+    """
+    Разбивает строку на триграммы по правилам pg_trgm: слова дополняются
+    двумя пробелами слева и одним справа.
+    prefix=True не дополняет последнее слово справа — оно может быть недонабрано.
+    """
+    words = _WORD_RE.findall(text.lower())
+    result = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if prefix and i == len(words) - 1 else f"  {word} "
+        result.update(padded[j : j + 3] for j in range(len(padded) - 2))
+    return result
+
+
+@dataclass(slots=True)
+class SearchDocument:
+    user_id: UUID
+    first_name: str
+    last_name: str
+    position: str | None
+    email: str
+    city: str | None
+    department_id: UUID | None
+    skill_ids: frozenset[UUID]
+    photo_url: str | None
+    tokens: tuple[str, ...] = ()
+    trigram_count: int = 0
+
+
+def _document_from_row(row: tuple) -> SearchDocument:
+    """Документ индекса из строки UserRepository.get_search_index_rows."""
+    user_id, first_name, last_name, position, email, city, department_id, skill_ids, photo_url = row
+    return SearchDocument(
+        user_id=user_id,
+        first_name=first_name,
+        last_name=last_name,
+        position=position,
+        email=email,
+        city=city,
+        department_id=department_id,
+        skill_ids=frozenset(skill_ids or ()),
+        photo_url=photo_url,
+    )
+
+
+class UserSearchIndex:
+    """
+    Триграммный инвертированный индекс активных сотрудников в памяти процесса.
+    Индексируются имя, фамилия, должность и email. Постинги — отсортированные
+    массивы целых номеров документов. Для подсказок при наборе дополнительно
+    хранится отсортированный массив пар (токен, номер документа).
+
+    Индекс загружается при старте приложения и обновляется сервисами при записи,
+    поэтому согласован только в пределах одного процесса.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, array] = {}
+        self._prefixes: list[tuple[str, int]] = []
+        self._documents: list[SearchDocument | None] = []
+        self._doc_ids: dict[UUID, int] = {}
+        self._department_legal_entity: dict[UUID, UUID] = {}
+        self._skill_ids: dict[str, UUID] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    async def load(self, engine: AsyncEngine):
+        """Полностью перестраивает индекс по данным из БД."""
+        async with AsyncSession(engine) as session:
+            rows = await UserRepository(session).get_search_index_rows()
+            departments = await DepartmentRepository(session).get_legal_entity_map()
+            skills = await SkillRepository(session).get_all_skills()
+
+        self._department_legal_entity = dict(departments)
+        self._skill_ids = {skill.name.lower(): skill.id for skill in skills}
+        self._rebuild(_document_from_row(row) for row in rows)
+        self.loaded = True
+        logger.info("User search index loaded: %s documents, %s trigrams", len(self._doc_ids), len(self._postings))
+
+    def upsert_user(self, user: User):
+        """Добавляет или переиндексирует пользователя. Неактивные пользователи удаляются из индекса."""
+        self.remove_user(user.id)
+        if user.is_active:
+            self._add(
+                SearchDocument(
+                    user_id=user.id,
+                    first_name=user.first_name,
+                    last_name=user.last_name,
+                    position=user.position,
+                    email=user.email,
+                    city=user.city,
+                    department_id=user.department_id,
+                    skill_ids=frozenset(skill.id for skill in user.skills),
+                    photo_url=user.photo_url,
+                )
+            )
+
+    def add_documents(self, documents: list[SearchDocument]):
+        """
+        Добавляет пачку пользователей, которых еще нет в индексе.
+        Массив токенов сортируется один раз в конце, а не вставкой на каждый документ.
+        """
+        for document in documents:
+            self._add(document, bulk=True)
+        self._prefixes.sort()
+
+    def refresh_users(self, user_ids: list[UUID], rows: Sequence[tuple]):
+        """
+        Переиндексирует пользователей user_ids по свежим строкам get_search_index_rows(user_ids).
+        Пользователи без строки (неактивные) удаляются из индекса.
+        """
+        for user_id in user_ids:
+            self.remove_user(user_id)
+        self.add_documents([_document_from_row(row) for row in rows])
+
+    def remove_user(self, user_id: UUID):
+        doc_id = self._doc_ids.pop(user_id, None)
+        if doc_id is None:
+            return
+        document = self._documents[doc_id]
+        self._documents[doc_id] = None
+        trigrams = self._document_trigrams(document.first_name, document.last_name, document.position, document.email)
+        for trigram in trigrams:
+            postings = self._postings[trigram]
+            del postings[bisect_left(postings, doc_id)]
+            if not postings:
+                del self._postings[trigram]
+        for token in document.tokens:
+            del self._prefixes[bisect_left(self._prefixes, (token, doc_id))]
+        if len(self._documents) > _COMPACT_MIN_SIZE and len(self._doc_ids) * 2 < len(self._documents):
+            self._compact()
+
+    def set_photo_url(self, user_id: UUID, photo_url: str | None):
+        doc_id = self._doc_ids.get(user_id)
+        if doc_id is not None:
+            self._documents[doc_id].photo_url = photo_url
+
+    def set_department(self, department_id: UUID, legal_entity_id: UUID):
+        self._department_legal_entity[department_id] = legal_entity_id
+
+    def set_skill(self, skill_id: UUID, name: str):
+        self._skill_ids = {k: v for k, v in self._skill_ids.items() if v != skill_id}
+        self._skill_ids[name.lower()] = skill_id
+
+    def remove_skill(self, skill_id: UUID):
+        self._skill_ids = {k: v for k, v in self._skill_ids.items() if v != skill_id}
+
+    def search(
+        self,
+        search_query: str,
+        threshold: float,
+        limit: int,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> list[tuple[SearchDocument, float]]:
+        """
+        Возвращает до limit документов, у которых доля совпавших триграмм запроса не ниже threshold.
+        Равные по доле совпадения документы упорядочиваются по similarity (как в pg_trgm).
+        """
+        query_trigrams = _trigrams(search_query, prefix=True)
+        total = len(query_trigrams)
+        shared = Counter()
+        for trigram in query_trigrams:
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                shared.update(postings)
+        if not shared:
+            return []
+
+        city_set = {c.lower() for c in cities} if cities else None
+        department_set = set(departments) if departments else None
+        legal_entity_set = set(legal_entities) if legal_entities else None
+        skill_set = None
+        if skills:
+            skill_set = {self._skill_ids.get(s.lower()) for s in skills}
+            if None in skill_set:
+                return []
+
+        min_shared = threshold * total
+        candidates = []
+        for doc_id, count in shared.items():
+            if count < min_shared:
+                continue
+            document = self._documents[doc_id]
+            if city_set is not None and (document.city or "").lower() not in city_set:
+                continue
+            if department_set is not None and document.department_id not in department_set:
+                continue
+            if (
+                legal_entity_set is not None
+                and self._department_legal_entity.get(document.department_id) not in legal_entity_set
+            ):
+                continue
+            if skill_set is not None and not skill_set <= document.skill_ids:
+                continue
+            similarity = count / (total + document.trigram_count - count)
+            candidates.append((count / total, similarity, doc_id))
+
+        top = heapq.nlargest(limit, candidates)
+        return [(self._documents[doc_id], score) for score, _, doc_id in top]
+
+    def suggest(self, search_query: str, limit: int, budget_ms: float) -> list[SearchDocument]:
+        """
+        Подсказки при наборе: каждое слово запроса должно быть префиксом какого-либо токена документа.
+        Кандидаты перебираются в порядке токенов, поэтому точные совпадения идут первыми.
+        Перебор прекращается по исчерпании бюджета времени budget_ms — тогда возвращается то, что успели найти.
+        """
+        words = sorted(set(_WORD_RE.findall(normalize(search_query))), key=len, reverse=True)
+        if not words:
+            return []
+        deadline = time.perf_counter() + budget_ms / 1000
+
+        # Самое длинное слово обычно дает самый узкий диапазон в массиве токенов
+        head, rest = words[0], words[1:]
+        position = bisect_left(self._prefixes, (head,))
+        seen = set()
+        result = []
+        for i in range(position, len(self._prefixes)):
+            token, doc_id = self._prefixes[i]
+            if not token.startswith(head) or len(result) >= limit:
+                break
+            if (i - position) % 64 == 63 and time.perf_counter() > deadline:
+                logger.warning("Suggest budget exceeded for query '%s'", search_query)
+                break
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            document = self._documents[doc_id]
+            if all(any(t.startswith(word) for t in document.tokens) for word in rest):
+                result.append(document)
+        return result
+
+    @staticmethod
+    def _document_trigrams(first_name: str, last_name: str, position: str | None, email: str) -> set[str]:
+        return _trigrams(" ".join(filter(None, (first_name, last_name, position, email))))
+
+    def _add(self, document: SearchDocument, bulk: bool = False):
+        trigrams = self._document_trigrams(document.first_name, document.last_name, document.position, document.email)
+        document.trigram_count = len(trigrams)
+        document.tokens = _prefix_tokens(document.first_name, document.last_name, document.email)
+        doc_id = len(self._documents)
+        self._documents.append(document)
+        self._doc_ids[document.user_id] = doc_id
+        # Номера документов только растут, поэтому append сохраняет постинги отсортированными
+        for trigram in trigrams:
+            postings = self._postings.get(trigram)
+            if postings is None:
+                self._postings[trigram] = array("I", (doc_id,))
+            else:
+                postings.append(doc_id)
+        for token in document.tokens:
+            if bulk:
+                self._prefixes.append((token, doc_id))
+            else:
+                insort(self._prefixes, (token, doc_id))
+
+    def _rebuild(self, documents):
+        """Строит индекс заново; массив токенов сортируется один раз в конце."""
+        self._postings = {}
+        self._prefixes = []
+        self._documents = []
+        self._doc_ids = {}
+        for document in documents:
+            self._add(document, bulk=True)
+        self._prefixes.sort()
+
+    def _compact(self):
+        """Перенумеровывает документы, избавляясь от удаленных записей."""
+        self._rebuild([document for document in self._documents if document is not None])
+
+
+user_search_index = UserSearchIndex()
@@ -7,6 +7,8 @@ from app.exceptions.skill import SkillAlreadyExists, SkillNotFound
 from app.models.skill import Skill
 from app.repositories.skill_repository import SkillRepository
 from app.schemas.skill import SkillCreate, SkillUpdate
+from app.services.directory_version import directory_version
+from app.services.search_index import user_search_index
 
 
 class SkillService:
@@ -25,6 +27,8 @@ class SkillService:
         await self._check_unique_name(create_data.name)
 
         new_skill = await self.skill_repo.create_skill(create_data.name)
+        user_search_index.set_skill(new_skill.id, new_skill.name)
+        directory_version.bump()
         return new_skill
 
     async def get_skill(self, skill_id: UUID) -> Skill:
@@ -52,6 +56,8 @@ class SkillService:
             new_name = update_data["name"]
             await self._check_unique_name(new_name, ignore_id=skill.id)
             skill = await self.skill_repo.update_skill_name(skill, new_name)
+            user_search_index.set_skill(skill.id, skill.name)
+            directory_version.bump()
 
         return skill
 
@@ -63,3 +69,5 @@ class SkillService:
             raise SkillNotFound(skill_id)
 
         await self.skill_repo.delete_skill(skill)
+        user_search_index.remove_skill(skill_id)
+        directory_version.bump()
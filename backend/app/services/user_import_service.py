@@ -0,0 +1,257 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.deps.db import AsyncSessionLocal
+from app.enums import ImportJobStatusEnum
+from app.exceptions.user import ImportJobNotFound, InvalidImportFile
+from app.repositories.department_repository import DepartmentRepository
+from app.repositories.legal_entity_repository import LegalEntityRepository
+from app.repositories.skill_repository import SkillRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import UserImportError, UserImportReport, UserImportRow
+from app.services.directory_version import directory_version
+from app.services.search_index import SearchDocument, user_search_index
+from app.utils.password import hash_passwords
+from app.utils.tabular import read_table
+
+logger = get_logger()
+
+_REQUIRED_COLUMNS = {name for name, field in UserImportRow.model_fields.items() if field.is_required()}
+
+
+def _parse_rows(
+    file: BinaryIO, filename: str | None
+) -> tuple[int, list[tuple[int, UserImportRow]], list[UserImportError]]:
+    """
+    Читает и валидирует строки файла. Выполняется в отдельном потоке: чтение XLSX и валидация
+    тысяч строк занимают CPU. Возвращает число строк, валидные строки и ошибки.
+    """
+    total = 0
+    valid, errors = [], []
+    seen_emails: dict[str, int] = {}
+    for line, data in read_table(file, filename):
+        if total == 0:
+            missing = _REQUIRED_COLUMNS - data.keys()
+            if missing:
+                raise InvalidImportFile(f"missing columns: {', '.join(sorted(missing))}")
+        total += 1
+        if total > settings.IMPORT_ROWS_MAX:
+            raise InvalidImportFile(f"more than {settings.IMPORT_ROWS_MAX} rows")
+
+        try:
+            row = UserImportRow.model_validate(data)
+        except ValidationError as exc:
+            messages = [f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors()]
+            email = data.get("email")
+            errors.append(UserImportError(row=line, email=str(email) if email else None, errors=messages))
+            continue
+
+        email = str(row.email)
+        if email in seen_emails:
+            errors.append(UserImportError(row=line, email=email, errors=[f"Duplicate of row {seen_emails[email]}"]))
+            continue
+        seen_emails[email] = line
+        valid.append((line, row))
+    return total, valid, errors
+
+
+class UserImportService:
+    """
+    Массовый импорт сотрудников из CSV/XLSX, разобранных _parse_rows.
+
+    Названия отделов, юрлиц и навыков и занятые email проверяются одним запросом на каждый вид,
+    пароли хэшируются в пуле процессов, а строки загружаются через COPY во временную таблицу
+    и переносятся в users одним INSERT ... SELECT. Строки с ошибками не загружаются
+    и возвращаются в отчете, остальные импортируются.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.user_repository = UserRepository(db)
+        self.department_repository = DepartmentRepository(db)
+        self.le_repository = LegalEntityRepository(db)
+        self.skill_repository = SkillRepository(db)
+
+    async def import_rows(
+        self,
+        total: int,
+        rows: list[tuple[int, UserImportRow]],
+        errors: list[UserImportError],
+        filename: str | None = None,
+    ) -> UserImportReport:
+        departments = {
+            name.lower(): (department_id, legal_entity_id)
+            for department_id, name, legal_entity_id in await self.department_repository.get_by_names(
+                list({row.department for _, row in rows if row.department})
+            )
+        }
+        legal_entities = {
+            name.lower(): legal_entity_id
+            for legal_entity_id, name in await self.le_repository.get_by_names(
+                list({row.legal_entity for _, row in rows if row.legal_entity})
+            )
+        }
+        skills = {
+            skill.name.lower(): skill.id
+            for skill in await self.skill_repository.get_skills_by_names(
+                list({skill for _, row in rows for skill in row.skills})
+            )
+        }
+        existing_emails = await self.user_repository.get_existing_emails([str(row.email) for _, row in rows])
+
+        accepted = []
+        for line, row in rows:
+            messages = []
+            if str(row.email) in existing_emails:
+                messages.append("User already exists")
+            department = departments.get(row.department.lower()) if row.department else None
+            if row.department and department is None:
+                messages.append(f"Unknown department: {row.department}")
+            if row.legal_entity:
+                legal_entity_id = legal_entities.get(row.legal_entity.lower())
+                if legal_entity_id is None:
+                    messages.append(f"Unknown legal entity: {row.legal_entity}")
+                elif department is not None and department[1] != legal_entity_id:
+                    messages.append(f"Department {row.department} does not belong to {row.legal_entity}")
+            unknown_skills = [skill for skill in row.skills if skill.lower() not in skills]
+            if unknown_skills:
+                messages.append(f"Unknown skills: {', '.join(unknown_skills)}")
+
+            if messages:
+                errors.append(UserImportError(row=line, email=str(row.email), errors=messages))
+            else:
+                accepted.append((line, row, department[0] if department else None))
+
+        password_hashes = await hash_passwords([row.password for _, row, _ in accepted])
+        records = [
+            (
+                uuid4(),
+                str(row.email),
+                password_hash,
+                row.first_name,
+                row.last_name,
+                row.position,
+                department_id,
+                row.city,
+                row.phone,
+                row.telegram,
+                row.mattermost,
+                row.bio,
+                row.birthday,
+                sorted({skills[skill.lower()] for skill in row.skills}),
+            )
+            for (_, row, department_id), password_hash in zip(accepted, password_hashes)
+        ]
+        imported = set(await self.user_repository.import_users(records)) if records else set()
+
+        documents = []
+        for (line, row, department_id), record in zip(accepted, records):
+            if record[0] not in imported:
+                # Email заняли между проверкой и загрузкой
+                errors.append(UserImportError(row=line, email=str(row.email), errors=["User already exists"]))
+                continue
+            documents.append(
+                SearchDocument(
+                    user_id=record[0],
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    position=row.position,
+                    email=str(row.email),
+                    city=row.city,
+                    department_id=department_id,
+                    skill_ids=frozenset(record[-1]),
+                    photo_url=None,
+                )
+            )
+        if documents:
+            user_search_index.add_documents(documents)
+            directory_version.bump()
+
+        logger.info("Imported %s of %s users from %s", len(imported), total, filename)
+        return UserImportReport(total=total, imported=len(imported), errors=sorted(errors, key=lambda e: e.row))
+
+
+@dataclass(slots=True)
+class UserImportJob:
+    """Задача фонового импорта: состояние и отчет читаются через GET /employees/import/{id}."""
+
+    id: UUID
+    filename: str | None
+    total: int
+    created_at: datetime
+    status: ImportJobStatusEnum = ImportJobStatusEnum.PENDING
+    finished_at: datetime | None = None
+    report: UserImportReport | None = None
+    error: str | None = None
+
+
+class UserImportJobStore:
+    """
+    Фоновые задачи импорта в памяти процесса. Файл разбирается и валидируется сразу в запросе,
+    чтобы ошибка формата вернулась кодом 400, а проверка строк по БД, хэширование паролей и загрузка
+    идут в отдельной задаче со своей сессией: на тысячи строк bcrypt занимает минуты, дольше таймаутов
+    прокси и клиента. Завершенные задачи хранятся ttl секунд.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._jobs: dict[UUID, UserImportJob] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, file: BinaryIO, filename: str | None) -> UserImportJob:
+        """
+        Разбирает файл и ставит импорт в очередь.
+        :raises InvalidImportFile: если формат не поддерживается или файл поврежден
+        """
+        total, rows, errors = await asyncio.to_thread(_parse_rows, file, filename)
+        self._evict()
+        job = UserImportJob(id=uuid4(), filename=filename, total=total, created_at=datetime.now(timezone.utc))
+        self._jobs[job.id] = job
+        task = asyncio.create_task(self._run(job, rows, errors))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: UserImportJob, rows: list[tuple[int, UserImportRow]], errors: list[UserImportError]):
+        job.status = ImportJobStatusEnum.RUNNING
+        try:
+            async with AsyncSessionLocal() as session:
+                job.report = await UserImportService(session).import_rows(job.total, rows, errors, job.filename)
+            job.status = ImportJobStatusEnum.DONE
+        except asyncio.CancelledError:
+            job.status, job.error = ImportJobStatusEnum.FAILED, "Application shutdown"
+            raise
+        except Exception as exc:
+            logger.exception("Import job %s failed", job.id)
+            job.status, job.error = ImportJobStatusEnum.FAILED, str(exc)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    def _evict(self):
+        """Удаляет завершенные задачи старше ttl."""
+        expired_before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        for job_id in [job.id for job in self._jobs.values() if job.finished_at and job.finished_at < expired_before]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: UUID) -> UserImportJob:
+        """:raises ImportJobNotFound: если задачи нет или она уже удалена по ttl"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ImportJobNotFound(job_id)
+        return job
+
+    async def stop(self):
+        """Отменяет незавершенные импорты при остановке приложения."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+user_import_jobs = UserImportJobStore(settings.IMPORT_JOB_TTL_SECONDS)
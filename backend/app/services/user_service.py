@@ -1,20 +1,127 @@
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator
 from uuid import UUID
 
 from sqlalchemy import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.logger import get_logger
+from app.deps.db import AsyncSessionLocal
+from app.enums import ExportFormatEnum, SearchFacetEnum, SearchModeEnum, StreamFormatEnum, UserSortEnum
 from app.exceptions.skill import SkillNotFound
-from app.exceptions.user import UserNotFound
+from app.exceptions.user import DuplicateBulkItems, InvalidCursor, UnknownUserFields, UserNotFound
 from app.models import User
 from app.repositories.skill_repository import SkillRepository
-from app.repositories.user_repository import UserRepository
-from app.schemas.skill import SetSkillsRequest
-from app.schemas.user import UserUpdate
+from app.repositories.user_repository import (
+    HIGHLIGHT_FIELDS,
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    USER_LIST_FIELD_TYPES,
+    USER_LIST_FIELDS,
+    UserRepository,
+    UserRow,
+)
+from app.schemas.skill import SetSkillsBulkResult, SetSkillsRequest, UserSkillsItem
+from app.schemas.user import (
+    UserBulkDeactivateResult,
+    UserBulkUpdateItem,
+    UserBulkUpdateResult,
+    UserSearchHit,
+    UserSuggestion,
+    UserUpdate,
+)
+from app.services.directory_version import directory_version
+from app.services.search_cache import normalize_search_query, search_cache_key, search_result_cache
+from app.services.search_index import user_search_index
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.responses import dumps_bytes
+from app.utils.tabular import write_table
 
 logger = get_logger()
 
 
+def _highlight_offsets(marked: str) -> list[tuple[int, int]]:
+    """Переводит разметку ts_headline в смещения [начало, конец) в исходной строке."""
+    offsets = []
+    position = 0
+    start = None
+    for ch in marked:
+        if ch == HIGHLIGHT_START:
+            start = position
+        elif ch == HIGHLIGHT_STOP:
+            if start is not None:
+                offsets.append((start, position))
+            start = None
+        else:
+            position += 1
+    return offsets
+
+
+def _decode_rank_cursor(cursor: str | None) -> tuple[float, UUID] | None:
+    """Декодирует курсор (score, id) для постраничного поиска."""
+    if not cursor:
+        return None
+    payload = decode_cursor(cursor)
+    try:
+        return float(payload["score"]), UUID(payload["id"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def _parse_fields(fields: list[str] | None) -> list[str]:
+    """
+    Разбирает параметр fields= (повторяющийся и/или через запятую). Без него выдаются все поля.
+    id выдается всегда: он нужен клиенту для ссылок на сотрудника.
+    """
+    if not fields:
+        return list(USER_LIST_FIELDS)
+    requested = [name.strip() for value in fields for name in value.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in USER_LIST_FIELDS]
+    if unknown:
+        raise UnknownUserFields(unknown)
+    return ["id", *dict.fromkeys(name for name in requested if name != "id")]
+
+
+def _decode_sort_cursor(cursor: str | None, sort: UserSortEnum) -> tuple | None:
+    """Декодирует курсор (ключ сортировки, id) списка сотрудников; курсор другой сортировки недействителен."""
+    if not cursor:
+        return None
+    payload = decode_cursor(cursor)
+    try:
+        if payload["sort"] != sort.value:
+            raise InvalidCursor(cursor)
+        key = payload["key"]
+        if sort.value.lstrip("-") == UserSortEnum.CREATED_AT.value:
+            key = datetime.fromisoformat(key)
+        elif not isinstance(key, str):
+            raise InvalidCursor(cursor)
+        return key, UUID(payload["id"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def _decode_change_token(token: str | None) -> tuple[int, tuple[int, UUID] | None, int | None]:
+    """
+    Токен дельта-синхронизации: {"since": граница} между проходами или, посреди прохода,
+    {"since", "after": [change_xid, id] последней записи, "next": граница для следующего прохода}.
+    returns:
+        tuple: since, after, next; без токена — полная синхронизация с нуля.
+    """
+    if not token:
+        return 0, None, None
+    payload = decode_cursor(token)
+    try:
+        since = int(payload["since"])
+        if "after" not in payload:
+            return since, None, None
+        after_xid, after_id = payload["after"]
+        return since, (int(after_xid), UUID(after_id)), int(payload["next"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursor(token)
+
+
 class UserService:
     def __init__(self, db: AsyncSession):
         self.user_repository = UserRepository(db)
@@ -27,19 +134,129 @@ class UserService:
             raise UserNotFound(user_id)
         return user
 
-    async def get_all_users(self) -> Sequence[User]:
+    async def get_profile(self, user_id: UUID) -> dict:
+        """Карточка сотрудника для страницы профиля: пользователь, отделы, руководитель, юрлицо и аватар."""
+        profile = await self.user_repository.get_profile(user_id)
+        if profile is None:
+            raise UserNotFound(user_id)
+        return profile
+
+    async def get_all_users(self) -> list[UserRow]:
         """Получает список всех пользователей."""
-        return await self.user_repository.get_all_users()
+        return await self.user_repository.get_all_user_rows()
 
-    async def get_all_active_users(self) -> Sequence[User]:
+    async def get_all_active_users(self) -> list[UserRow]:
         """Получает список всех активных пользователей."""
-        return await self.user_repository.get_all_active_users()
+        return await self.user_repository.get_all_user_rows(active_only=True)
+
+    async def list_users_page(
+        self,
+        fields: list[str] | None = None,
+        sort: UserSortEnum = UserSortEnum.LAST_NAME,
+        limit: int | None = None,
+        cursor: str | None = None,
+        active_only: bool = False,
+    ) -> dict:
+        """
+        Получает страницу списка сотрудников с keyset-пагинацией и выборочными полями.
+        returns:
+            dict: {items, next_cursor}; элементы содержат только запрошенные поля.
+        """
+        selected = _parse_fields(fields)
+        limit = limit or settings.LIST_PAGE_SIZE
+        rows = await self.user_repository.list_users_page(
+            selected, sort, limit + 1, after=_decode_sort_cursor(cursor, sort), active_only=active_only
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            key = rows[-1]["sort_key"]
+            next_cursor = encode_cursor(
+                {
+                    "sort": sort.value,
+                    "key": key.isoformat() if isinstance(key, datetime) else key,
+                    "id": str(rows[-1]["id"]),
+                }
+            )
+        return {"items": [{name: row[name] for name in selected} for row in rows], "next_cursor": next_cursor}
+
+    def stream_users(
+        self, fmt: StreamFormatEnum, fields: list[str] | None = None, active_only: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Выгружает всех сотрудников порциями: NDJSON или JSON-массив, записываемый по частям.
+        Поля проверяются сразу, чтобы ошибка вернулась кодом 400 до начала ответа.
+        """
+        return self._stream_users(fmt, _parse_fields(fields), active_only)
+
+    @staticmethod
+    async def _stream_users(fmt: StreamFormatEnum, fields: list[str], active_only: bool) -> AsyncIterator[bytes]:
+        # Собственная сессия: генератор дочитывается уже после выхода из обработчика запроса
+        separator = b"\n" if fmt == StreamFormatEnum.NDJSON else b","
+        prefix = b"" if fmt == StreamFormatEnum.NDJSON else b"["
+        async with AsyncSessionLocal() as session:
+            chunks = UserRepository(session).stream_users(fields, settings.STREAM_CHUNK_SIZE, active_only)
+            async for rows in chunks:
+                yield prefix + separator.join(dumps_bytes(dict(row)) for row in rows)
+                prefix = separator
+        if fmt == StreamFormatEnum.NDJSON:
+            yield b"\n" if prefix else b""
+        else:
+            yield b"]" if prefix == separator else b"[]"
+
+    def export_users(
+        self, fmt: ExportFormatEnum, fields: list[str] | None = None, active_only: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Выгружает всех сотрудников в CSV, XLSX или Parquet порциями из серверного курсора.
+        Поля проверяются сразу, чтобы ошибка вернулась кодом 400 до начала ответа.
+        """
+        return self._export_users(fmt, _parse_fields(fields), active_only)
+
+    @staticmethod
+    async def _export_users(fmt: ExportFormatEnum, fields: list[str], active_only: bool) -> AsyncIterator[bytes]:
+        async def rows():
+            async for chunk in UserRepository(session).stream_users(fields, settings.STREAM_CHUNK_SIZE, active_only):
+                if "skills" in fields:
+                    # В таблицу попадают названия навыков, как в файле импорта
+                    chunk = [{**row, "skills": [skill["name"] for skill in row["skills"]]} for row in chunk]
+                yield chunk
+
+        async with AsyncSessionLocal() as session:
+            async for data in write_table(fmt, {name: USER_LIST_FIELD_TYPES[name] for name in fields}, rows()):
+                yield data
+
+    async def get_changes(self, token: str | None = None, limit: int | None = None) -> dict:
+        """
+        Возвращает пользователей, созданных, измененных или деактивированных после выдачи token.
+        Граница следующего прохода фиксируется до первой выборки, поэтому изменения,
+        зафиксированные во время прохода, попадут в следующий — возможны повторы, но не пропуски.
+        returns:
+            dict: {items, next_token, has_more}; при has_more следующую страницу запрашивают с next_token.
+        """
+        limit = limit or settings.LIST_PAGE_SIZE
+        since, after, horizon = _decode_change_token(token)
+        if horizon is None:
+            horizon = await self.user_repository.get_change_horizon()
+
+        rows = await self.user_repository.get_changed_users(since, limit + 1, after=after)
+        has_more = len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+            last_user, last_xid = rows[-1]
+            next_token = encode_cursor({"since": since, "after": [last_xid, str(last_user.id)], "next": horizon})
+        else:
+            next_token = encode_cursor({"since": horizon})
+        return {"items": [user for user, _ in rows], "next_token": next_token, "has_more": has_more}
 
     async def deactivate_user(self, user_id: UUID) -> User:
         """Помечает пользователя как неактивного."""
         user = await self.user_repository.delete_user(user_id)
         if not user:
             raise UserNotFound(user_id)
+        user_search_index.remove_user(user_id)
+        directory_version.bump()
         return user
 
     async def update_user(self, user_id: UUID, updates: UserUpdate) -> User:
@@ -56,8 +273,48 @@ class UserService:
             return user
 
         updated_user = await self.user_repository.update_user(user_id=user_id, update_data=update_data)
+        if updated_user:
+            user_search_index.upsert_user(updated_user)
+            directory_version.bump()
         return updated_user
 
+    async def bulk_update_users(self, items: list[UserBulkUpdateItem]) -> UserBulkUpdateResult:
+        """
+        Применяет изменения к нескольким сотрудникам в одной транзакции: все или ни одного.
+        Сотрудники, которых нет в справочнике, пропускаются и перечисляются в ответе.
+        """
+        user_ids = [item.id for item in items]
+        duplicates = [user_id for user_id, count in Counter(user_ids).items() if count > 1]
+        if duplicates:
+            raise DuplicateBulkItems(duplicates)
+
+        existing = await self.user_repository.get_existing_ids(user_ids)
+        updates = [item.model_dump(exclude_unset=True) for item in items if item.id in existing]
+        updates = [values for values in updates if len(values) > 1]
+        if updates:
+            await self.user_repository.bulk_update_users(updates)
+            updated_ids = [values["id"] for values in updates]
+            user_search_index.refresh_users(updated_ids, await self.user_repository.get_search_index_rows(updated_ids))
+            directory_version.bump()
+        return UserBulkUpdateResult(
+            updated=len(updates), not_found=[user_id for user_id in user_ids if user_id not in existing]
+        )
+
+    async def bulk_deactivate_users(self, user_ids: list[UUID]) -> UserBulkDeactivateResult:
+        """Деактивирует сотрудников в одной транзакции; отделы, которыми они руководили, остаются без руководителя."""
+        user_ids = list(dict.fromkeys(user_ids))
+        deactivated, managers_cleared = await self.user_repository.bulk_deactivate_users(user_ids)
+        if deactivated:
+            for user_id in deactivated:
+                user_search_index.remove_user(user_id)
+            directory_version.bump()
+        found = set(deactivated)
+        return UserBulkDeactivateResult(
+            deactivated=len(deactivated),
+            managers_cleared=managers_cleared,
+            not_found=[user_id for user_id in user_ids if user_id not in found],
+        )
+
     async def search_users(
         self,
         search_query: str,
@@ -65,15 +322,24 @@ class UserService:
         skills: list[str] | None = None,
         departments: list[UUID] | None = None,
         legal_entities: list[UUID] | None = None,
-    ) -> Sequence[User]:
+    ) -> list[UserRow]:
         """
         Выполняет нечеткий поиск по имени, фамилии, должности и email.
+        Запрос приводится к нижнему регистру с одиночными пробелами; повторные запросы с тем же
+        текстом и фильтрами отдаются из кэша до первого изменения справочника.
         args:
             search_query (str): Строка поиска.
             city (str): фильтр по городу
         returns:
-            Sequence[User]: Список пользователей, соответствующих критериям поиска.
+            list[UserRow]: Список пользователей, соответствующих критериям поиска.
         """
+        search_query = normalize_search_query(search_query)
+        key = search_cache_key(search_query, cities, skills, departments, legal_entities)
+        version = search_result_cache.version
+        cached = search_result_cache.get(key, version)
+        if cached is not None:
+            return cached
+
         users = await self.user_repository.search_users_fuzzy(
             search_query=search_query,
             cities=cities,
@@ -81,20 +347,258 @@ class UserService:
             departments=departments,
             legal_entities=legal_entities,
         )
+        # DTO неизменяемы и не привязаны к сессии запроса, поэтому их можно отдавать из кэша как есть
+        search_result_cache.put(key, version, users)
         return users
 
-    async def set_skills(self, user_id: UUID, payload: SetSkillsRequest) -> User:
-        user = await self.user_repository.get_by_id(user_id)
-        if not user:
-            raise UserNotFound(user_id)
-        skills_in_db = await self.skill_repository.get_skills_by_names(payload.skills)
-        existing_names = {s.name.lower() for s in skills_in_db}
-        unknown_skills = {s for s in payload.skills if s.lower() not in existing_names}
+    async def search_users_page(
+        self,
+        search_query: str,
+        threshold: float | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+        facets: list[SearchFacetEnum] | None = None,
+    ) -> dict:
+        """
+        Выполняет поиск по триграммному индексу с порогом схожести и keyset-пагинацией.
+        returns:
+            dict: Страница {items, next_cursor, facets}; facets считаются тем же запросом, что и страница,
+            только если запрошены и только для первой страницы (без cursor).
+        """
+        threshold = settings.SEARCH_SIMILARITY_THRESHOLD if threshold is None else threshold
+        limit = min(limit or settings.SEARCH_PAGE_SIZE, settings.SEARCH_PAGE_SIZE_MAX)
+
+        facet_counts = None
+        if facets and cursor is None:
+            rows, facet_counts = await self.user_repository.search_page_with_facets(
+                SearchModeEnum.TRIGRAM,
+                search_query,
+                limit + 1,
+                facets,
+                threshold=threshold,
+                cities=cities,
+                skills=skills,
+                departments=departments,
+                legal_entities=legal_entities,
+            )
+        else:
+            rows = await self.user_repository.search_users_trigram(
+                search_query=search_query,
+                threshold=threshold,
+                limit=limit + 1,
+                after=_decode_rank_cursor(cursor),
+                cities=cities,
+                skills=skills,
+                departments=departments,
+                legal_entities=legal_entities,
+            )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_user, last_score = rows[-1]
+            next_cursor = encode_cursor({"score": last_score, "id": str(last_user.id)})
+
+        return {"items": [user for user, _ in rows], "next_cursor": next_cursor, "facets": facet_counts}
+
+    async def search_users_fulltext(
+        self,
+        search_query: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+        facets: list[SearchFacetEnum] | None = None,
+    ) -> dict:
+        """
+        Выполняет полнотекстовый поиск с ранжированием по весам полей.
+        returns:
+            dict: Страница {items, next_cursor, facets}, элементы — {user, rank, highlights};
+            facets считаются тем же запросом, что и страница, только для первой страницы (без cursor).
+        """
+        limit = min(limit or settings.SEARCH_PAGE_SIZE, settings.SEARCH_PAGE_SIZE_MAX)
+        facet_counts = None
+        if facets and cursor is None:
+            rows, facet_counts = await self.user_repository.search_page_with_facets(
+                SearchModeEnum.FULLTEXT,
+                search_query,
+                limit + 1,
+                facets,
+                cities=cities,
+                skills=skills,
+                departments=departments,
+                legal_entities=legal_entities,
+            )
+        else:
+            rows = await self.user_repository.search_users_fulltext(
+                search_query=search_query,
+                limit=limit + 1,
+                after=_decode_rank_cursor(cursor),
+                cities=cities,
+                skills=skills,
+                departments=departments,
+                legal_entities=legal_entities,
+            )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_user, last_rank, *_ = rows[-1]
+            next_cursor = encode_cursor({"score": last_rank, "id": str(last_user.id)})
+
+        matches = []
+        for user, rank, *headlines in rows:
+            highlights = {}
+            for field, marked in zip(HIGHLIGHT_FIELDS, headlines):
+                offsets = _highlight_offsets(marked)
+                if offsets:
+                    highlights[field] = offsets
+            matches.append({"user": user, "rank": rank, "highlights": highlights})
+
+        return {"items": matches, "next_cursor": next_cursor, "facets": facet_counts}
+
+    async def search_users_batch(self, queries: list[str], limit: int, threshold: float | None = None) -> list[dict]:
+        """
+        Находит лучших кандидатов сразу для списка имен или email одним запросом к БД.
+        Пустые запросы в БД не передаются и получают пустой список кандидатов.
+        returns:
+            list[dict]: {query, candidates} в порядке входных запросов.
+        """
+        threshold = settings.SEARCH_SIMILARITY_THRESHOLD if threshold is None else threshold
+        results = [{"query": query, "candidates": []} for query in queries]
+        positions = [i for i, query in enumerate(queries) if query.strip()]
+        if not positions:
+            return results
+
+        rows = await self.user_repository.search_users_batch(
+            [queries[i].strip() for i in positions], threshold=threshold, limit=limit
+        )
+        for ordinality, user_id, first_name, last_name, email, position, city, department_id, score in rows:
+            if user_id is None:
+                continue
+            results[positions[ordinality - 1]]["candidates"].append(
+                UserSearchHit(
+                    id=user_id,
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=email,
+                    position=position,
+                    city=city,
+                    department_id=department_id,
+                    score=score,
+                )
+            )
+        return results
+
+    def search_users_index(
+        self,
+        search_query: str,
+        threshold: float | None = None,
+        limit: int | None = None,
+        cities: list[str] | None = None,
+        skills: list[str] | None = None,
+        departments: list[UUID] | None = None,
+        legal_entities: list[UUID] | None = None,
+    ) -> list[UserSearchHit]:
+        """
+        Выполняет поиск по триграммному индексу в памяти процесса, не обращаясь к БД.
+        Ищет только среди активных сотрудников.
+        """
+        threshold = settings.SEARCH_SIMILARITY_THRESHOLD if threshold is None else threshold
+        limit = min(limit or settings.SEARCH_PAGE_SIZE, settings.SEARCH_PAGE_SIZE_MAX)
+        hits = user_search_index.search(
+            search_query,
+            threshold=threshold,
+            limit=limit,
+            cities=cities,
+            skills=skills,
+            departments=departments,
+            legal_entities=legal_entities,
+        )
+        return [
+            UserSearchHit(
+                id=doc.user_id,
+                first_name=doc.first_name,
+                last_name=doc.last_name,
+                email=doc.email,
+                position=doc.position,
+                city=doc.city,
+                department_id=doc.department_id,
+                score=score,
+            )
+            for doc, score in hits
+        ]
+
+    def suggest_users(self, search_query: str, limit: int | None = None) -> list[UserSuggestion]:
+        """Подсказки при наборе по префиксам имени, фамилии и email из индекса в памяти."""
+        limit = min(limit or settings.SUGGEST_LIMIT, settings.SUGGEST_LIMIT_MAX)
+        documents = user_search_index.suggest(search_query, limit=limit, budget_ms=settings.SUGGEST_LATENCY_BUDGET_MS)
+        return [
+            UserSuggestion(
+                id=doc.user_id,
+                name=f"{doc.first_name} {doc.last_name}",
+                position=doc.position,
+                photo_url=doc.photo_url,
+            )
+            for doc in documents
+        ]
+
+    async def _resolve_skill_ids(self, names: list[str]) -> dict[str, UUID]:
+        """Названия навыков (без учета регистра) -> ID одним запросом; неизвестные названия — SkillNotFound."""
+        skills = {skill.name.lower(): skill.id for skill in await self.skill_repository.get_skills_by_names(names)}
+        unknown_skills = {name for name in names if name.lower() not in skills}
         if unknown_skills:
             raise SkillNotFound(list(unknown_skills))
-        user = await self.user_repository.set_skills(user_id=user_id, skills=skills_in_db)
+        return skills
+
+    async def set_skills(self, user_id: UUID, payload: SetSkillsRequest) -> User:
+        if not await self.user_repository.get_existing_ids([user_id]):
+            raise UserNotFound(user_id)
+        skills = await self._resolve_skill_ids(payload.skills)
+        await self.user_repository.set_skills(user_id, list({skills[name.lower()] for name in payload.skills}))
+        # Связи переписаны в обход ORM, а пользователь может уже быть в сессии (например, текущий администратор)
+        user = await self.user_repository.get_by_id(user_id, populate_existing=True)
+        user_search_index.upsert_user(user)
+        directory_version.bump()
         return user
 
+    async def bulk_set_skills(self, items: list[UserSkillsItem]) -> SetSkillsBulkResult:
+        """
+        Устанавливает навыки нескольким сотрудникам в одной транзакции; навыки, не попавшие в набор, снимаются.
+        Если хотя бы один навык не найден, не применяется ни один набор.
+        Сотрудники, которых нет в справочнике, пропускаются и перечисляются в ответе.
+        """
+        user_ids = [item.user_id for item in items]
+        duplicates = [user_id for user_id, count in Counter(user_ids).items() if count > 1]
+        if duplicates:
+            raise DuplicateBulkItems(duplicates)
+
+        skills = await self._resolve_skill_ids(list({name for item in items for name in item.skills}))
+        existing = await self.user_repository.get_existing_ids(user_ids)
+        skill_sets = {
+            item.user_id: list({skills[name.lower()] for name in item.skills})
+            for item in items
+            if item.user_id in existing
+        }
+        removed = added = 0
+        if skill_sets:
+            removed, added = await self.user_repository.bulk_set_skills(skill_sets)
+            updated_ids = list(skill_sets)
+            user_search_index.refresh_users(updated_ids, await self.user_repository.get_search_index_rows(updated_ids))
+            directory_version.bump()
+        return SetSkillsBulkResult(
+            updated=len(skill_sets),
+            added=added,
+            removed=removed,
+            not_found=[user_id for user_id in user_ids if user_id not in existing],
+        )
+
     async def get_cities(self) -> Sequence[str]:
         return await self.user_repository.get_cities()
 
@@ -1,5 +1,12 @@
+import csv
+import io
+import json
+import time
 import uuid
 
+import brotli
+import pyarrow
+import pyarrow.parquet
 import requests
 
 BASE_URL = "http://localhost:8000"
@@ -62,6 +69,113 @@ def test_get_employees(auth_header):
         assert "is_active" in employee
 
 
+def test_get_active_employees(auth_header, auth_tokens):
+    """Проверяем список активных сотрудников: полная карточка, только активные"""
+    r = requests.get(f"{BASE_URL}/api/employees/active/", headers=auth_header)
+    assert r.status_code == 200
+    data = r.json()
+    assert str(auth_tokens["user_id"]) in [employee["id"] for employee in data]
+    for employee in data:
+        assert employee["is_active"] is True
+        assert isinstance(employee["skills"], list)
+        assert "photo_url" in employee
+
+
+def test_get_employees_page(auth_header):
+    """Проверяем постраничный список с выборочными полями: страницы не пересекаются и упорядочены"""
+    params = {"limit": 2, "sort": "last_name", "fields": "first_name,last_name"}
+    r = requests.get(f"{BASE_URL}/api/employees/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    first_page = r.json()
+    assert len(first_page["items"]) == 2
+    for employee in first_page["items"]:
+        assert set(employee) == {"id", "first_name", "last_name"}
+    assert first_page["next_cursor"]
+
+    params["cursor"] = first_page["next_cursor"]
+    r = requests.get(f"{BASE_URL}/api/employees/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    second_page = r.json()["items"]
+    assert {e["id"] for e in first_page["items"]}.isdisjoint(e["id"] for e in second_page)
+    if second_page:
+        assert second_page[0]["last_name"] >= first_page["items"][-1]["last_name"]
+
+    r = requests.get(f"{BASE_URL}/api/employees/", headers=auth_header, params={"fields": "password_hash"})
+    assert r.status_code == 400
+
+
+def test_stream_employees(auth_header):
+    """Проверяем потоковую выгрузку: NDJSON и JSON-массив содержат одних и тех же сотрудников"""
+    params = {"fields": "email"}
+    r = requests.get(f"{BASE_URL}/api/employees/stream", headers=auth_header, params=params, stream=True)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    ndjson = [json.loads(line) for line in r.iter_lines() if line]
+    assert ndjson
+    assert set(ndjson[0]) == {"id", "email"}
+
+    r = requests.get(f"{BASE_URL}/api/employees/stream", headers=auth_header, params={**params, "format": "json"})
+    assert r.status_code == 200
+    assert sorted(e["id"] for e in r.json()) == sorted(e["id"] for e in ndjson)
+
+
+def test_export_employees_csv(auth_header):
+    """Проверяем выгрузку в CSV: файл для скачивания с выбранными колонками и теми же сотрудниками, что в потоке"""
+    params = {"fields": "email,skills"}
+    r = requests.get(f"{BASE_URL}/api/employees/export", headers=auth_header, params=params)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert r.headers["content-disposition"].startswith('attachment; filename="employees-')
+    rows = list(csv.DictReader(io.StringIO(r.content.decode("utf-8-sig"))))
+    assert rows
+    assert set(rows[0]) == {"id", "email", "skills"}
+
+    streamed = requests.get(f"{BASE_URL}/api/employees/stream", headers=auth_header, params=params).iter_lines()
+    assert sorted(row["id"] for row in rows) == sorted(json.loads(line)["id"] for line in streamed if line)
+
+    r = requests.get(f"{BASE_URL}/api/employees/export", headers=auth_header, params={"fields": "salary"})
+    assert r.status_code == 400
+
+
+def test_export_employees_parquet(auth_header):
+    """Проверяем выгрузку в Parquet: схема с выбранными колонками и те же сотрудники, что в CSV"""
+    params = {"fields": "email,skills,is_active"}
+    csv_export = requests.get(f"{BASE_URL}/api/employees/export", headers=auth_header, params=params)
+    r = requests.get(f"{BASE_URL}/api/employees/export", headers=auth_header, params={**params, "format": "parquet"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.parquet"
+    table = pyarrow.parquet.read_table(io.BytesIO(r.content))
+    assert table.schema.names == ["id", "email", "skills", "is_active"]
+    assert table.schema.field("is_active").type == pyarrow.bool_()
+    csv_rows = csv.DictReader(io.StringIO(csv_export.content.decode("utf-8-sig")))
+    assert sorted(table.column("id").to_pylist()) == sorted(row["id"] for row in csv_rows)
+
+
+def test_employee_changes(auth_header):
+    """Проверяем дельта-синхронизацию: после полного прохода возвращаются только новые изменения"""
+    params = {"limit": 500}
+    while True:
+        r = requests.get(f"{BASE_URL}/api/employees/changes", headers=auth_header, params=params)
+        assert r.status_code == 200
+        data = r.json()
+        params["since"] = data["next_token"]
+        if not data["has_more"]:
+            break
+
+    last_name = f"Delta{uuid.uuid4().hex[:8]}"
+    register_data = {
+        "email": f"{last_name.lower()}@example.com",
+        "password": "Password123",
+        "first_name": "Sync",
+        "last_name": last_name,
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+
+    r = requests.get(f"{BASE_URL}/api/employees/changes", headers=auth_header, params=params)
+    assert r.status_code == 200
+    assert user_id in [employee["id"] for employee in r.json()["items"]]
+
+
 def test_get_employee_by_id(auth_header, auth_tokens):
     """Проверяем получение сотрудника по ID"""
     user_id = auth_tokens["user_id"]
@@ -111,6 +225,354 @@ def test_deactivate_employee(auth_header, auth_tokens):
     assert data["is_active"] is False
 
 
+def _wait_import_job(auth_header, job_id):
+    """Ждет завершения фонового импорта и возвращает его отчет"""
+    for _ in range(100):
+        job = requests.get(f"{BASE_URL}/api/employees/import/{job_id}", headers=auth_header).json()
+        if job["status"] not in ("pending", "running"):
+            break
+        time.sleep(0.1)
+    assert job["status"] == "done", job
+    return job["report"]
+
+
+def test_import_employees(auth_header):
+    """Проверяем массовый импорт из CSV: валидные строки создаются, ошибочные попадают в отчет"""
+    suffix = uuid.uuid4().hex[:8]
+    csv_data = (
+        "email;password;first_name;last_name;department;birthday\n"
+        f"import1_{suffix}@example.com;Password123;Импорт;Первый;;1990-05-01\n"
+        f"import2_{suffix}@example.com;Password123;Импорт;Второй;;\n"
+        f"import3_{suffix}@example.com;Password123;Импорт;Третий;NoSuchDepartment_{suffix};\n"
+    )
+    files = {"file": ("employees.csv", csv_data.encode(), "text/csv")}
+    r = requests.post(f"{BASE_URL}/api/employees/import", headers=auth_header, files=files)
+    assert r.status_code == 202
+    assert r.json()["total"] == 3
+    report = _wait_import_job(auth_header, r.json()["id"])
+    assert report["total"] == 3
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [4]
+
+    login = {"email": f"import1_{suffix}@example.com", "password": "Password123"}
+    assert requests.post(f"{BASE_URL}/api/auth/login", json=login).status_code == 200
+
+    r = requests.post(f"{BASE_URL}/api/employees/import", headers=auth_header, files=files)
+    report = _wait_import_job(auth_header, r.json()["id"])
+    assert report["imported"] == 0
+    assert "User already exists" in report["errors"][0]["errors"]
+
+    bad_file = {"file": ("employees.txt", b"email\n", "text/plain")}
+    assert requests.post(f"{BASE_URL}/api/employees/import", headers=auth_header, files=bad_file).status_code == 400
+    assert requests.get(f"{BASE_URL}/api/employees/import/{uuid.uuid4()}", headers=auth_header).status_code == 404
+
+
+def test_employee_profile(auth_header):
+    """Проверяем карточку профиля: отдел, цепочка родительских отделов, руководитель и юрлицо в одном ответе"""
+    user_ids = []
+    for _ in range(2):
+        register_data = {
+            "email": f"profile_{uuid.uuid4().hex[:8]}@example.com",
+            "password": "Password123",
+            "first_name": "Profile",
+            "last_name": "User",
+        }
+        user_ids.append(requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"])
+    manager_id, employee_id = user_ids
+
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"LE_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    root_data = {"name": f"ProfileRoot_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id}
+    root_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=root_data).json()["id"]
+    child_data = {"name": f"ProfileChild_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id, "parent_id": root_id}
+    child_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=child_data).json()["id"]
+    requests.patch(f"{BASE_URL}/api/departments/{root_id}", headers=auth_header, json={"manager_id": manager_id})
+    r = requests.put(f"{BASE_URL}/api/employees/{employee_id}", headers=auth_header, json={"department_id": child_id})
+    assert r.status_code == 200
+
+    r = requests.get(f"{BASE_URL}/api/employees/{employee_id}/profile", headers=auth_header)
+    assert r.status_code == 200
+    profile = r.json()
+    assert profile["user"]["id"] == employee_id
+    assert profile["department"]["id"] == child_id
+    assert [department["id"] for department in profile["parent_departments"]] == [root_id]
+    assert profile["manager"]["id"] == manager_id
+    assert profile["legal_entity"]["id"] == le_id
+
+    r = requests.get(f"{BASE_URL}/api/employees/{manager_id}/profile", headers=auth_header)
+    assert r.json()["managed_department"]["id"] == root_id
+    assert requests.get(f"{BASE_URL}/api/employees/{uuid.uuid4()}/profile", headers=auth_header).status_code == 404
+
+
+def test_bulk_update_and_deactivate_employees(auth_header):
+    """Проверяем массовое изменение и деактивацию: руководитель снимается с отдела, неизвестные ID в отчете"""
+    user_ids = []
+    for _ in range(2):
+        register_data = {
+            "email": f"bulk_{uuid.uuid4().hex[:8]}@example.com",
+            "password": "Password123",
+            "first_name": "Bulk",
+            "last_name": "User",
+        }
+        user_ids.append(requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"])
+    missing_id = str(uuid.uuid4())
+
+    items = [{"id": user_id, "city": "Bulkville"} for user_id in user_ids] + [{"id": missing_id, "city": "Nowhere"}]
+    r = requests.patch(f"{BASE_URL}/api/employees/bulk", headers=auth_header, json={"items": items})
+    assert r.status_code == 200
+    assert r.json() == {"updated": 2, "not_found": [missing_id]}
+    assert requests.get(f"{BASE_URL}/api/employees/{user_ids[0]}", headers=auth_header).json()["city"] == "Bulkville"
+
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"LE_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    dept_data = {"name": f"BulkDept_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id}
+    dept_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=dept_data).json()["id"]
+    r = requests.patch(f"{BASE_URL}/api/departments/{dept_id}", headers=auth_header, json={"manager_id": user_ids[0]})
+    assert r.status_code == 200
+
+    r = requests.post(
+        f"{BASE_URL}/api/employees/bulk-deactivate", headers=auth_header, json={"ids": [*user_ids, missing_id]}
+    )
+    assert r.status_code == 200
+    assert r.json() == {"deactivated": 2, "managers_cleared": 1, "not_found": [missing_id]}
+    assert requests.get(f"{BASE_URL}/api/departments/{dept_id}", headers=auth_header).json()["manager"] is None
+
+
+def test_bulk_set_skills(auth_header):
+    """Проверяем массовую установку навыков: лишние навыки снимаются, неизвестные ID в отчете"""
+    skill_names = [f"BulkSkill_{uuid.uuid4().hex[:6]}" for _ in range(2)]
+    for name in skill_names:
+        assert requests.post(f"{BASE_URL}/api/skills/", headers=auth_header, json={"name": name}).status_code == 200
+    register_data = {
+        "email": f"skills_{uuid.uuid4().hex[:8]}@example.com",
+        "password": "Password123",
+        "first_name": "Skill",
+        "last_name": "Matrix",
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+    missing_id = str(uuid.uuid4())
+
+    r = requests.put(
+        f"{BASE_URL}/api/employees/{user_id}/set_skills", headers=auth_header, json={"skills": skill_names}
+    )
+    assert r.status_code == 200
+    assert {skill["name"] for skill in r.json()["skills"]} == set(skill_names)
+
+    items = [{"user_id": user_id, "skills": skill_names[1:]}, {"user_id": missing_id, "skills": []}]
+    r = requests.put(f"{BASE_URL}/api/employees/set_skills/bulk", headers=auth_header, json={"items": items})
+    assert r.status_code == 200
+    assert r.json() == {"updated": 1, "added": 0, "removed": 1, "not_found": [missing_id]}
+    skills = requests.get(f"{BASE_URL}/api/employees/{user_id}", headers=auth_header).json()["skills"]
+    assert [skill["name"] for skill in skills] == skill_names[1:]
+
+    items = [{"user_id": user_id, "skills": ["NoSuchSkill"]}]
+    r = requests.put(f"{BASE_URL}/api/employees/set_skills/bulk", headers=auth_header, json={"items": items})
+    assert r.status_code == 404
+
+
+def test_set_own_skills(auth_tokens, auth_header):
+    """Проверяем, что администратор, меняющий собственные навыки, получает новые навыки и в ответе, и в индексе"""
+    admin_id = auth_tokens["user_id"]
+    skill_names = [f"OwnSkill_{uuid.uuid4().hex[:6]}" for _ in range(2)]
+    for name in skill_names:
+        assert requests.post(f"{BASE_URL}/api/skills/", headers=auth_header, json={"name": name}).status_code == 200
+    email = requests.get(f"{BASE_URL}/api/employees/{admin_id}", headers=auth_header).json()["email"]
+    url = f"{BASE_URL}/api/employees/{admin_id}/set_skills"
+
+    try:
+        for name in skill_names:
+            r = requests.put(url, headers=auth_header, json={"skills": [name]})
+            assert r.status_code == 200
+            assert [skill["name"] for skill in r.json()["skills"]] == [name]
+
+        params = {"q": email, "mode": "index"}
+        found = requests.get(
+            f"{BASE_URL}/api/employees/search/", headers=auth_header, params={**params, "skills": skill_names[1]}
+        )
+        assert admin_id in [employee["id"] for employee in found.json()]
+        stale = requests.get(
+            f"{BASE_URL}/api/employees/search/", headers=auth_header, params={**params, "skills": skill_names[0]}
+        )
+        assert admin_id not in [employee["id"] for employee in stale.json()]
+    finally:
+        requests.put(url, headers=auth_header, json={"skills": []})
+
+
+def test_search_employees_trigram(auth_header):
+    """Проверяем поиск по триграммному индексу с постраничной выдачей"""
+    params = {"q": "admin", "mode": "trigram", "limit": 1}
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    data = r.json()
+    assert "items" in data
+    assert "next_cursor" in data
+    assert len(data["items"]) <= 1
+
+    if data["next_cursor"]:
+        params["cursor"] = data["next_cursor"]
+        next_page = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+        assert next_page.status_code == 200
+        next_ids = {employee["id"] for employee in next_page.json()["items"]}
+        assert not next_ids & {employee["id"] for employee in data["items"]}
+
+
+def test_search_employees_index(auth_header):
+    """Проверяем, что поиск по индексу в памяти видит только что зарегистрированного сотрудника"""
+    last_name = f"Indexed{uuid.uuid4().hex[:8]}"
+    register_data = {
+        "email": f"{last_name.lower()}@example.com",
+        "password": "Password123",
+        "first_name": "Search",
+        "last_name": last_name,
+    }
+    register_resp = requests.post(f"{BASE_URL}/api/auth/register", json=register_data)
+    assert register_resp.status_code == 200
+    user_id = register_resp.json()["user_id"]
+
+    params = {"q": last_name, "mode": "index"}
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    data = r.json()
+    assert isinstance(data, list)
+    assert data[0]["id"] == user_id
+    assert "score" in data[0]
+
+    requests.delete(f"{BASE_URL}/api/employees/{user_id}", headers=auth_header)
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert user_id not in {hit["id"] for hit in r.json()}
+
+
+def test_search_employees_fulltext(auth_header):
+    """Проверяем полнотекстовый поиск: ранг и смещения подсветки по полям"""
+    params = {"q": "Admin", "mode": "fulltext"}
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["items"]
+    match = data["items"][0]
+    assert match["rank"] > 0
+    start, end = match["highlights"]["last_name"][0]
+    assert match["user"]["last_name"][start:end] == "Admin"
+
+
+def test_search_employees_by_skills(auth_header):
+    """Проверяем фильтр поиска по навыкам: находятся только сотрудники со всеми навыками"""
+    skill_name = f"Skill_{uuid.uuid4().hex[:6]}"
+    skill_resp = requests.post(f"{BASE_URL}/api/skills/", headers=auth_header, json={"name": skill_name})
+    assert skill_resp.status_code == 200
+
+    last_name = f"Skilled{uuid.uuid4().hex[:8]}"
+    register_data = {
+        "email": f"{last_name.lower()}@example.com",
+        "password": "Password123",
+        "first_name": "Search",
+        "last_name": last_name,
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+    r = requests.put(
+        f"{BASE_URL}/api/employees/{user_id}/set_skills", headers=auth_header, json={"skills": [skill_name]}
+    )
+    assert r.status_code == 200
+
+    params = {"q": last_name, "skills": [skill_name.lower()]}
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    assert [employee["id"] for employee in r.json()] == [user_id]
+
+    params["skills"].append(f"Missing_{uuid.uuid4().hex[:6]}")
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+def test_search_employees_facets(auth_header):
+    """Проверяем фасеты поиска: фильтр по городу не сужает счетчики своего же фасета"""
+    city = f"City{uuid.uuid4().hex[:6]}"
+    last_name = f"Faceted{uuid.uuid4().hex[:8]}"
+    register_data = {
+        "email": f"{last_name.lower()}@example.com",
+        "password": "Password123",
+        "first_name": "Search",
+        "last_name": last_name,
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+    r = requests.put(f"{BASE_URL}/api/employees/{user_id}", headers=auth_header, json={"city": city})
+    assert r.status_code == 200
+
+    params = {"q": last_name, "mode": "trigram", "facets": ["cities", "skills"], "cities": ["Nowhere"]}
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params=params)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["items"] == []
+    assert data["facets"]["cities"] == {city: 1}
+    assert data["facets"]["skills"] == {}
+
+    r = requests.get(
+        f"{BASE_URL}/api/employees/search/", headers=auth_header, params={"q": last_name, "facets": ["cities"]}
+    )
+    assert r.status_code == 400
+
+
+def test_search_employees_cache(auth_header):
+    """Проверяем кэш поиска: повтор запроса попадает в кэш, изменение справочника его сбрасывает"""
+    q = f"Cached{uuid.uuid4().hex[:8]}"
+    requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params={"q": q})
+    before = requests.get(f"{BASE_URL}/api/employees/search/cache", headers=auth_header).json()
+
+    r = requests.get(f"{BASE_URL}/api/employees/search/", headers=auth_header, params={"q": f"  {q.upper()} "})
+    assert r.status_code == 200
+    after = requests.get(f"{BASE_URL}/api/employees/search/cache", headers=auth_header).json()
+    assert after["hits"] == before["hits"] + 1
+
+    skill_resp = requests.post(
+        f"{BASE_URL}/api/skills/", headers=auth_header, json={"name": f"Skill_{uuid.uuid4().hex[:6]}"}
+    )
+    assert skill_resp.status_code == 200
+    stats = requests.get(f"{BASE_URL}/api/employees/search/cache", headers=auth_header).json()
+    assert stats["version"] > after["version"]
+    assert stats["size"] == 0
+
+
+def test_search_employees_batch(auth_header):
+    """Проверяем пакетный поиск: кандидаты возвращаются для каждого запроса в исходном порядке"""
+    last_name = f"Batch{uuid.uuid4().hex[:8]}"
+    register_data = {
+        "email": f"{last_name.lower()}@example.com",
+        "password": "Password123",
+        "first_name": "Search",
+        "last_name": last_name,
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+
+    queries = [register_data["email"], f"Missing{uuid.uuid4().hex}", "", last_name]
+    r = requests.post(
+        f"{BASE_URL}/api/employees/search/batch", headers=auth_header, json={"queries": queries, "limit": 2}
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert [result["query"] for result in data] == queries
+    assert data[0]["candidates"][0]["id"] == user_id
+    assert data[0]["candidates"][0]["score"] == 1
+    assert data[1]["candidates"] == []
+    assert data[2]["candidates"] == []
+    assert len(data[3]["candidates"]) <= 2
+    assert data[3]["candidates"][0]["id"] == user_id
+
+
+def test_suggest_employees(auth_header):
+    """Проверяем подсказки при наборе: компактный ответ и поиск по префиксу фамилии"""
+    r = requests.get(f"{BASE_URL}/api/employees/suggest", headers=auth_header, params={"q": "adm", "limit": 5})
+    assert r.status_code == 200
+    data = r.json()
+    assert isinstance(data, list)
+    assert len(data) <= 5
+    for suggestion in data:
+        assert set(suggestion) == {"id", "name", "position", "photo_url"}
+        assert "Admin" in suggestion["name"]
+
+
 # ===================== LEGAL ENTITIES ENDPOINTS =====================
 
 
@@ -143,6 +605,56 @@ def test_get_legal_entities(auth_header):
         assert "departments" in le
 
 
+def test_get_legal_entities_not_modified(auth_header):
+    """Проверяем условный GET: совпавший ETag дает 304, изменение справочника — новый ETag"""
+    r = requests.get(f"{BASE_URL}/api/legal-entities/", headers=auth_header)
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    r = requests.get(f"{BASE_URL}/api/legal-entities/", headers={**auth_header, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    le_name = f"LE_{uuid.uuid4().hex[:6]}"
+    assert requests.post(f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": le_name}).ok
+    r = requests.get(f"{BASE_URL}/api/legal-entities/", headers={**auth_header, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+def test_get_directory_snapshot(auth_header):
+    """Проверяем снапшот справочника: сжатый ответ, 304 по ETag и пересборку после изменения"""
+    r = requests.get(f"{BASE_URL}/api/directory/snapshot", headers={**auth_header, "Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["Content-Encoding"] == "gzip"
+    data = r.json()
+    assert {"version", "users", "departments", "legal_entities", "skills"} <= data.keys()
+    assert data["version"] == r.headers["ETag"]
+    assert all(user["is_active"] for user in data["users"])
+    etag = r.headers["ETag"]
+
+    r = requests.get(
+        f"{BASE_URL}/api/directory/snapshot", headers={**auth_header, "Accept-Encoding": "br"}, stream=True
+    )
+    assert r.status_code == 200
+    assert r.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(r.raw.read()))["version"] == etag
+
+    r = requests.get(f"{BASE_URL}/api/directory/snapshot", headers={**auth_header, "If-None-Match": etag})
+    assert r.status_code == 304
+
+    le_name = f"LE_{uuid.uuid4().hex[:6]}"
+    assert requests.post(f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": le_name}).ok
+    # Снапшот пересобирается в фоне с небольшой задержкой
+    for _ in range(50):
+        r = requests.get(f"{BASE_URL}/api/directory/snapshot", headers=auth_header)
+        if r.headers["ETag"] != etag:
+            break
+        time.sleep(0.1)
+    assert r.headers["ETag"] != etag
+    assert le_name in {entity["name"] for entity in r.json()["legal_entities"]}
+
+
 def test_get_legal_entity_by_id(auth_header):
     """Проверяем получение юридического лица по ID"""
     # Сначала создаем юридическое лицо
@@ -298,3 +810,186 @@ def test_delete_department(auth_header):
     # Удаляем его
     r = requests.delete(f"{BASE_URL}/api/departments/{dept_id}", headers=auth_header)
     assert r.status_code == 204
+
+
+def test_department_children(auth_header):
+    """Проверяем раскрытие оргструктуры по уровням: корни юрлица, подотделы с численностью и сотрудники отдела"""
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"ООО Lazy_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    root_data = {"name": f"LazyRoot_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id}
+    root_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=root_data).json()["id"]
+    child_data = {"name": f"LazyChild_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id, "parent_id": root_id}
+    child_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=child_data).json()["id"]
+    for department_id in (root_id, child_id):
+        register_data = {
+            "email": f"lazy_{uuid.uuid4().hex[:8]}@example.com",
+            "password": "Password123",
+            "first_name": "Lazy",
+            "last_name": "Tree",
+        }
+        user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+        update = {"department_id": department_id}
+        requests.put(f"{BASE_URL}/api/employees/{user_id}", headers=auth_header, json=update)
+
+    r = requests.get(f"{BASE_URL}/api/departments/roots", headers=auth_header, params={"legal_entity_id": le_id})
+    assert r.status_code == 200
+    [root] = r.json()
+    assert root["id"] == root_id
+    assert (root["subdepartment_count"], root["direct_headcount"], root["total_headcount"]) == (1, 1, 2)
+
+    params = {"employees_limit": 1}
+    r = requests.get(f"{BASE_URL}/api/departments/{root_id}/children", headers=auth_header, params=params)
+    assert r.status_code == 200
+    data = r.json()
+    assert [(c["id"], c["subdepartment_count"], c["total_headcount"]) for c in data["children"]] == [(child_id, 0, 1)]
+    assert len(data["employees"]) == 1
+    assert data["has_more_employees"] is False
+
+    r = requests.get(f"{BASE_URL}/api/departments/{uuid.uuid4()}/children", headers=auth_header)
+    assert r.status_code == 404
+
+
+def test_department_reparent(auth_header):
+    """Проверяем смену родителя: отдел нельзя перенести в свое поддерево, перенос меняет дерево"""
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"ООО Move_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    department_ids = []
+    for _ in range(3):
+        dept_data = {
+            "name": f"MoveDept_{uuid.uuid4().hex[:6]}",
+            "legal_entity_id": le_id,
+            "parent_id": department_ids[-1] if department_ids else None,
+        }
+        department_ids.append(
+            requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=dept_data).json()["id"]
+        )
+    top_id, middle_id, bottom_id = department_ids
+
+    r = requests.patch(f"{BASE_URL}/api/departments/{top_id}", headers=auth_header, json={"parent_id": bottom_id})
+    assert r.status_code == 400
+
+    r = requests.patch(f"{BASE_URL}/api/departments/{bottom_id}", headers=auth_header, json={"parent_id": top_id})
+    assert r.status_code == 200
+    children = requests.get(f"{BASE_URL}/api/departments/{top_id}/children", headers=auth_header).json()["children"]
+    assert sorted(child["id"] for child in children) == sorted([middle_id, bottom_id])
+    assert all(child["subdepartment_count"] == 0 for child in children)
+
+
+def test_department_stats(auth_header):
+    """Проверяем численность отдела: сотрудник подотдела учитывается у предков и уходит с переносом подотдела"""
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"ООО Stats_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    first_data = {"name": f"StatsFirst_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id}
+    first_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=first_data).json()["id"]
+    second_data = {"name": f"StatsSecond_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id}
+    second_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=second_data).json()["id"]
+    child_data = {"name": f"StatsChild_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id, "parent_id": first_id}
+    child_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=child_data).json()["id"]
+
+    register_data = {
+        "email": f"stats_{uuid.uuid4().hex[:8]}@example.com",
+        "password": "Password123",
+        "first_name": "Dept",
+        "last_name": "Stats",
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+    requests.put(f"{BASE_URL}/api/employees/{user_id}", headers=auth_header, json={"department_id": child_id})
+
+    r = requests.get(f"{BASE_URL}/api/departments/{first_id}/stats", headers=auth_header)
+    assert r.status_code == 200
+    stats = r.json()
+    assert (stats["headcount"], stats["total_headcount"], stats["total_active_headcount"]) == (0, 1, 1)
+    assert stats["has_manager"] is False
+
+    requests.patch(f"{BASE_URL}/api/departments/{child_id}", headers=auth_header, json={"parent_id": second_id})
+    first = requests.get(f"{BASE_URL}/api/departments/{first_id}/stats", headers=auth_header).json()
+    second = requests.get(f"{BASE_URL}/api/departments/{second_id}/stats", headers=auth_header).json()
+    assert (first["total_headcount"], second["total_headcount"]) == (0, 1)
+
+    r = requests.get(f"{BASE_URL}/api/departments/{uuid.uuid4()}/stats", headers=auth_header)
+    assert r.status_code == 404
+
+
+# ===================== ORG ENDPOINTS =====================
+
+
+def test_org_tree(auth_header):
+    """Проверяем дерево оргструктуры: вложенность отделов и численность с учетом подотделов"""
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"ООО OrgTree_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    root_data = {"name": f"OrgRoot_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id}
+    root_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=root_data).json()["id"]
+    child_data = {"name": f"OrgChild_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id, "parent_id": root_id}
+    child_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=child_data).json()["id"]
+
+    register_data = {
+        "email": f"orgtree_{uuid.uuid4().hex[:8]}@example.com",
+        "password": "Password123",
+        "first_name": "Org",
+        "last_name": "Tree",
+    }
+    user_id = requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+    requests.put(f"{BASE_URL}/api/employees/{user_id}", headers=auth_header, json={"department_id": child_id})
+
+    r = requests.get(f"{BASE_URL}/api/org/tree", headers=auth_header)
+    assert r.status_code == 200
+    legal_entity = next(le for le in r.json() if le["id"] == le_id)
+    assert legal_entity["total_headcount"] == 1
+    [root] = legal_entity["departments"]
+    assert root["id"] == root_id
+    assert (root["headcount"], root["total_headcount"]) == (0, 1)
+    assert [child["id"] for child in root["subdepartments"]] == [child_id]
+    assert root["subdepartments"][0]["headcount"] == 1
+
+
+def test_org_chain_and_common_manager(auth_header):
+    """Проверяем цепочку руководителей и общего руководителя двух сотрудников"""
+
+    def register(name):
+        register_data = {
+            "email": f"orgchain_{uuid.uuid4().hex[:8]}@example.com",
+            "password": "Password123",
+            "first_name": name,
+            "last_name": "Chain",
+        }
+        return requests.post(f"{BASE_URL}/api/auth/register", json=register_data).json()["user_id"]
+
+    le_id = requests.post(
+        f"{BASE_URL}/api/legal-entities/", headers=auth_header, json={"name": f"ООО OrgChain_{uuid.uuid4().hex[:6]}"}
+    ).json()["id"]
+    head_id, lead_id, first_id, second_id = (register(name) for name in ("Head", "Lead", "First", "Second"))
+
+    root_data = {"name": f"ChainRoot_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id, "manager_id": head_id}
+    root_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=root_data).json()["id"]
+    team_data = {
+        "name": f"ChainTeam_{uuid.uuid4().hex[:6]}",
+        "legal_entity_id": le_id,
+        "parent_id": root_id,
+        "manager_id": lead_id,
+    }
+    team_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=team_data).json()["id"]
+    other_data = {"name": f"ChainOther_{uuid.uuid4().hex[:6]}", "legal_entity_id": le_id, "parent_id": root_id}
+    other_id = requests.post(f"{BASE_URL}/api/departments/", headers=auth_header, json=other_data).json()["id"]
+    requests.put(f"{BASE_URL}/api/employees/{first_id}", headers=auth_header, json={"department_id": team_id})
+    requests.put(f"{BASE_URL}/api/employees/{second_id}", headers=auth_header, json={"department_id": other_id})
+    # Граф оргструктуры пересобирается в фоне с небольшой задержкой — ждем, пока в нем появятся оба перевода
+    common_params = {"a": first_id, "b": second_id}
+    for _ in range(50):
+        chain = requests.get(f"{BASE_URL}/api/employees/{first_id}/chain", headers=auth_header)
+        r = requests.get(f"{BASE_URL}/api/org/common-manager", headers=auth_header, params=common_params)
+        if len(chain.json()) == 2 and r.json()["department_id"] is not None:
+            break
+        time.sleep(0.1)
+    assert chain.status_code == 200
+    assert [link["manager_id"] for link in chain.json()] == [lead_id, head_id]
+
+    assert r.status_code == 200
+    assert r.json()["department_id"] == root_id
+    assert r.json()["manager"]["manager_id"] == head_id
+
+    r = requests.get(f"{BASE_URL}/api/employees/{uuid.uuid4()}/chain", headers=auth_header)
+    assert r.status_code == 404
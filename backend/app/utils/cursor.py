@@ -0,0 +1,31 @@
+import base64
+import json
+
+from app.exceptions.user import InvalidCursor
+
+
+def encode_cursor(payload: dict) -> str:
+    """
+    Кодирует позицию keyset-пагинации в непрозрачную строку.
+    :param payload: значения ключей сортировки последней записи страницы
+    :return: base64url-строка без паддинга
+    """
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Декодирует курсор, полученный от клиента.
+    :param cursor: строка, ранее выданная encode_cursor
+    :return: значения ключей сортировки
+    :raises InvalidCursor: если курсор поврежден
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(payload, dict):
+        raise InvalidCursor(cursor)
+    return payload
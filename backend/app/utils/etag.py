@@ -0,0 +1,27 @@
+from fastapi import HTTPException, Request, Response
+
+from app.services.directory_version import directory_version
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Слабое сравнение ETag с заголовком If-None-Match (список через запятую или *)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def directory_etag(request: Request, response: Response):
+    """
+    Условный GET для списков справочника: ETag — версия справочника.
+    При совпадении If-None-Match обработчик не вызывается и сразу возвращается 304.
+    Версия читается до обработчика, поэтому при параллельной записи ETag может
+    только отстать от данных — тогда клиент просто получит полный ответ еще раз.
+    """
+    etag = directory_version.etag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
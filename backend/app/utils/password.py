@@ -1,7 +1,14 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_hash_pool: ProcessPoolExecutor | None = None
+
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -9,3 +16,37 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash_chunk(passwords: list[str]) -> list[str]:
+    return [get_password_hash(password) for password in passwords]
+
+
+def shutdown_hash_pool():
+    """Останавливает пул процессов хэширования при остановке приложения, отменяя невыполненные пачки."""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Хэширует пачку паролей в пуле процессов, не блокируя цикл событий.
+    bcrypt намеренно медленный, поэтому пароли делятся между PASSWORD_HASH_WORKERS процессами.
+    """
+    global _hash_pool
+    if not passwords:
+        return []
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+    size = -(-len(passwords) // settings.PASSWORD_HASH_WORKERS)
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(_hash_pool, _hash_chunk, passwords[i : i + size])
+            for i in range(0, len(passwords), size)
+        )
+    )
+    return [password_hash for chunk in chunks for password_hash in chunk]
@@ -0,0 +1,70 @@
+import json
+from dataclasses import is_dataclass
+from datetime import date, datetime
+from functools import cache
+from typing import Any, ClassVar
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+def json_default(value):
+    """Сериализует то, что не поддерживает json: DTO-датаклассы, даты, UUID."""
+    if is_dataclass(value):
+        return {name: getattr(value, name) for name in value.__slots__}
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(content) -> str:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+
+def dumps_bytes(content) -> bytes:
+    """JSON в байтах через orjson: датаклассы, UUID и даты он кодирует сам."""
+    return orjson.dumps(content)
+
+
+class DTOJSONResponse(JSONResponse):
+    """JSON-ответ из DTO и строк репозитория: сериализуется напрямую, без валидации через Pydantic-схемы."""
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
+
+
+class SchemaJSONResponse(JSONResponse):
+    """
+    JSON-ответ по схеме: объекты (в том числе ORM) читаются по атрибутам один раз
+    и сразу кодируются в байты скомпилированным сериализатором pydantic-core,
+    без промежуточных словарей jsonable_encoder и json.dumps.
+    """
+
+    adapter: ClassVar[TypeAdapter]
+
+    def render(self, content) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True))
+
+
+@cache
+def schema_response_class(schema: Any) -> type[SchemaJSONResponse]:
+    """Класс ответа для схемы; TypeAdapter строится один раз на схему."""
+    return type("SchemaJSONResponse", (SchemaJSONResponse,), {"adapter": TypeAdapter(schema)})
+
+
+def dto_response(content, response: Response) -> DTOJSONResponse:
+    """
+    Возвращает content как DTOJSONResponse с заголовками, которые выставили зависимости (например ETag):
+    FastAPI не переносит их, если обработчик сам возвращает Response.
+    """
+    return DTOJSONResponse(content, headers=dict(response.headers))
+
+
+def schema_response(schema: Any, content, response: Response) -> SchemaJSONResponse:
+    """
+    Как dto_response, но для объектов, которые нужно вывести по схеме schema.
+    Обработчик возвращает готовый Response, поэтому FastAPI не валидирует ответ повторно по response_model.
+    """
+    return schema_response_class(schema)(content, headers=dict(response.headers))
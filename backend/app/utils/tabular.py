@@ -0,0 +1,242 @@
+import asyncio
+import csv
+import io
+import tempfile
+from datetime import date, datetime, timezone
+from enum import Enum
+from pathlib import Path
+from types import NoneType, UnionType
+from typing import AsyncIterator, BinaryIO, Iterator, Mapping, Sequence, get_args, get_origin
+from uuid import UUID
+
+import openpyxl
+import pyarrow
+import pyarrow.parquet
+from openpyxl.cell import WriteOnlyCell
+
+from app.enums import ExportFormatEnum
+from app.exceptions.user import InvalidImportFile
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormatEnum.CSV: "text/csv; charset=utf-8",
+    ExportFormatEnum.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ExportFormatEnum.PARQUET: "application/vnd.apache.parquet",
+}
+
+_FILE_CHUNK_SIZE = 64 * 1024
+
+
+def _normalize_header(header) -> str:
+    return str(header or "").strip().lower()
+
+
+def _cell(value):
+    """Значение ячейки XLSX: числа — строками (телефоны, табельные номера), дата-время — датой."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _read_csv(file: BinaryIO) -> Iterator[tuple[int, dict]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        # Разделитель — тот из , ; и табуляции, что чаще встречается в строке заголовков
+        header_line = text.readline()
+        text.seek(0)
+        reader = csv.reader(text, delimiter=max(",;\t", key=header_line.count))
+        headers = [_normalize_header(header) for header in next(reader, [])]
+        for row in reader:
+            yield reader.line_num, dict(zip(headers, row))
+    except UnicodeDecodeError:
+        raise InvalidImportFile("CSV must be UTF-8 encoded")
+    except csv.Error as exc:
+        raise InvalidImportFile(f"malformed CSV: {exc}")
+    finally:
+        text.detach()
+
+
+def _read_xlsx(file: BinaryIO) -> Iterator[tuple[int, dict]]:
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception as exc:
+        raise InvalidImportFile(f"malformed XLSX: {exc}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalize_header(header) for header in next(rows, ())]
+        for line, row in enumerate(rows, start=2):
+            yield line, {header: _cell(value) for header, value in zip(headers, row)}
+    finally:
+        workbook.close()
+
+
+def read_table(file: BinaryIO, filename: str | None) -> Iterator[tuple[int, dict]]:
+    """
+    Построчно читает таблицу из CSV (разделитель определяется автоматически) или XLSX (первый лист).
+    Первая строка — заголовки, они приводятся к нижнему регистру.
+    :return: итератор пар (номер строки в файле, словарь заголовок -> значение); пустые строки пропускаются
+    :raises InvalidImportFile: если формат не поддерживается или файл поврежден
+    """
+    suffix = Path(filename or "").suffix.lower()
+    if suffix == ".csv":
+        rows = _read_csv(file)
+    elif suffix == ".xlsx":
+        rows = _read_xlsx(file)
+    else:
+        raise InvalidImportFile("expected a .csv or .xlsx file")
+    for line, row in rows:
+        if any(value not in (None, "") for value in row.values()):
+            yield line, row
+
+
+def _plain(value):
+    """Значение, понятное любому формату: перечисления — их значением, UUID — строкой."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _text(value) -> str:
+    """Значение ячейки CSV; списки — через ';', как в файле импорта."""
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(map(str, value))
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Файловый объект, который копит записанные байты до очередного drain()."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def _write_csv(columns: Sequence[str], chunks: AsyncIterator[Sequence[Mapping]]) -> AsyncIterator[bytes]:
+    # BOM нужен Excel, чтобы открыть UTF-8 без мастера импорта; read_table его пропускает
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield b"\xef\xbb\xbf" + buffer.getvalue().encode()
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text(row[column]) for column in columns] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+def _xlsx_cell(sheet, value):
+    value = _plain(value)
+    if isinstance(value, list):
+        return ";".join(map(str, value))
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # XLSX не хранит часовой пояс
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str) and value.startswith("="):
+        # Иначе openpyxl запишет строку как формулу
+        cell = WriteOnlyCell(sheet, value)
+        cell.data_type = "s"
+        return cell
+    return value
+
+
+def _append_xlsx_rows(sheet, columns: Sequence[str], rows: Sequence[Mapping]):
+    for row in rows:
+        sheet.append([_xlsx_cell(sheet, row[column]) for column in columns])
+
+
+async def _write_xlsx(columns: Sequence[str], chunks: AsyncIterator[Sequence[Mapping]]) -> AsyncIterator[bytes]:
+    # Лист в режиме write_only сбрасывает строки во временный файл, но zip-архив книги собирается
+    # только при сохранении, поэтому книга пишется во временный файл и отдается из него частями
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(columns))
+    async for rows in chunks:
+        await asyncio.to_thread(_append_xlsx_rows, sheet, columns, rows)
+    with tempfile.TemporaryFile() as file:
+        await asyncio.to_thread(workbook.save, file)
+        file.seek(0)
+        while data := file.read(_FILE_CHUNK_SIZE):
+            yield data
+
+
+def _arrow_type(annotation):
+    """Тип Arrow по аннотации поля: T | None — по T, списки — списками строк, прочее — строкой."""
+    if isinstance(annotation, UnionType):
+        annotation = next(arg for arg in get_args(annotation) if arg is not NoneType)
+    annotation = get_origin(annotation) or annotation
+    if annotation is bool:
+        return pyarrow.bool_()
+    if annotation is datetime:
+        return pyarrow.timestamp("us", tz="UTC")
+    if annotation is date:
+        return pyarrow.date32()
+    if annotation is list:
+        return pyarrow.list_(pyarrow.string())
+    return pyarrow.string()
+
+
+def _arrow_value(value):
+    value = _plain(value)
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return value
+
+
+async def _write_parquet(columns: Mapping[str, type], chunks: AsyncIterator[Sequence[Mapping]]) -> AsyncIterator[bytes]:
+    # Каждая порция записывается отдельной группой строк и сразу отдается клиенту
+    schema = pyarrow.schema([(column, _arrow_type(annotation)) for column, annotation in columns.items()])
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        async for rows in chunks:
+            batch = pyarrow.record_batch(
+                [[_arrow_value(row[column]) for row in rows] for column in schema.names], schema=schema
+            )
+            writer.write_batch(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def write_table(
+    fmt: ExportFormatEnum, columns: Mapping[str, type], chunks: AsyncIterator[Sequence[Mapping]]
+) -> AsyncIterator[bytes]:
+    """
+    Записывает строки, поступающие порциями, в CSV, XLSX или Parquet и отдает файл частями.
+    В памяти находится не больше одной порции строк.
+    :param columns: колонки в порядке вывода и типы их значений (по ним строится схема Parquet)
+    :param chunks: порции строк-словарей
+    """
+    if fmt == ExportFormatEnum.XLSX:
+        return _write_xlsx(list(columns), chunks)
+    if fmt == ExportFormatEnum.PARQUET:
+        return _write_parquet(columns, chunks)
+    return _write_csv(list(columns), chunks)